@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Regression gate — compare two benchmark results files, fixture by fixture and stage by stage.
+
+A timing counts as a regression only when both hold: its median slowed
+by more than ``threshold``, and a one-sided Mann-Whitney U test on the
+raw samples finds the slowdown significant at ``alpha``. The threshold
+keeps tiny but real shifts from failing the gate, and the test keeps
+noise from failing it.
+
+Baseline samples are first rescaled by the ratio of the two runs'
+calibration timings. The calibration workload is timed in the same
+interleaved rounds as the benchmarks (harness.calibration_workload()), so
+this cancels out how fast the machine happened to run. Without that, a
+loaded or throttled run shows as a uniform slowdown of every case. A
+differing CPU or Python is reported, since rescaling only approximates it.
+
+Usage:
+    python benchmarks/compare.py BASELINE CURRENT [--threshold 0.1] [--alpha 0.01]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+from harness import SCHEMA, percentile
+
+# Environment keys that must match for timings to be compared as they are
+_MACHINE_KEYS = ("cpu", "machine", "python", "implementation")
+
+
+def mann_whitney(base: list[float], current: list[float]) -> float:
+    """One-sided p-value that ``current`` samples tend to be larger than ``base``.
+
+    Normal approximation to the U statistic, with tie and continuity
+    corrections; samples here are in the tens to hundreds.
+    """
+    n1, n2 = len(base), len(current)
+    if not n1 or not n2:
+        return 1.0
+    ranked = sorted([(v, 1) for v in current] + [(v, 0) for v in base])
+    rank_sum = 0.0  # ranks of the current samples
+    ties = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        count = j - i + 1
+        mid_rank = (i + j) / 2 + 1
+        rank_sum += mid_rank * sum(flag for _, flag in ranked[i : j + 1])
+        ties += count**3 - count
+        i = j + 1
+    n = n1 + n2
+    u = rank_sum - n2 * (n2 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0
+    if variance <= 0:
+        return 1.0 if u <= n1 * n2 / 2 else 0.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _scale(baseline: dict, current: dict, normalize: bool) -> tuple[float, list[str]]:
+    base_env, env = baseline.get("environment", {}), current.get("environment", {})
+    warnings = [
+        f"environment differs: {k} {base_env.get(k)!r} -> {env.get(k)!r}"
+        for k in _MACHINE_KEYS if base_env.get(k) != env.get(k)
+    ]
+    if not normalize:
+        return 1.0, warnings
+    base_cal, cal = baseline.get("calibration"), current.get("calibration")
+    if not base_cal or not cal:
+        return 1.0, warnings + ["no calibration timings; baseline used unscaled"]
+    return cal["median_ms"] / base_cal["median_ms"], warnings
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float = 0.10, alpha: float = 0.01, normalize: bool = True,
+) -> dict:
+    """Per-fixture, per-stage deltas of ``current`` against ``baseline`` results.
+
+    Args:
+        baseline: Results file contents, as written by run.py.
+        current: Results file contents to check.
+        threshold: Relative slowdown of the median counted as a regression.
+        alpha: Significance level of the Mann-Whitney test.
+        normalize: Rescale the baseline by the calibration timings.
+
+    Returns:
+        'rows' (one per fixture and stage in both files, with medians,
+        'delta', 'p' and 'verdict': 'regression', 'improvement' or 'same'),
+        'regressions' (the regressed rows' "fixture/stage" names), 'scale'
+        and 'warnings'.
+
+    Raises:
+        ValueError: Either file has a different results schema.
+    """
+    for name, results in (("baseline", baseline), ("current", current)):
+        if results.get("schema") != SCHEMA:
+            raise ValueError(f"{name} results have schema {results.get('schema')!r}, expected {SCHEMA}")
+    scale, warnings = _scale(baseline, current, normalize)
+
+    base_by_file = {b["file"]: b for b in baseline["benchmarks"]}
+    rows = []
+    for bench in current["benchmarks"]:
+        base = base_by_file.get(bench["file"])
+        if base is None:
+            warnings.append(f"{bench['file']}: not in baseline")
+            continue
+        for stage, timing in bench["time"].items():
+            if stage not in base["time"]:
+                continue
+            before = sorted(s * scale for s in base["time"][stage]["samples_ms"])
+            after = sorted(timing["samples_ms"])
+            base_median, median = percentile(before, 50), percentile(after, 50)
+            delta = median / base_median - 1 if base_median > 0 else 0.0
+            slower = mann_whitney(before, after)
+            faster = mann_whitney(after, before)
+            if delta > threshold and slower < alpha:
+                verdict = "regression"
+            elif delta < -threshold and faster < alpha:
+                verdict = "improvement"
+            else:
+                verdict = "same"
+            rows.append({
+                "fixture": bench["file"], "stage": stage,
+                "base_median_ms": round(base_median, 4), "median_ms": round(median, 4),
+                "delta": round(delta, 4), "p": round(min(slower, faster), 6), "verdict": verdict,
+            })
+    missing = sorted(set(base_by_file) - {b["file"] for b in current["benchmarks"]})
+    warnings += [f"{name}: not in current results" for name in missing]
+
+    return {
+        "threshold": threshold,
+        "alpha": alpha,
+        "scale": scale,
+        "rows": rows,
+        "regressions": [f"{r['fixture']}/{r['stage']}" for r in rows if r["verdict"] == "regression"],
+        "warnings": warnings,
+    }
+
+
+def print_comparison(report: dict, out=sys.stdout) -> None:
+    for warning in report["warnings"]:
+        print(f"warning: {warning}", file=out)
+    if report["scale"] != 1.0:
+        print(f"baseline rescaled by calibration ratio {report['scale']:.3f}", file=out)
+    print(f"{'fixture':<26}{'stage':<16}{'baseline':>11}{'current':>11}{'delta':>9}{'p':>10}  verdict", file=out)
+    for r in report["rows"]:
+        print(f"{r['fixture']:<26}{r['stage']:<16}{r['base_median_ms']:>9.3f}ms{r['median_ms']:>9.3f}ms"
+              f"{r['delta']:>+9.1%}{r['p']:>10.2g}  {r['verdict']}", file=out)
+    if report["regressions"]:
+        print(f"\n{len(report['regressions'])} regression(s) beyond {report['threshold']:.0%} "
+              f"at alpha {report['alpha']}: {', '.join(report['regressions'])}", file=out)
+    else:
+        print(f"\nNo regressions beyond {report['threshold']:.0%} at alpha {report['alpha']}.", file=out)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark results files; exit 1 on a regression.")
+    parser.add_argument("baseline", type=Path, help="Baseline results file")
+    parser.add_argument("current", type=Path, help="Results file to check")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown of the median counted as a regression (default 0.10 = 10%%)")
+    parser.add_argument("--alpha", type=float, default=0.01,
+                        help="Significance level of the slowdown test (default 0.01)")
+    parser.add_argument("--normalize", action=argparse.BooleanOptionalAction, default=True,
+                        help="Rescale the baseline by the calibration timings (default on)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = compare(
+            json.loads(args.baseline.read_text()), json.loads(args.current.read_text()),
+            threshold=args.threshold, alpha=args.alpha, normalize=args.normalize,
+        )
+    except (OSError, ValueError) as e:
+        print(f"compare: {e}", file=sys.stderr)
+        return 2
+    print_comparison(report)
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
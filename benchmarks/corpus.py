@@ -0,0 +1,136 @@
+"""Synthetic benchmark corpus — seeded documents of any size, built from the fixtures' vocabulary.
+
+``generate(kind, size, seed)`` returns exactly ``size`` characters of one
+document shape. The same arguments always give the same text, and a
+smaller document is a prefix of a larger one, so every size measures the
+same content. Shapes (``KINDS``):
+
+- ``plain``: paragraphs of fixture sentences, no headers.
+- ``markdown``: a deep ATX header hierarchy (down to ``######``) with
+  short sections, so chunking runs through ``_parse_markdown_sections``.
+- ``tables``: pipe tables of quantities, dollars, dates, percentages
+  and standards, for the numeric and entity patterns.
+- ``run-on``: one unbroken run of words with no punctuation or newlines,
+  which leaves ``chunk_text`` no sentence break and the ``[^.!?\\n]*``
+  patterns no stop.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+KINDS = ("plain", "markdown", "tables", "run-on")
+
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]*[A-Za-z]|[A-Za-z]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STANDARD = re.compile(r"\b(?:ACI|AISC|ASCE|ASTM|AWS|IBC|ISO|NFPA|OSHA) [A-Z]?\d[\w./-]*")
+_UNITS = ("psf", "psi", "kips", "ft", "in", "lb", "%", "days", "mm", "MPa")
+
+
+@dataclass(slots=True, frozen=True)
+class Vocabulary:
+    """Words, sentences, headings and standard references from the fixtures."""
+
+    words: tuple[str, ...]
+    sentences: tuple[str, ...]
+    headings: tuple[str, ...]
+    standards: tuple[str, ...]
+
+
+@lru_cache(maxsize=4)
+def vocabulary(fixtures: Path = FIXTURES) -> Vocabulary:
+    """The vocabulary of every ``*.txt`` fixture, in a stable order."""
+    words: dict[str, None] = {}
+    sentences: dict[str, None] = {}
+    headings: dict[str, None] = {}
+    standards: dict[str, None] = {}
+    for path in sorted(Path(fixtures).glob("*.txt")):
+        text = path.read_text()
+        words.update(dict.fromkeys(_WORD.findall(text)))
+        standards.update(dict.fromkeys(_STANDARD.findall(text)))
+        for line in text.splitlines():
+            line = line.strip()
+            if line.startswith("#"):
+                headings[line.lstrip("#").strip()] = None
+            elif line.isupper() and 3 < len(line) < 80:
+                headings[line.title()] = None
+            elif len(line) > 40 and not line.startswith(("|", "-", "*")):
+                sentences.update(dict.fromkeys(s for s in _SENTENCE_END.split(line) if len(s) > 20))
+    if not words or not sentences:
+        raise ValueError(f"No fixture text found in {fixtures}")
+    return Vocabulary(
+        tuple(words), tuple(sentences), tuple(h for h in headings if h) or ("Section",),
+        tuple(standards) or ("ASTM C150",),
+    )
+
+
+def generate(kind: str, size: int, seed: int = 0, fixtures: Path = FIXTURES) -> str:
+    """``size`` characters of synthetic ``kind`` text, the same for the same arguments."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown corpus kind: {kind!r} (expected one of {', '.join(KINDS)})")
+    rng = random.Random(f"{seed}:{kind}")
+    pieces = _PIECES[kind](rng, vocabulary(fixtures))
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        piece = next(pieces)
+        parts.append(piece)
+        length += len(piece)
+    return "".join(parts)[:size]
+
+
+def _plain(rng: random.Random, vocab: Vocabulary) -> Iterator[str]:
+    while True:
+        yield " ".join(rng.choice(vocab.sentences) for _ in range(rng.randint(2, 6))) + "\n\n"
+
+
+def _markdown(rng: random.Random, vocab: Vocabulary) -> Iterator[str]:
+    depth = 1
+    while True:
+        # A random walk that favors going deeper, with the odd climb back out
+        depth = max(1, min(6, depth + rng.choice((1, 1, 0, -1, -2))))
+        heading = "#" * depth + " " + rng.choice(vocab.headings) + "\n\n"
+        yield heading + " ".join(rng.choice(vocab.sentences) for _ in range(rng.randint(1, 3))) + "\n\n"
+
+
+def _number(rng: random.Random, vocab: Vocabulary) -> str:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return f"${rng.randint(100, 9_999_999):,}.{rng.randint(0, 99):02d}"
+    if kind == 1:
+        return f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(2000, 2035)}"
+    if kind == 2:
+        return f"{rng.uniform(0, 100):.1f}%"
+    if kind == 3:
+        return rng.choice(vocab.standards)
+    return f"{rng.randint(1, 50_000):,} {rng.choice(_UNITS)}"
+
+
+def _tables(rng: random.Random, vocab: Vocabulary) -> Iterator[str]:
+    while True:
+        columns = rng.randint(3, 7)
+        header = "| " + " | ".join(rng.choice(vocab.words).title() for _ in range(columns)) + " |\n"
+        rows = [header, "|" + " --- |" * columns + "\n"]
+        for _ in range(rng.randint(4, 30)):
+            cells = [rng.choice(vocab.words)] + [_number(rng, vocab) for _ in range(columns - 1)]
+            rows.append("| " + " | ".join(cells) + " |\n")
+        yield "".join(rows) + "\n" + rng.choice(vocab.sentences) + "\n\n"
+
+
+def _run_on(rng: random.Random, vocab: Vocabulary) -> Iterator[str]:
+    words = vocab.words
+    while True:
+        yield " ".join(rng.choice(words) for _ in range(64)) + " "
+
+
+_PIECES = {"plain": _plain, "markdown": _markdown, "tables": _tables, "run-on": _run_on}
@@ -0,0 +1,211 @@
+"""Benchmark harness — warmed-up, repeated timings and their statistics. No dependencies.
+
+``measure()`` runs a callable a few times untimed, then times it until it
+has both ``repeat`` samples and ``min_time`` seconds of them. As with
+``timeit``, garbage collection is off during each call; pending collections
+run between calls, untimed. ``summarize()`` turns the nanosecond samples
+into median, p95, p99, mean and standard deviation, and ``environment()``
+fingerprints the machine the numbers came from.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Results file layout; bumped when a key changes meaning
+SCHEMA = 2
+
+
+def measure(
+    fn: Callable[[], object], warmup: int = 3, repeat: int = 30, min_time: float = 0.5, max_repeat: int = 0,
+) -> list[int]:
+    """Nanosecond timings of ``fn()``, after ``warmup`` untimed calls.
+
+    Sampling continues past ``repeat`` calls until ``min_time`` seconds
+    have been timed, so fast cases get enough samples for stable tails,
+    but stops at ``max_repeat`` samples (0 = no limit).
+    """
+    for _ in range(warmup):
+        fn()
+    samples: list[int] = []
+    total = 0
+    budget = int(min_time * 1e9)
+    clock = time.perf_counter_ns
+    enabled = gc.isenabled()
+    gc.collect()
+    try:
+        while (len(samples) < repeat or total < budget) and (not max_repeat or len(samples) < max_repeat):
+            gc.disable()
+            start = clock()
+            fn()
+            elapsed = clock() - start
+            if enabled:
+                gc.enable()
+            samples.append(elapsed)
+            total += elapsed
+    finally:
+        if enabled:
+            gc.enable()
+    return samples
+
+
+def measure_interleaved(
+    fns: list[Callable[[], object]], warmup: int = 3, repeat: int = 30, min_time: float = 0.5, max_repeat: int = 0,
+) -> list[list[int]]:
+    """Nanosecond timings of each of ``fns``, taken in rounds of one call each.
+
+    Interleaving spreads any slow stretch of the machine over every case
+    instead of landing on whichever was being timed, so the samples of
+    each case carry the run's full noise. Rounds continue past ``repeat``
+    until ``min_time`` seconds per case have been timed on average, up to
+    ``max_repeat`` rounds (0 = no limit).
+    """
+    for _ in range(warmup):
+        for fn in fns:
+            fn()
+    samples: list[list[int]] = [[] for _ in fns]
+    total = 0
+    budget = int(min_time * 1e9) * len(fns)
+    clock = time.perf_counter_ns
+    enabled = gc.isenabled()
+    gc.collect()
+    rounds = 0
+    try:
+        while (rounds < repeat or total < budget) and (not max_repeat or rounds < max_repeat):
+            for fn, out in zip(fns, samples, strict=True):
+                gc.disable()
+                start = clock()
+                fn()
+                elapsed = clock() - start
+                if enabled:
+                    gc.enable()
+                out.append(elapsed)
+                total += elapsed
+            rounds += 1
+    finally:
+        if enabled:
+            gc.enable()
+    return samples
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """The ``q``-th percentile (0-100) of sorted values, linearly interpolated."""
+    if not ordered:
+        raise ValueError("percentile of no values")
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def summarize(samples: list[int]) -> dict:
+    """Statistics of nanosecond samples, in milliseconds."""
+    ordered = sorted(s / 1e6 for s in samples)
+    return {
+        "n": len(ordered),
+        "median_ms": round(percentile(ordered, 50), 4),
+        "p95_ms": round(percentile(ordered, 95), 4),
+        "p99_ms": round(percentile(ordered, 99), 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "stdev_ms": round(statistics.stdev(ordered), 4) if len(ordered) > 1 else 0.0,
+        "min_ms": round(ordered[0], 4),
+        "max_ms": round(ordered[-1], 4),
+    }
+
+
+def throughput(stats: dict, chars: int, units: int) -> dict:
+    """Characters and units per second at the median time."""
+    seconds = max(stats["median_ms"], 1e-6) / 1000
+    return {"chars_per_s": round(chars / seconds), "units_per_s": round(units / seconds, 1)}
+
+
+def calibration_workload(text: str = " ".join(f"w{i % 997} {i * 7919 % 10007}." for i in range(1000))) -> None:
+    """A fixed stdlib workload (regex, dicts, sort, json), independent of decompose.
+
+    Timed alongside the benchmarks, the ratio of two runs' timings of it
+    approximates how much faster one machine or moment runs Python.
+    """
+    re.findall(r"\bw\d+ (\d+)\.", text)
+    counts: dict[str, int] = {}
+    for word in text.split():
+        counts[word] = counts.get(word, 0) + 1
+    sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    json.dumps(counts)
+
+
+# An indented JSON array of numbers only. JSON strings cannot hold a raw
+# newline, so this never matches inside one.
+_NUMBER_ARRAY = re.compile(r"\[\n\s*(-?[\d.eE+-]+(?:,\n\s*-?[\d.eE+-]+)*)\n\s*\]")
+
+
+def dump_results(results: dict) -> str:
+    """Indented JSON with each array of numbers (raw samples) on one line, so result diffs stay reviewable."""
+    text = json.dumps(results, indent=2)
+    return _NUMBER_ARRAY.sub(lambda m: "[" + ", ".join(v.strip() for v in m.group(1).split(",")) + "]", text) + "\n"
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+    if sys.platform == "darwin":
+        try:
+            out = subprocess.run(
+                ["sysctl", "-n", "machdep.cpu.brand_string"], capture_output=True, text=True, timeout=5,
+            )
+            if out.stdout.strip():
+                return out.stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return platform.processor() or platform.machine()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict:
+    """Where and with what the numbers were measured."""
+    from decompose import __version__
+    from decompose.core import decompose_text
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "compiler": platform.python_compiler(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "decompose": __version__,
+        "_decompose": decompose_text("version probe")["meta"]["_decompose"],
+        "git_commit": _git_commit(),
+        "timer_resolution_ns": time.get_clock_info("perf_counter").resolution * 1e9,
+    }
@@ -1,79 +1,163 @@
 #!/usr/bin/env python3
-"""Benchmark decompose against reference fixtures. Outputs JSON."""
+"""Benchmark decompose against reference fixtures.
 
+Each fixture is decomposed a few times to warm up, then timed repeatedly,
+as a whole and per stage (chunking and each analyzer over the chunks).
+Cases are timed in interleaved rounds, so machine noise spreads evenly,
+together with a fixed calibration workload that compare.py uses to cancel
+out how fast the machine was running.
+Prints median / p95 / p99 and spread per fixture, and writes the full
+results, samples included, with an environment fingerprint to a JSON file.
+
+With ``--compare BASELINE`` the new results are checked against a stored
+results file (see compare.py), and the exit status is 1 on a regression.
+
+Usage:
+    python benchmarks/run.py [--repeat 30] [--warmup 3] [--min-time 0.5] [--output PATH]
+    python benchmarks/run.py --compare benchmarks/baseline.json [--threshold 0.1] [--alpha 0.01]
+"""
+
+from __future__ import annotations
+
+import argparse
 import json
 import sys
-import time
 from pathlib import Path
 
-from decompose.core import decompose_text
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from compare import compare, print_comparison  # noqa: E402
+from harness import (  # noqa: E402
+    SCHEMA,
+    calibration_workload,
+    dump_results,
+    environment,
+    measure_interleaved,
+    summarize,
+    throughput,
+)
+
+from decompose.chunker import auto_chunk  # noqa: E402
+from decompose.classifier import classify  # noqa: E402
+from decompose.core import decompose_text  # noqa: E402
+from decompose.entities import extract_entities  # noqa: E402
+from decompose.irreducibility import detect_irreducibility  # noqa: E402
 
 FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+OUTPUT = Path(__file__).parent / "latest.json"
 
+# Rounds timed at most, and so samples kept per stage: enough for the
+# slowdown test, few enough that a baseline refresh stays reviewable
+MAX_SAMPLES = 50
 
-def bench_file(path: Path) -> dict:
-    text = path.read_text()
-    start = time.monotonic()
-    result = decompose_text(text)
-    elapsed = round((time.monotonic() - start) * 1000, 1)
 
-    meta = result["meta"]
-    units = result["units"]
+def _timing(samples: list[int]) -> dict:
+    return {**summarize(samples), "samples_ms": [round(s / 1e6, 4) for s in samples]}
+
+
+def stage_calls(text: str) -> dict:
+    """The timed calls for one fixture: the whole decompose_text, then each stage alone."""
+    chunks = [c.text for c in auto_chunk(text)]
+    return {
+        "decompose": lambda: decompose_text(text),
+        "chunk": lambda: auto_chunk(text),
+        "classify": lambda: [classify(t) for t in chunks],
+        "entities": lambda: [extract_entities(t) for t in chunks],
+        "irreducibility": lambda: [detect_irreducibility(t) for t in chunks],
+    }
 
-    safety = sum(1 for u in units if u["risk"] == "safety_critical")
-    mandatory = sum(1 for u in units if u["authority"] == "mandatory")
-    irreducible = sum(1 for u in units if u["irreducible"])
 
+def describe_file(path: Path, times: dict) -> dict:
+    text = path.read_text()
+    result = decompose_text(text)
+    units = result["units"]
     return {
         "file": path.name,
         "input_chars": len(text),
         "input_words": len(text.split()),
-        "total_units": meta["total_units"],
-        "processing_ms": elapsed,
-        "standards_found": len(meta["standards_found"]),
-        "dates_found": len(meta["dates_found"]),
-        "token_estimate": meta["token_estimate"],
-        "mandatory_units": mandatory,
-        "safety_critical_units": safety,
-        "irreducible_units": irreducible,
+        "total_units": len(units),
+        "time": times,
+        "throughput": throughput(times["decompose"], len(text), len(units)),
+        "standards_found": len(result["meta"]["standards_found"]),
+        "mandatory_units": sum(1 for u in units if u["authority"] == "mandatory"),
+        "safety_critical_units": sum(1 for u in units if u["risk"] == "safety_critical"),
+        "irreducible_units": sum(1 for u in units if u["irreducible"]),
     }
 
 
-def main():
-    if not FIXTURES.exists():
-        print(f"No fixtures at {FIXTURES}", file=sys.stderr)
-        sys.exit(1)
-
-    files = sorted(FIXTURES.glob("*.txt"))
+def print_table(results: list[dict], out=sys.stdout) -> None:
+    print(f"{'fixture':<26}{'chars':>8}{'units':>6}{'n':>6}{'median':>10}{'p95':>10}{'p99':>10}"
+          f"{'stdev':>9}{'chars/s':>12}{'units/s':>10}", file=out)
+    for r in results:
+        t = r["time"]["decompose"]
+        print(f"{r['file']:<26}{r['input_chars']:>8}{r['total_units']:>6}{t['n']:>6}"
+              f"{t['median_ms']:>8.3f}ms{t['p95_ms']:>8.3f}ms{t['p99_ms']:>8.3f}ms{t['stdev_ms']:>7.3f}ms"
+              f"{r['throughput']['chars_per_s']:>12,}{r['throughput']['units_per_s']:>10,.0f}", file=out)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark decompose_text on the reference fixtures.")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES, help="Directory of .txt fixtures")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per fixture (default 3)")
+    parser.add_argument("--repeat", type=int, default=30, help="Minimum timed rounds (default 30)")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="Minimum seconds of timed runs per fixture and stage, on average (default 0.5)")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help=f"Results file (default {OUTPUT})")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE",
+                        help="Compare against this results file; exit 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown of the median counted as a regression (default 0.10 = 10%%)")
+    parser.add_argument("--alpha", type=float, default=0.01,
+                        help="Significance level of the slowdown test (default 0.01)")
+    args = parser.parse_args(argv)
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+
+    files = sorted(args.fixtures.glob("*.txt"))
     if not files:
-        print("No .txt fixtures found", file=sys.stderr)
-        sys.exit(1)
-
-    results = []
-    for f in files:
-        results.append(bench_file(f))
+        print(f"No .txt fixtures found in {args.fixtures}", file=sys.stderr)
+        return 1
+
+    cases = [(f, stage, fn) for f in files for stage, fn in stage_calls(f.read_text()).items()]
+    cases.append((None, "calibration", calibration_workload))
+    samples = measure_interleaved(
+        [fn for _, _, fn in cases], warmup=args.warmup, repeat=args.repeat, min_time=args.min_time,
+        max_repeat=MAX_SAMPLES,
+    )
+    times: dict[Path | None, dict] = {f: {} for f in [*files, None]}
+    for (f, stage, _), s in zip(cases, samples, strict=True):
+        times[f][stage] = _timing(s)
+    results = [describe_file(f, times[f]) for f in files]
 
-    # Summary
     total_chars = sum(r["input_chars"] for r in results)
-    total_ms = sum(r["processing_ms"] for r in results)
     total_units = sum(r["total_units"] for r in results)
-    total_standards = sum(r["standards_found"] for r in results)
-
+    total_ms = sum(r["time"]["decompose"]["median_ms"] for r in results)
     output = {
+        "schema": SCHEMA,
+        "environment": environment(),
+        "calibration": times[None]["calibration"],
+        "config": {"warmup": args.warmup, "repeat": args.repeat, "min_time": args.min_time},
         "benchmarks": results,
         "summary": {
             "files": len(results),
             "total_chars": total_chars,
             "total_units": total_units,
-            "total_standards": total_standards,
-            "total_ms": round(total_ms, 1),
-            "chars_per_ms": round(total_chars / max(total_ms, 0.1)),
+            "total_median_ms": round(total_ms, 3),
+            "chars_per_s": round(total_chars / max(total_ms, 1e-6) * 1000),
+            "units_per_s": round(total_units / max(total_ms, 1e-6) * 1000, 1),
         },
     }
 
-    json.dump(output, sys.stdout, indent=2)
+    print_table(results)
+    args.output.write_text(dump_results(output))
+    print(f"\nResults saved to {args.output}")
+
+    if baseline is None:
+        return 0
+    report = compare(baseline, output, threshold=args.threshold, alpha=args.alpha)
     print()
+    print_comparison(report)
+    return 1 if report["regressions"] else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
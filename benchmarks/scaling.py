@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Scaling benchmark — time and peak memory against input size, on the synthetic corpus.
+
+For each corpus kind and each size from ``--min-size`` to ``--max-size``
+(default 1 KB to the 10 MB ``MAX_INPUT``), times chunking, Markdown
+sectioning, classification of the chunks and the whole decompose_text
+call, and measures decompose_text's peak traced memory. A log-log slope is
+fitted to each curve's fastest times from ``--fit-from`` up. Linear work has
+slope 1. A curve steeper than ``--max-slope`` has its fitted sizes timed
+again, keeping the faster of the two timings per point; if it is still too
+steep, the check fails and the exit status is 1.
+
+Usage:
+    python benchmarks/scaling.py [--max-size 10000000] [--kinds plain,markdown] [--output PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from corpus import KINDS, generate  # noqa: E402
+from harness import SCHEMA, environment, measure, summarize  # noqa: E402
+
+from decompose.chunker import _parse_markdown_sections, auto_chunk  # noqa: E402
+from decompose.classifier import classify  # noqa: E402
+from decompose.core import MAX_INPUT, decompose_text  # noqa: E402
+
+OUTPUT = Path(__file__).parent / "scaling.json"
+STAGES = ("chunk", "sections", "classify", "decompose")
+
+
+def sizes(min_size: int, max_size: int, per_decade: int = 1) -> list[int]:
+    """Geometric sizes from ``min_size`` to ``max_size``, ``per_decade`` per factor of 10."""
+    out: list[int] = []
+    step = 0
+    while True:
+        size = round(min_size * 10 ** (step / per_decade))
+        if size >= max_size:
+            out.append(max_size)
+            return out
+        out.append(size)
+        step += 1
+
+
+def slope(points: list[tuple[float, float]]) -> float | None:
+    """Least-squares slope of log(y) against log(x), or None with under two usable points."""
+    logs = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len(logs) < 2:
+        return None
+    mx = sum(x for x, _ in logs) / len(logs)
+    my = sum(y for _, y in logs) / len(logs)
+    var = sum((x - mx) ** 2 for x, _ in logs)
+    if var == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in logs) / var
+
+
+def peak_memory(text: str) -> int:
+    """Peak bytes traced while decomposing ``text``, beyond what was allocated before."""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        decompose_text(text)
+        return tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+
+def bench_size(kind: str, size: int, seed: int, warmup: int, repeat: int, min_time: float) -> dict:
+    text = generate(kind, size, seed)
+    chunks = auto_chunk(text)
+    chunk_texts = [c.text for c in chunks]
+    calls = {
+        "chunk": lambda: auto_chunk(text),
+        "sections": lambda: _parse_markdown_sections(text),
+        "classify": lambda: [classify(t) for t in chunk_texts],
+        "decompose": lambda: decompose_text(text),
+    }
+    times = {
+        stage: summarize(measure(fn, warmup=warmup, repeat=repeat, min_time=min_time))
+        for stage, fn in calls.items()
+    }
+    return {
+        "size": size,
+        "chunks": len(chunks),
+        "time": times,
+        "peak_bytes": peak_memory(text),
+    }
+
+
+def check(points: list[dict], fit_from: int, max_slope: float) -> tuple[dict, list[str]]:
+    """Fitted slopes per curve and the curves steeper than ``max_slope``.
+
+    Times are fitted by their minimum: for a deterministic workload it is
+    the sample least disturbed by the machine, where the median still
+    moves with load.
+    """
+    fitted = [p for p in points if p["size"] >= fit_from]
+    slopes = {
+        stage: slope([(p["size"], p["time"][stage]["min_ms"]) for p in fitted]) for stage in STAGES
+    }
+    slopes["peak_memory"] = slope([(p["size"], p["peak_bytes"]) for p in fitted])
+    failures = [name for name, s in slopes.items() if s is not None and s > max_slope]
+    return {k: None if s is None else round(s, 3) for k, s in slopes.items()}, failures
+
+
+def faster(point: dict, again: dict) -> dict:
+    """A point re-measured: each stage keeps the timing with the lower minimum."""
+    times = {
+        stage: min(point["time"][stage], again["time"][stage], key=lambda t: t["min_ms"]) for stage in STAGES
+    }
+    return {**point, "time": times, "peak_bytes": min(point["peak_bytes"], again["peak_bytes"])}
+
+
+def print_kind(kind: str, points: list[dict], slopes: dict, failures: list[str], out=sys.stdout) -> None:
+    print(f"\n{kind}", file=out)
+    print(f"{'size':>10}{'chunks':>8}" + "".join(f"{s:>12}" for s in STAGES)
+          + f"{'ns/char':>9}{'peak MB':>9}{'B/char':>8}  decompose ns/char", file=out)
+    per_char = [p["time"]["decompose"]["median_ms"] * 1e6 / p["size"] for p in points]
+    widest = max(per_char)
+    for p, ns in zip(points, per_char, strict=True):
+        bar = "#" * max(1, round(ns / widest * 30))
+        print(f"{p['size']:>10,}{p['chunks']:>8}"
+              + "".join(f"{p['time'][s]['median_ms']:>10.2f}ms" for s in STAGES)
+              + f"{ns:>9.0f}{p['peak_bytes'] / 1e6:>9.1f}{p['peak_bytes'] / p['size']:>8.1f}  {bar}", file=out)
+    shown = ", ".join(f"{k} {'-' if v is None else v}" for k, v in slopes.items())
+    print(f"  log-log slope: {shown}", file=out)
+    for name in failures:
+        print(f"  SUPERLINEAR: {name} grows as size^{slopes[name]}", file=out)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time and peak memory of decompose against input size.")
+    parser.add_argument("--kinds", default=",".join(KINDS), help=f"Corpus kinds (default {','.join(KINDS)})")
+    parser.add_argument("--min-size", type=int, default=1_000, help="Smallest input in chars (default 1000)")
+    parser.add_argument("--max-size", type=int, default=MAX_INPUT, help=f"Largest input in chars (default {MAX_INPUT})")
+    parser.add_argument("--per-decade", type=int, default=1, help="Sizes per factor of 10 (default 1)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default 0)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs at the smallest size (default 1)")
+    parser.add_argument("--repeat", type=int, default=5, help="Minimum timed runs per point (default 5)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds of timed runs per point (default 0.2)")
+    parser.add_argument("--fit-from", type=int, default=100_000,
+                        help="Smallest size included in the slope fit (default 100000)")
+    parser.add_argument("--max-slope", type=float, default=1.15,
+                        help="Largest log-log slope accepted as linear (default 1.15)")
+    parser.add_argument("--output", type=Path, default=OUTPUT, help=f"Results file (default {OUTPUT})")
+    args = parser.parse_args(argv)
+
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(unknown)} (expected {', '.join(KINDS)})")
+    if not 0 < args.min_size <= args.max_size <= MAX_INPUT:
+        parser.error(f"sizes must satisfy 0 < --min-size <= --max-size <= {MAX_INPUT}")
+
+    results = {}
+    failed: list[str] = []
+    for kind in kinds:
+        points = [
+            bench_size(kind, size, args.seed, args.warmup if i == 0 else 0, args.repeat, args.min_time)
+            for i, size in enumerate(sizes(args.min_size, args.max_size, args.per_decade))
+        ]
+        slopes, failures = check(points, args.fit_from, args.max_slope)
+        if failures:
+            # One noisy point can tip a short fit; only a repeatable slope fails
+            points = [
+                faster(p, bench_size(kind, p["size"], args.seed, 0, args.repeat, args.min_time))
+                if p["size"] >= args.fit_from else p
+                for p in points
+            ]
+            slopes, failures = check(points, args.fit_from, args.max_slope)
+        print_kind(kind, points, slopes, failures)
+        results[kind] = {"points": points, "slopes": slopes, "superlinear": failures}
+        failed += [f"{kind}/{name}" for name in failures]
+
+    output = {
+        "schema": SCHEMA,
+        "environment": environment(),
+        "config": {k: getattr(args, k) for k in ("seed", "warmup", "repeat", "min_time", "fit_from", "max_slope")},
+        "kinds": results,
+    }
+    args.output.write_text(json.dumps(output, indent=2) + "\n")
+    print(f"\nResults saved to {args.output}")
+    if failed:
+        print(f"Superlinear scaling: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
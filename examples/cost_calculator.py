@@ -6,10 +6,15 @@ Shows exactly how many units need LLM analysis vs. how many get skipped.
 Usage:
     python examples/cost_calculator.py
     python examples/cost_calculator.py path/to/your/document.md
+    python examples/cost_calculator.py path/to/your/document.md cl100k_base.tiktoken
+
+With a tiktoken-format vocabulary file, token counts are exact instead of
+the ~4 characters per token estimate.
 """
 
 import sys
 from decompose import decompose_text
+from decompose.tokens import token_counter
 
 SAMPLE_TEXT = """\
 The contractor shall provide all materials per ASTM C150-20. Maximum load
@@ -39,17 +44,18 @@ def main():
             text = f.read()
     else:
         text = SAMPLE_TEXT
+    count = token_counter(sys.argv[2]) if len(sys.argv) > 2 else estimate_tokens
 
     result = decompose_text(text)
     units = result["units"]
 
     total_chars = sum(len(u["text"]) for u in units)
-    total_tokens = estimate_tokens(text)
+    total_tokens = count(text)
 
     # With Decompose: only send high-attention units to the LLM
     high_attention = [u for u in units if u["attention"] >= 1.0]
     filtered_chars = sum(len(u["text"]) for u in high_attention)
-    filtered_tokens = filtered_chars // CHARS_PER_TOKEN
+    filtered_tokens = sum(count(u["text"]) for u in high_attention)
 
     reduction_pct = 100 - (filtered_tokens * 100 // total_tokens) if total_tokens > 0 else 0
 
@@ -1,8 +1,9 @@
 """Attention-filtered RAG: only embed what matters.
 
 Decomposes a document, filters by attention score, and shows which units
-would enter your vector store vs. which get skipped. No external deps
-beyond decompose-mcp.
+would enter your vector store vs. which get skipped. Units stream in as
+each chunk is classified, so embedding starts before the document is
+done. No external deps beyond decompose-mcp.
 
 Usage:
     python examples/rag_pipeline.py
@@ -10,7 +11,7 @@ Usage:
 """
 
 import sys
-from decompose import decompose_text
+from decompose import iter_decompose
 
 SAMPLE_TEXT = """\
 The contractor shall provide all materials per ASTM C150-20. Maximum load
@@ -37,13 +38,12 @@ def main():
     else:
         text = SAMPLE_TEXT
 
-    result = decompose_text(text)
-    units = result["units"]
+    stream = iter_decompose(text)
 
     embedded = []
     skipped = []
 
-    for unit in units:
+    for unit in stream:
         if unit["attention"] >= ATTENTION_THRESHOLD:
             embedding = mock_embed(unit["text"])
             embedded.append(unit)
@@ -53,10 +53,11 @@ def main():
             print(f"  SKIP   [{unit['attention']:4.1f}] [{unit['authority']:12s}] {unit['text'][:70]}")
 
     print(f"\n--- Results ---")
-    print(f"Total units:    {len(units)}")
+    total = stream.meta["total_units"]
+    print(f"Total units:    {total}")
     print(f"Embedded:       {len(embedded)} (attention >= {ATTENTION_THRESHOLD})")
     print(f"Skipped:        {len(skipped)}")
-    print(f"Token reduction: ~{len(skipped) * 100 // len(units)}%")
+    print(f"Token reduction: ~{len(skipped) * 100 // total}%")
 
 
 if __name__ == "__main__":
@@ -4,12 +4,14 @@
 import json
 import subprocess
 import sys
-import time
 from datetime import datetime, timezone
 from pathlib import Path
 
-# Add src to path
+# Add src and the benchmark harness to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from harness import measure, summarize
 
 from decompose.core import decompose_text
 
@@ -35,12 +37,10 @@ def process_file(path: Path) -> dict:
     if not text.strip():
         return {"file": path.name, "error": "empty"}
 
-    # Timing (100 iterations for stable measurement)
-    start = time.monotonic()
-    iterations = 100
-    for _ in range(iterations):
-        result = decompose_text(text)
-    avg_ms = round((time.monotonic() - start) * 1000 / iterations, 2)
+    # Timing: median of 100 warmed-up runs, with their spread
+    result = decompose_text(text)
+    timing = summarize(measure(lambda: decompose_text(text), repeat=100, min_time=0))
+    avg_ms = round(timing["median_ms"], 2)
 
     units = result["units"]
     meta = result["meta"]
@@ -85,6 +85,8 @@ def process_file(path: Path) -> dict:
         "chars": len(text),
         "words": len(text.split()),
         "avg_ms": avg_ms,
+        "stdev_ms": round(timing["stdev_ms"], 2),
+        "p95_ms": round(timing["p95_ms"], 2),
         "total_units": len(units),
         "authority_distribution": authority_dist,
         "risk_distribution": risk_dist,
@@ -125,7 +127,8 @@ def print_report(results: list[dict]):
 
         print(f"\n{'─' * 70}")
         print(f"  {r['file']}")
-        print(f"  {r['chars']:,} chars | {r['words']:,} words | {r['avg_ms']}ms")
+        print(f"  {r['chars']:,} chars | {r['words']:,} words | "
+              f"{r['avg_ms']}ms median (p95 {r['p95_ms']}ms, stdev {r['stdev_ms']}ms)")
         print(f"  {r['total_units']} units | "
               f"{r['summary']['actionable']} actionable | "
               f"{r['summary']['irreducible']} irreducible | "
@@ -242,6 +245,7 @@ def main():
                 "words": r["words"],
                 "units": r["total_units"],
                 "ms": r["avg_ms"],
+                "stdev_ms": r["stdev_ms"],
                 "irreducible": r["summary"]["irreducible"],
                 "actionable": r["summary"]["actionable"],
             }
@@ -250,6 +254,7 @@ def main():
     }
 
     bench_path = root / "docs" / "benchmarks.json"
+    bench_path.parent.mkdir(exist_ok=True)
     with open(bench_path, "w") as fp:
         json.dump(benchmarks, fp, indent=2)
     print(f"Site benchmarks saved to {bench_path}")
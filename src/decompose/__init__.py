@@ -5,6 +5,17 @@ Deterministic text classification for AI agents. No LLM required.
 
 __version__ = "0.2.0"
 
-from decompose.core import decompose, decompose_text, filter_for_llm
+from decompose.batch import decompose_many
+from decompose.core import (
+    decompose,
+    decompose_file,
+    decompose_for_llm,
+    decompose_text,
+    filter_for_llm,
+    iter_decompose,
+)
 
-__all__ = ["decompose", "decompose_text", "filter_for_llm", "__version__"]
+__all__ = [
+    "decompose", "decompose_file", "decompose_for_llm", "decompose_many", "decompose_text", "filter_for_llm",
+    "iter_decompose", "__version__",
+]
@@ -0,0 +1,105 @@
+"""Per-chunk analysis — one shared scan feeding classify, entities, and irreducibility."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from decompose import classifier, irreducibility
+from decompose.classifier import (
+    AUTHORITY_PATTERNS,
+    CONTENT_TYPE_PATTERNS,
+    RISK_PATTERNS,
+    Classification,
+    _classify_totals,
+    _table_rules,
+)
+from decompose.entities import Entities, _extract_entities
+from decompose.irreducibility import IRREDUCIBLE_PATTERNS, IrreducibilityResult, _irreducibility_totals
+from decompose.rules import RuleSet
+from decompose.timing import StageTimer, clock
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+
+# Every ``entities._DOLLAR`` match is also a match of this financial risk
+# rule, and ``entities._DATE_MDY`` is the irreducibility ``date_reference``
+# rule with capture groups. When the shared scan finds neither, the entity
+# scans are skipped.
+_DOLLAR_GATE = ("entities", "dollar")
+_MDY_GATE = ("irreducibility", "date_reference")
+
+_RULES = RuleSet([
+    *_table_rules("authority", AUTHORITY_PATTERNS),
+    *_table_rules("risk", RISK_PATTERNS),
+    *_table_rules("content_type", CONTENT_TYPE_PATTERNS),
+    *((p, ("irreducibility", category)) for p, category in IRREDUCIBLE_PATTERNS),
+    (r"\$\s*[\d,]+", _DOLLAR_GATE),
+])
+
+
+# Analyzers a chunk can be run through; each may be skipped
+STAGES = ("classify", "entities", "irreducibility")
+ALL_STAGES = frozenset(STAGES)
+
+
+@dataclass(slots=True)
+class ChunkAnalysis:
+    """Classification, entities, and irreducibility of one chunk.
+
+    A stage left out of the analysis is None.
+    """
+
+    classification: Classification | None
+    entities: Entities | None
+    irreducibility: IrreducibilityResult | None
+
+
+def analyze_chunk(
+    text: str, stages: Collection[str] = ALL_STAGES, *, timer: StageTimer | None = None, chunk: int | None = None,
+) -> ChunkAnalysis:
+    """Analyze a chunk with a single rule scan.
+
+    Equivalent to calling ``classify``, ``extract_entities`` and
+    ``detect_irreducibility`` separately. The classifier matches against
+    lowercased text (capped at 50,000 chars) and irreducibility against the
+    original, so the shared scan is used when lowercasing preserves length
+    and the cap does not apply; otherwise each table is scanned on its own.
+
+    Only the tables of the given ``stages`` are scanned; the others'
+    results are None. A ``timer`` records the scan and each analyzer as
+    stages of chunk index ``chunk`` (see decompose.timing).
+    """
+    t = clock() if timer is not None else 0
+    classify = "classify" in stages
+    irreducible = "irreducibility" in stages
+    dollars = True
+    if classify and irreducible:
+        lower = text.lower()
+        if len(lower) == len(text) and len(text) < 50_000:
+            totals = _RULES.tally(lower)
+            dollars = _DOLLAR_GATE in totals
+        else:
+            totals = classifier._RULES.tally(classifier._lower(text))
+            totals.update(irreducibility._RULES.tally(text))
+    elif classify:
+        totals = classifier._RULES.tally(classifier._lower(text))
+    elif irreducible:
+        totals = irreducibility._RULES.tally(text)
+    else:
+        totals = None
+    if timer is not None and totals is not None:
+        t = timer.add("scan", t, chunk)
+
+    classification = _classify_totals(totals) if classify else None
+    if timer is not None and classify:
+        t = timer.add("classify", t, chunk)
+    entities = None
+    if "entities" in stages:
+        entities = _extract_entities(text, dollars=dollars, mdy_dates=not irreducible or _MDY_GATE in totals)
+        if timer is not None:
+            t = timer.add("entities", t, chunk)
+    result = _irreducibility_totals(totals) if irreducible else None
+    if timer is not None and irreducible:
+        timer.add("irreducibility", t, chunk)
+    return ChunkAnalysis(classification, entities, result)
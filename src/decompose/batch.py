@@ -0,0 +1,104 @@
+"""Batch decompose — many documents across a process pool, streamed as they finish."""
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from decompose.core import _unit_fields, _unit_stages, decompose_text
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from decompose.cache import AnalysisCache
+    from decompose.tokens import Tokenizer
+
+
+def _decompose_path(path: str, options: dict) -> dict:
+    """Read and decompose one file. Runs inside a worker process."""
+    try:
+        text = Path(path).read_text(encoding="utf-8", errors="replace")
+    except OSError as e:
+        result = {"units": [], "meta": {"total_units": 0, "error": "read_failed", "detail": str(e)}}
+    else:
+        result = decompose_text(text, **options)
+    return {"source": path, **result}
+
+
+def decompose_many(
+    paths: Iterable[str | os.PathLike],
+    *,
+    workers: int = 0,
+    ordered: bool = False,
+    chunk_size: int = 2000,
+    overlap: int = 200,
+    compact: bool = False,
+    cache: AnalysisCache | None = None,
+    fields: Iterable[str] | None = None,
+    text_preview: int = 0,
+    stages: Iterable[str] | None = None,
+    tokenizer: Tokenizer | None = None,
+    timings: bool = False,
+) -> Iterator[dict]:
+    """Decompose many files, yielding one result per file as each completes.
+
+    Files are read and decomposed inside worker processes, and at most two
+    documents per worker are in flight, so memory stays bounded however
+    long ``paths`` is.
+
+    Args:
+        paths: Files to decompose. May be a lazy iterable.
+        workers: Worker processes (0 = one per CPU, 1 = in this process).
+        ordered: Yield results in input order instead of completion order.
+        chunk_size: Maximum characters per chunk.
+        overlap: Character overlap between chunks.
+        compact: If True, omit zero-value fields for smaller output.
+        cache: Chunk analysis cache. Worker processes cannot share a
+            MemoryCache; use a SQLiteCache unless workers=1.
+        fields: Unit keys to build, as for decompose_text().
+        text_preview: If > 0, truncate unit 'text' to N characters.
+        stages: Analyzers to run, as for decompose_text().
+        tokenizer: Token counter for meta, as for decompose_text(). Worker
+            processes need a picklable one, such as a vocabulary path.
+        timings: Add meta 'timings' per document, as for decompose_text().
+
+    Yields:
+        decompose_text() output with an added 'source' key holding the path.
+        Unreadable files yield empty units and meta error 'read_failed'.
+    """
+    stages = _unit_stages(stages)
+    options = {
+        "chunk_size": chunk_size, "overlap": overlap, "compact": compact, "cache": cache,
+        "fields": _unit_fields(fields, stages), "text_preview": text_preview, "stages": stages,
+        "tokenizer": tokenizer, "timings": timings,
+    }
+    workers = (os.cpu_count() or 1) if workers <= 0 else workers
+
+    if workers == 1:
+        for path in paths:
+            yield _decompose_path(os.fspath(path), options)
+        return
+
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        for path in paths:
+            pending.append(pool.submit(_decompose_path, os.fspath(path), options))
+            if len(pending) >= max_pending:
+                yield from _drain(pending, ordered, until=max_pending - 1)
+        yield from _drain(pending, ordered, until=0)
+
+
+def _drain(pending: deque[Future], ordered: bool, until: int) -> Iterator[dict]:
+    """Yield finished results until at most ``until`` futures are pending."""
+    while len(pending) > until:
+        if ordered:
+            yield pending.popleft().result()
+            continue
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield future.result()
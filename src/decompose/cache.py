@@ -0,0 +1,187 @@
+"""Chunk analysis cache — content-addressed, so repeated clauses are analyzed once.
+
+A chunk's classification, entities and irreducibility depend only on its
+text and on the rule tables. Keys are a hash of both, so a cache stays
+valid across documents and is invalidated automatically when a pattern
+table or the decompose version changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from dataclasses import asdict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Protocol
+
+from decompose import entities
+from decompose.analysis import ALL_STAGES, ChunkAnalysis
+from decompose.classifier import AUTHORITY_PATTERNS, CONTENT_TYPE_PATTERNS, RISK_PATTERNS, Classification
+from decompose.entities import Entities
+from decompose.irreducibility import IRREDUCIBLE_PATTERNS, IrreducibilityResult
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable, Mapping
+
+
+class AnalysisCache(Protocol):
+    """Storage for chunk analyses keyed by ``chunk_key``."""
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, ChunkAnalysis]: ...
+
+    def set_many(self, items: Mapping[str, ChunkAnalysis]) -> None: ...
+
+
+@lru_cache(maxsize=1)
+def rules_fingerprint() -> str:
+    """Hash of every rule table and the decompose version."""
+    from decompose import __version__
+
+    tables = {
+        "version": __version__,
+        "authority": AUTHORITY_PATTERNS,
+        "risk": RISK_PATTERNS,
+        "content_type": CONTENT_TYPE_PATTERNS,
+        "irreducible": IRREDUCIBLE_PATTERNS,
+        "entities": [
+            (rx.pattern, rx.flags)
+            for rx in (
+                entities._STANDARD_INTL, entities._CFR, entities._USC, entities._DATE_MDY,
+                entities._DATE_WRITTEN, entities._DOLLAR, entities._PERCENT,
+            )
+        ],
+    }
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def chunk_key(text: str, stages: Collection[str] = ALL_STAGES) -> str:
+    """Cache key for a chunk: hash of the rules fingerprint and the chunk text.
+
+    An analysis of fewer than all stages is keyed by its stages as well.
+    """
+    h = hashlib.sha256(rules_fingerprint().encode())
+    if not ALL_STAGES.issubset(stages):
+        h.update(("stages=" + ",".join(sorted(stages)) + "\0").encode())
+    h.update(text.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class MemoryCache:
+    """In-process LRU cache holding at most ``max_entries`` analyses."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, ChunkAnalysis] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, ChunkAnalysis]:
+        found = {}
+        for key in keys:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+                found[key] = analysis
+        return found
+
+    def set_many(self, items: Mapping[str, ChunkAnalysis]) -> None:
+        for key, analysis in items.items():
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCache:
+    """On-disk cache in a SQLite database, shareable across processes and runs.
+
+    When ``max_entries`` is set, the oldest entries are evicted first.
+    Instances pickle by path, so one can be handed to worker processes.
+    """
+
+    _BATCH = 500  # stays under SQLite's bound-parameter limit
+
+    def __init__(self, path: str, max_entries: int | None = None):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: sqlite3.Connection | None = None
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"], state["max_entries"])
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, ChunkAnalysis]:
+        conn = self._connect()
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), self._BATCH):
+            batch = keys[i : i + self._BATCH]
+            rows = conn.execute(
+                f"SELECT key, value FROM analyses WHERE key IN ({','.join('?' * len(batch))})", batch,
+            )
+            for key, value in rows:
+                found[key] = _loads(value)
+        return found
+
+    def set_many(self, items: Mapping[str, ChunkAnalysis]) -> None:
+        if not items:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO analyses (key, value) VALUES (?, ?)",
+                [(key, _dumps(analysis)) for key, analysis in items.items()],
+            )
+            if self.max_entries is not None:
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete all but the newest ``max_entries`` rows, if there are more.
+
+        The rowid span bounds the row count from above in O(log n), so a
+        table under the limit is never scanned; past it, the cutoff is found
+        on the rowid index and only the evicted rows are touched.
+        """
+        low, high = conn.execute("SELECT MIN(rowid), MAX(rowid) FROM analyses").fetchone()
+        if low is None or high - low < self.max_entries:
+            return
+        row = conn.execute(
+            "SELECT rowid FROM analyses ORDER BY rowid DESC LIMIT 1 OFFSET ?", (self.max_entries,),
+        ).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM analyses WHERE rowid <= ?", row)
+
+
+def _dumps(analysis: ChunkAnalysis) -> str:
+    return json.dumps(asdict(analysis), separators=(",", ":"))
+
+
+def _loads(value: str) -> ChunkAnalysis:
+    d = json.loads(value)
+    cls, ents, irr = d["classification"], d["entities"], d["irreducibility"]
+    return ChunkAnalysis(
+        classification=Classification(**cls) if cls is not None else None,
+        entities=Entities(**ents) if ents is not None else None,
+        irreducibility=IrreducibilityResult(**irr) if irr is not None else None,
+    )
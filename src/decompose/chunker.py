@@ -4,92 +4,296 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
+from itertools import chain
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from decompose.mapped import MappedText
 
 DEFAULT_CHUNK_SIZE = 2000
 DEFAULT_OVERLAP = 200
 
+# Sentence/paragraph separators in break priority order, and how far back
+# from the size limit a break is searched for
+BREAK_SEPARATORS = (". ", ".\n", "! ", "? ", "\n\n")
+BREAK_WINDOW = 150
+
+
+_NON_SPACE = re.compile(r"\S")
+_HEADER = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
+# A header line whose text may still follow (its \s+ can span lines)
+_HEADER_PENDING = re.compile(r"^#{1,6}\s*\Z", re.MULTILINE)
+_HEADER_START = re.compile(r"^#{1,6}\s+", re.MULTILINE)
+
 
 @dataclass(slots=True)
 class Chunk:
+    """A span of a source text. ``text`` is sliced out only when read.
+
+    ``text_start``/``text_end`` bound the whitespace-stripped chunk text in
+    ``source``; ``start``/``end`` are the unstripped span that was cut.
+    """
+
     chunk_id: int
-    text: str
+    source: str = field(repr=False, compare=False)
+    text_start: int
+    text_end: int
     start: int
     end: int
-    word_count: int
     char_count: int
     heading: str | None = None
     heading_level: int = 0
     heading_path: list[str] = field(default_factory=list)
 
+    @property
+    def text(self) -> str:
+        return self.source[self.text_start : self.text_end]
+
+    @property
+    def word_count(self) -> int:
+        return len(self.text.split())
+
+
+def _strip_span(text: str | MappedText, lo: int, hi: int) -> tuple[int, int]:
+    """Bounds of ``text[lo:hi].strip()`` within ``text``, without copying."""
+    if not isinstance(text, str):
+        return text.strip_span(lo, hi)
+    m = _NON_SPACE.search(text, lo, hi)
+    if m is None:
+        return (hi, hi)
+    lo = m.start()
+    while text[hi - 1].isspace():
+        hi -= 1
+    return (lo, hi)
+
+
+def _spaced(text: str | MappedText) -> str | MappedText:
+    """Text with non-breaking spaces read as plain spaces (same length)."""
+    return text.replace("\u00a0", " ") if isinstance(text, str) else text.with_spaces()
+
 
 def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP) -> list[Chunk]:
     """Split text into overlapping chunks, breaking at sentence boundaries."""
-    text = text.replace("\u00a0", " ")
-    if not text.strip():
-        return []
-
-    if len(text) <= chunk_size:
-        stripped = text.strip()
-        return [Chunk(
-            chunk_id=1, text=stripped, start=0, end=len(text),
-            word_count=len(stripped.split()), char_count=len(text),
-        )]
-
-    chunks: list[Chunk] = []
-    start = 0
+    return list(iter_chunk_text(text, chunk_size, overlap))
+
+
+def iter_chunk_text(
+    text: str | MappedText, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP,
+) -> Iterator[Chunk]:
+    """Lazily yield the chunks of chunk_text(). ``text`` may be a MappedText."""
+    text = _spaced(text)
+    return _iter_span_chunks(text, 0, len(text), chunk_size, overlap)
+
+
+def _iter_span_chunks(
+    text: str | MappedText, lo: int, hi: int, chunk_size: int, overlap: int,
+) -> Iterator[Chunk]:
+    """Chunk ``text[lo:hi]`` in place. ``start``/``end`` are relative to ``lo``.
+
+    For a MappedText each chunk's source is the decoded window around it,
+    and ``text_start``/``text_end`` are offsets into that window.
+    """
+    if _strip_span(text, lo, hi)[0] == hi:
+        return
+
+    buf, base = (text, 0) if isinstance(text, str) else (None, 0)
+
+    if hi - lo <= chunk_size:
+        if buf is None:
+            buf, base = text.window(lo, hi)
+        a, b = _strip_span(buf, lo - base, hi - base)
+        yield Chunk(chunk_id=1, source=buf, text_start=a, text_end=b, start=0, end=hi - lo, char_count=hi - lo)
+        return
+
+    start = lo
     cid = 1
 
-    while start < len(text):
-        end = min(start + chunk_size, len(text))
+    while start < hi:
+        end = min(start + chunk_size, hi)
+        if not isinstance(text, str):
+            buf, base = text.window(start, end)
 
         # Find a sentence boundary to break at
-        if end < len(text):
-            window = text[max(end - 150, start) : end]
-            for sep in (". ", ".\n", "! ", "? ", "\n\n"):
-                idx = window.rfind(sep)
-                if idx > -1:
-                    end = max(end - 150, start) + idx + len(sep)
-                    break
-
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(Chunk(
-                chunk_id=cid, text=chunk, start=start, end=end,
-                word_count=len(chunk.split()), char_count=len(chunk),
-            ))
+        if end < hi:
+            brk = _find_break(buf, max(end - BREAK_WINDOW, start) - base, end - base)
+            end = brk + base if brk else end
+
+        a, b = _strip_span(buf, start - base, end - base)
+        if a < b:
+            yield Chunk(
+                chunk_id=cid, source=buf, text_start=a, text_end=b,
+                start=start - lo, end=end - lo, char_count=b - a,
+            )
             cid += 1
 
-        if end >= len(text):
+        if end >= hi:
             break
-        start = end - overlap
-
-    return chunks
+        # A break found early in a small chunk could leave the overlap
+        # reaching back past this chunk's start; skip the overlap instead
+        # of re-reading the same span forever.
+        start = end - overlap if end - overlap > start else end
+
+
+class TextStreamChunker:
+    """auto_chunk() over text that arrives in pieces.
+
+    ``feed()`` returns the texts of the chunks that the text so far
+    settles, and ``close()`` the rest. A chunk is settled once the text is
+    known to continue past its size limit (so its sentence break is
+    decided) or past the next Markdown header. Only the text from the
+    current chunk on is kept.
+
+    Text without headers gives exactly chunk_text()'s chunk texts. From the
+    first header on, text is chunked by sections as chunk_markdown() would.
+    Text before the first header has by then been cut as plain text, which
+    agrees with chunk_markdown() when the text starts with a non-space.
+    """
+
+    __slots__ = ("chunk_size", "overlap", "markdown", "_buf", "_prev", "_scan", "_fresh")
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP):
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.markdown = False  # a header has been seen
+        self._buf = ""  # text from the current chunk's start on
+        self._prev = "\n"  # the character before _buf, so ^ matches only at real line starts
+        self._scan = 0  # where in _buf the next header can start
+        self._fresh = True  # nothing has been cut from the current span (section) yet
+
+    def feed(self, text: str) -> list[str]:
+        self._buf += text
+        return self._cut(final=False)
+
+    def close(self) -> list[str]:
+        return self._cut(final=True)
+
+    def _cut(self, final: bool) -> list[str]:
+        out: list[str] = []
+        while True:
+            context = self._prev + self._buf
+            m = _HEADER.search(context, self._scan + 1)
+            # Header text that is all whitespace so far can still move to a later line
+            if m is None or (not final and m.group(2).isspace()):
+                break
+            # The current span ends where the header starts; a new section begins
+            start = m.start() - 1
+            self.markdown = True
+            out += self._cut_span(start, final=True)
+            self._prev = "\n"
+            self._buf = self._buf[start:]
+            self._scan = m.end() - 1 - start
+            self._fresh = True
+
+        if final:
+            out += self._cut_span(len(self._buf), final=True)
+            self._buf = ""
+            return out
+
+        # A header may still complete at the end, ending the span there
+        pending = _HEADER_PENDING.search(context, self._scan + 1)
+        limit = pending.start() - 1 if pending else len(self._buf)
+        self._scan = limit if pending else max(self._buf.rfind("\n") + 1, self._scan)
+        while limit > 0 and self._buf[limit - 1].isspace():
+            limit -= 1
+        out += self._cut_span(limit, final=False)
+        return out
+
+    def _cut_span(self, hi: int, final: bool) -> list[str]:
+        """Cut the current span's settled chunks; it ends at ``hi``, or past it unless final.
+
+        Mirrors _iter_span_chunks(), and iter_chunk_markdown() for sections.
+        """
+        buf = self._buf
+        spaced = buf.replace("\u00a0", " ")
+        size = self.chunk_size
+        start = 0
+        if self.markdown and final:
+            # Sections are cut from their stripped bounds
+            a, hi = _strip_span(buf, 0, hi)
+            start = a if self._fresh else 0
+        if final and self._fresh and hi - start <= size:
+            # A span within the size limit is one chunk; a section keeps its
+            # non-breaking spaces, plain text does not
+            a, b = _strip_span(buf, start, hi)
+            return [(buf if self.markdown else spaced)[a:b]] if a < b else []
+
+        out = []
+        while start < hi:
+            end = start + size
+            if end < hi:
+                brk = _find_break(spaced, max(end - BREAK_WINDOW, start), end)
+                end = brk if brk else end
+            elif final:
+                end = hi
+            else:
+                break
+
+            a, b = _strip_span(spaced, start, end)
+            if a < b:
+                out.append(spaced[a:b])
+            self._fresh = False
+            if end >= hi:
+                break
+            start = end - self.overlap if end - self.overlap > start else end
+
+        if not final and start:
+            self._prev = buf[start - 1]
+            self._buf = buf[start:]
+            self._scan = max(self._scan - start, 0)
+        return out
+
+
+def _find_break(text: str, lo: int, hi: int) -> int | None:
+    """End offset just past the last separator inside ``text[lo:hi]``.
+
+    Separators are tried in priority order; the first kind present wins.
+    Searches the source string in place, without slicing out the window.
+    Returns None when no separator lies fully inside the window.
+    """
+    for sep in BREAK_SEPARATORS:
+        idx = text.rfind(sep, lo, hi)
+        if idx > -1:
+            return idx + len(sep)
+    return None
 
 
 def _parse_markdown_sections(text: str) -> list[dict]:
     """Parse markdown into sections delimited by ATX headers."""
-    header_re = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
-    matches = list(header_re.finditer(text))
+    return [{**sec, "text": text[sec["start"] : sec["end"]]} for sec in _iter_markdown_sections(text)]
+
 
-    if not matches:
-        return [{"heading": None, "level": 0, "parent": None, "path": [],
-                 "text": text, "start": 0, "end": len(text)}]
+def _iter_markdown_sections(text: str | MappedText) -> Iterator[dict]:
+    """Lazily yield the sections of _parse_markdown_sections(), as offsets only."""
+    if isinstance(text, str):
+        matches = ((m.start(), m.group(1), m.group(2)) for m in _HEADER.finditer(text))
+    else:
+        matches = (
+            (base + m.start(), m.group(1), m.group(2))
+            for base, m in text.finditer(_HEADER, _HEADER_PENDING)
+        )
+
+    current = next(matches, None)
+    if current is None:
+        yield {"heading": None, "level": 0, "parent": None, "path": [], "start": 0, "end": len(text)}
+        return
 
-    sections = []
     stack: list[tuple[int, str]] = []
 
     # Preamble before first header
-    if matches[0].start() > 0:
-        pre = text[: matches[0].start()]
-        if pre.strip():
-            sections.append({"heading": None, "level": 0, "parent": None, "path": [],
-                             "text": pre, "start": 0, "end": matches[0].start()})
-
-    for i, m in enumerate(matches):
-        level = len(m.group(1))
-        heading = m.group(2).strip()
-        sec_start = m.start()
-        sec_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+    if current[0] > 0:
+        pre_end = current[0]
+        if _strip_span(text, 0, pre_end)[0] < pre_end:
+            yield {"heading": None, "level": 0, "parent": None, "path": [], "start": 0, "end": pre_end}
+
+    # Headers are read one ahead, to know where each section ends
+    while current is not None:
+        sec_start, hashes, heading = current
+        following = next(matches, None)
+        level = len(hashes)
+        heading = heading.strip()
+        sec_end = following[0] if following is not None else len(text)
 
         while stack and stack[-1][0] >= level:
             stack.pop()
@@ -98,56 +302,74 @@ def _parse_markdown_sections(text: str) -> list[dict]:
         path = [h for _, h in stack] + [heading]
         stack.append((level, heading))
 
-        sections.append({
+        yield {
             "heading": heading, "level": level, "parent": parent, "path": path,
-            "text": text[sec_start:sec_end], "start": sec_start, "end": sec_end,
-        })
-
-    return sections
+            "start": sec_start, "end": sec_end,
+        }
+        current = following
 
 
 def chunk_markdown(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP) -> list[Chunk]:
     """Split markdown by header boundaries, sub-chunking oversized sections."""
-    if not text.strip():
-        return []
+    return list(iter_chunk_markdown(text, chunk_size, overlap))
 
-    sections = _parse_markdown_sections(text)
 
-    if len(sections) == 1 and sections[0]["level"] == 0:
-        return chunk_text(text, chunk_size, overlap)
+def iter_chunk_markdown(
+    text: str | MappedText, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP,
+) -> Iterator[Chunk]:
+    """Lazily yield the chunks of chunk_markdown(). ``text`` may be a MappedText."""
+    if _strip_span(text, 0, len(text))[0] == len(text):
+        return
 
-    chunks: list[Chunk] = []
+    sections = _iter_markdown_sections(text)
+    first = next(sections)
+
+    # A level-0 section spanning the whole text means there are no headers
+    if first["level"] == 0 and first["end"] == len(text):
+        yield from iter_chunk_text(text, chunk_size, overlap)
+        return
+
+    # Oversized sections are sub-chunked like chunk_text(), which reads
+    # non-breaking spaces as plain spaces. Same length, so offsets agree.
+    spaced = _spaced(text)
     cid = 1
 
-    for sec in sections:
-        sec_text = sec["text"].strip()
-        if not sec_text:
+    for sec in chain([first], sections):
+        a, b = _strip_span(text, sec["start"], sec["end"])
+        if a == b:
             continue
 
-        if len(sec_text) <= chunk_size:
-            chunks.append(Chunk(
-                chunk_id=cid, text=sec_text, start=sec["start"], end=sec["end"],
-                word_count=len(sec_text.split()), char_count=len(sec_text),
-                heading=sec["heading"], heading_level=sec["level"], heading_path=sec["path"],
-            ))
+        if b - a <= chunk_size:
+            buf, base = (text, 0) if isinstance(text, str) else text.window(a, b)
+            yield Chunk(
+                chunk_id=cid, source=buf, text_start=a - base, text_end=b - base,
+                start=sec["start"], end=sec["end"],
+                char_count=b - a, heading=sec["heading"], heading_level=sec["level"], heading_path=sec["path"],
+            )
             cid += 1
         else:
-            sub = chunk_text(sec_text, chunk_size, overlap)
-            for sc in sub:
+            for sc in _iter_span_chunks(spaced, a, b, chunk_size, overlap):
                 sc.chunk_id = cid
                 sc.start += sec["start"]
                 sc.end = sc.start + sc.char_count
                 sc.heading = sec["heading"]
                 sc.heading_level = sec["level"]
                 sc.heading_path = sec["path"]
-                chunks.append(sc)
+                yield sc
                 cid += 1
 
-    return chunks
-
 
 def auto_chunk(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP) -> list[Chunk]:
     """Auto-detect format and chunk accordingly."""
-    if re.search(r"^#{1,6}\s+", text, re.MULTILINE):
-        return chunk_markdown(text, chunk_size, overlap)
-    return chunk_text(text, chunk_size, overlap)
+    return list(iter_auto_chunk(text, chunk_size, overlap))
+
+
+def iter_auto_chunk(
+    text: str | MappedText, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP,
+) -> Iterator[Chunk]:
+    """Lazily yield the chunks of auto_chunk(). ``text`` may be a MappedText."""
+    # In a MappedText a match is at most 7 chars after the newline before it
+    markdown = _HEADER_START.search(text) is not None if isinstance(text, str) else text.search(_HEADER_START, 8)
+    if markdown:
+        return iter_chunk_markdown(text, chunk_size, overlap)
+    return iter_chunk_text(text, chunk_size, overlap)
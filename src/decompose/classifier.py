@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 
+from decompose.rules import RuleSet
+
 # ── Authority patterns ────────────────────────────────────────────
 # Universal language-level patterns. "shall" means mandatory in every
 # industry, every document type. These are language constructs, not
@@ -124,18 +125,31 @@ class Classification:
     attention: float = 0.0
 
 
-def _score_patterns(text: str, patterns: dict[str, dict | list[str]], use_weight: bool = False) -> tuple[str, float]:
-    """Score text against a pattern dict. Returns (top_label, score)."""
-    scores: dict[str, float] = {}
-    text_lower = text.lower() if len(text) < 50_000 else text[:50_000].lower()
-
+def _table_rules(table: str, patterns: dict[str, dict | list[str]]):
     for label, value in patterns.items():
         pats = value["patterns"] if isinstance(value, dict) else value
-        weight = value.get("weight", 1.0) if isinstance(value, dict) else 1.0
-        count = 0
         for p in pats:
-            count += len(re.findall(p, text_lower, re.IGNORECASE))
+            yield (p, (table, label))
+
+
+# All three tables compiled into one ruleset: a chunk is scanned once, not
+# once per pattern. Patterns shared between tables are matched once.
+_RULES = RuleSet([
+    *_table_rules("authority", AUTHORITY_PATTERNS),
+    *_table_rules("risk", RISK_PATTERNS),
+    *_table_rules("content_type", CONTENT_TYPE_PATTERNS),
+])
+
+
+def _top_label(
+    totals: dict, table: str, patterns: dict[str, dict | list[str]], use_weight: bool = False,
+) -> tuple[str, float]:
+    """Pick the top label of one table from ruleset totals. Returns (top_label, score)."""
+    scores: dict[str, float] = {}
+    for label, value in patterns.items():
+        count = totals.get((table, label), 0)
         if count > 0:
+            weight = value.get("weight", 1.0) if isinstance(value, dict) else 1.0
             scores[label] = count * weight
 
     if not scores:
@@ -145,11 +159,20 @@ def _score_patterns(text: str, patterns: dict[str, dict | list[str]], use_weight
     return (top, scores[top])
 
 
+def _lower(text: str) -> str:
+    return text.lower() if len(text) < 50_000 else text[:50_000].lower()
+
+
 def classify(text: str) -> Classification:
     """Classify a text passage. Pure regex, no LLM, deterministic."""
-    authority, auth_score = _score_patterns(text, AUTHORITY_PATTERNS, use_weight=True)
-    risk, risk_score = _score_patterns(text, RISK_PATTERNS)
-    content_type, _ = _score_patterns(text, CONTENT_TYPE_PATTERNS)
+    return _classify_totals(_RULES.tally(_lower(text)))
+
+
+def _classify_totals(totals: dict) -> Classification:
+    """Build a Classification from ``(table, label)`` match totals."""
+    authority, auth_score = _top_label(totals, "authority", AUTHORITY_PATTERNS, use_weight=True)
+    risk, risk_score = _top_label(totals, "risk", RISK_PATTERNS)
+    content_type, _ = _top_label(totals, "content_type", CONTENT_TYPE_PATTERNS)
 
     # Attention score: risk multiplier * normalized authority score
     risk_mult = {
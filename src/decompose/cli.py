@@ -1,4 +1,7 @@
-"""CLI — decompose from the command line. Stdin or --text, stdout JSON."""
+"""CLI — decompose from the command line. Stdin, --text, --file, or a batch of files; stdout JSON.
+
+``decompose profile PATH...`` instead ranks the rule-table regexes by cost (see decompose.profile).
+"""
 
 from __future__ import annotations
 
@@ -6,20 +9,59 @@ import argparse
 import asyncio
 import json
 import sys
+from pathlib import Path
 
-from decompose.core import decompose_text
+from decompose.core import STAGES, UNIT_FIELDS, _unit_fields, _unit_stages, decompose_text
 
 
 def main():
+    if sys.argv[1:2] == ["profile"]:
+        _run_profile(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         prog="decompose",
         description="Stop prompting. Start decomposing. Structured intelligence from any text.",
     )
     parser.add_argument("--text", "-t", help="Text to decompose (or pipe via stdin)")
+    parser.add_argument("--file", "-f", metavar="PATH",
+                        help="UTF-8 file to decompose, memory-mapped and streamed (no size limit)")
     parser.add_argument("--compact", "-c", action="store_true", help="Compact output (omit zero-value fields)")
+    parser.add_argument("--fields", type=_field_list, metavar="A,B,...",
+                        help=f"Only these unit fields; others are not included (analyzers still run unless --stages) "
+                             f"({', '.join(UNIT_FIELDS)})")
+    parser.add_argument("--text-preview", type=int, default=0, metavar="N",
+                        help="Truncate unit text to N characters (default: 0, full text)")
+    parser.add_argument("--stages", type=_stage_list, metavar="A,B,...",
+                        help=f"Only these analyzers; the fields of the others are omitted ({', '.join(STAGES)})")
+    parser.add_argument("--tokenizer", metavar="PATH",
+                        help="BPE vocabulary file (tiktoken format) for exact meta token counts "
+                             "(default: ~4 chars per token)")
+    parser.add_argument("--timings", action="store_true",
+                        help="Add per-stage nanosecond timings to meta (meta.timings)")
     parser.add_argument("--chunk-size", type=int, default=2000, help="Max characters per unit (default: 2000)")
+    parser.add_argument("--workers", "-w", type=int,
+                        help="Worker processes (0 = one per CPU; default: 1, or one per CPU in batch mode). "
+                             "With --serve: tool calls run at once (default: 4)")
+    parser.add_argument("--input-dir", "-d", help="Decompose every file in this directory (JSON Lines output)")
+    parser.add_argument("--glob", "-g",
+                        help="File pattern for batch mode, relative to --input-dir or the current directory "
+                             "(default with --input-dir: **/*)")
+    parser.add_argument("--per-unit", action="store_true", help="Batch mode: one JSON line per unit, not per file")
+    parser.add_argument("--cache", metavar="PATH", help="SQLite file caching chunk analyses across runs")
     parser.add_argument("--pretty", "-p", action="store_true", help="Pretty-print JSON output")
     parser.add_argument("--serve", action="store_true", help="Run as MCP server (stdio)")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread",
+                        help="With --serve: run tool calls in threads or processes (default: thread)")
+    parser.add_argument("--max-queue", type=int, default=32,
+                        help="With --serve: calls that may wait for a worker before new ones are rejected "
+                             "(default: 32)")
+    parser.add_argument("--url-cache-mb", type=int, default=64,
+                        help="With --serve: size of the decompose_url page cache in MB of text (0 = off; default: 64)")
+    parser.add_argument("--url-ttl", type=float, default=300,
+                        help="With --serve: seconds a cached page is served before revalidation (default: 300)")
+    parser.add_argument("--result-cache-mb", type=int, default=32,
+                        help="With --serve: MB of unit text kept for decompose_page paging (0 = off; default: 32)")
     parser.add_argument("--version", "-v", action="store_true", help="Print version")
 
     args = parser.parse_args()
@@ -31,7 +73,22 @@ def main():
 
     if args.serve:
         from decompose.mcp_server import serve
-        asyncio.run(serve())
+        workers = 4 if args.workers is None else args.workers
+        asyncio.run(serve(
+            workers=workers, pool=args.pool, max_queue=args.max_queue,
+            url_cache_chars=args.url_cache_mb * 1_000_000, url_ttl=args.url_ttl,
+            result_cache_chars=args.result_cache_mb * 1_000_000,
+        ))
+        return
+
+    if args.input_dir or args.glob:
+        _run_batch(args)
+        return
+
+    if args.file:
+        if args.tokenizer:
+            parser.error("--tokenizer is not supported with --file")
+        _run_file(args)
         return
 
     # Get text from --text flag or stdin
@@ -43,7 +100,11 @@ def main():
         parser.print_help()
         sys.exit(1)
 
-    result = decompose_text(text, compact=args.compact, chunk_size=args.chunk_size)
+    workers = 1 if args.workers is None else args.workers
+    result = decompose_text(
+        text, chunk_size=args.chunk_size, workers=workers, cache=_cache(args), tokenizer=args.tokenizer,
+        **_unit_options(args),
+    )
 
     indent = 2 if args.pretty else None
     json.dump(result, sys.stdout, indent=indent)
@@ -51,5 +112,150 @@ def main():
         sys.stdout.write("\n")
 
 
+def _field_list(value: str) -> tuple[str, ...]:
+    try:
+        return _unit_fields(name.strip() for name in value.split(",") if name.strip())
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _stage_list(value: str) -> frozenset[str]:
+    try:
+        return _unit_stages(name.strip() for name in value.split(",") if name.strip())
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _unit_options(args) -> dict:
+    return {
+        "compact": args.compact, "fields": args.fields, "text_preview": max(0, args.text_preview),
+        "stages": args.stages, "timings": args.timings,
+    }
+
+
+def _cache(args):
+    if not args.cache:
+        return None
+    from decompose.cache import SQLiteCache
+    return SQLiteCache(args.cache)
+
+
+def _run_file(args):
+    """Decompose one file out-of-core, writing the JSON document unit by unit.
+
+    Output is byte-identical to dumping decompose_file()'s result.
+    """
+    from decompose.core import iter_decompose
+
+    try:
+        stream = iter_decompose(
+            Path(args.file), chunk_size=args.chunk_size, cache=_cache(args), **_unit_options(args),
+        )
+    except OSError as e:
+        print(f"decompose: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    indent = 2 if args.pretty else None
+    if args.pretty:
+        opening, separator, closing = '{\n  "units": [\n    ', ",\n    ", '\n  ],\n  "meta": '
+        empty = '{\n  "units": [],\n  "meta": '
+    else:
+        opening, separator, closing = '{"units": [', ", ", '], "meta": '
+        empty = '{"units": [], "meta": '
+
+    def dump(obj, depth: int) -> str:
+        text = json.dumps(obj, indent=indent)
+        return text.replace("\n", "\n" + "  " * depth) if indent else text
+
+    out = sys.stdout
+    count = 0
+    for unit in stream:
+        out.write(separator if count else opening)
+        out.write(dump(unit, 2))
+        count += 1
+    out.write(closing if count else empty)
+    out.write(dump(stream.meta, 1))
+    out.write("\n}" if indent else "}")
+    if out.isatty():
+        out.write("\n")
+
+
+def _run_batch(args):
+    """Decompose a directory or glob of files, streaming JSON Lines to stdout."""
+    from decompose.batch import decompose_many
+
+    root = Path(args.input_dir or ".")
+    paths = sorted(p for p in root.glob(args.glob or "**/*") if p.is_file())
+
+    results = decompose_many(
+        paths, workers=args.workers or 0, chunk_size=args.chunk_size, cache=_cache(args), tokenizer=args.tokenizer,
+        **_unit_options(args),
+    )
+    for result in results:
+        if args.per_unit:
+            for i, unit in enumerate(result["units"]):
+                json.dump({"source": result["source"], "unit": i, **unit}, sys.stdout)
+                sys.stdout.write("\n")
+        else:
+            json.dump(result, sys.stdout)
+            sys.stdout.write("\n")
+        sys.stdout.flush()
+
+
+def _run_profile(argv: list[str]):
+    """Rank rule-table patterns by their scan time over files or stdin."""
+    from decompose.profile import ORDERS, profile_rules
+
+    parser = argparse.ArgumentParser(
+        prog="decompose profile",
+        description="Attribute rule-scan time and matches to each regex and table, most expensive first.",
+    )
+    parser.add_argument("paths", nargs="*", type=Path, help="UTF-8 files to profile (default: stdin)")
+    parser.add_argument("--glob", "-g", help="Profile every file matching this pattern (relative to the current "
+                                             "directory) as well")
+    parser.add_argument("--top", type=int, default=20, help="Patterns to list (0 = all; default: 20)")
+    parser.add_argument("--by", choices=ORDERS, default="ns",
+                        help="Rank by time in the production scan (ns), as a standalone findall (standalone_ns), "
+                             "matches or calls (default: ns)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Passes over the corpus; each pattern keeps its fastest (default: 3)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Max characters per unit (default: 2000)")
+    parser.add_argument("--json", action="store_true", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    documents: list = list(args.paths)
+    if args.glob:
+        documents += sorted(p for p in Path(".").glob(args.glob) if p.is_file())
+    if not documents:
+        if sys.stdin.isatty():
+            parser.error("give files to profile, --glob, or text on stdin")
+        documents = [sys.stdin.read()]
+
+    try:
+        profile = profile_rules(documents, chunk_size=args.chunk_size, repeat=args.repeat)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"decompose: {e}", file=sys.stderr)
+        sys.exit(1)
+    report = profile.to_dict(top=args.top or None, by=args.by)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+
+    out = sys.stdout
+    print(f"{report['documents']} document(s), {report['chunks']} chunks, {report['chars']:,} chars; "
+          f"rule scans {report['ns_per_mb'] / 1e6:,.1f} ms/MB "
+          f"(clock overhead of {report['clock_overhead_ns']} ns per timed call subtracted)\n", file=out)
+    print(f"{'table':<16}{'patterns':>9}{'matches':>9}{'ms/MB':>10}{'alone':>10}{'share':>8}", file=out)
+    for table, t in report["tables"].items():
+        print(f"{table:<16}{t['patterns']:>9}{t['matches']:>9}{t['ns_per_mb'] / 1e6:>10.2f}"
+              f"{t['standalone_ns_per_mb'] / 1e6:>10.2f}{t['share']:>8.1%}", file=out)
+    print(f"\n{'ms/MB':>8}{'alone':>9}{'share':>8}{'calls':>9}{'matches':>9}  {'table/label':<35} pattern", file=out)
+    for p in report["patterns"]:
+        keys = ", ".join(f"{table}/{label}" for table, label in p["keys"])
+        print(f"{p['ns_per_mb'] / 1e6:>8.2f}{p['standalone_ns_per_mb'] / 1e6:>9.2f}{p['share']:>8.1%}"
+              f"{p['calls']:>9}{p['matches']:>9}  {keys:<35} {p['pattern']}", file=out)
+
+
 if __name__ == "__main__":
     main()
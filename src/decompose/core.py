@@ -2,14 +2,29 @@
 
 from __future__ import annotations
 
+import heapq
 import json
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
 
-from decompose.chunker import auto_chunk
-from decompose.classifier import classify
-from decompose.entities import extract_entities
-from decompose.irreducibility import detect_irreducibility
+from decompose.analysis import ALL_STAGES, STAGES, ChunkAnalysis, analyze_chunk
+from decompose.cache import AnalysisCache, chunk_key
+from decompose.chunker import Chunk, auto_chunk, iter_auto_chunk
+from decompose.mapped import MappedText
+from decompose.timing import SpanHook, StageTimer, clock, stage_timer
+from decompose.tokens import TokenCounter, Tokenizer, token_counter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+MAX_INPUT = 10_000_000  # 10 MB
+
+# Below this input size process startup costs more than it saves
+PARALLEL_MIN_CHARS = 250_000
 
 
 @dataclass(slots=True)
@@ -36,12 +51,232 @@ class DecomposeResult:
     meta: dict = field(default_factory=dict)
 
 
+# Keys a unit can carry, in output order. fields= projects units onto a subset.
+UNIT_FIELDS = (
+    "text", "authority", "risk", "type", "irreducible", "attention", "actionable",
+    "entities", "dates", "financial", "irreducibility", "heading", "heading_path",
+)
+
+# Lists are copied: a cached analysis may back many units
+_FIELD_VALUES: dict[str, Callable[[Chunk, str, ChunkAnalysis], object]] = {
+    "text": lambda chunk, text, a: text,
+    "authority": lambda chunk, text, a: a.classification.authority,
+    "risk": lambda chunk, text, a: a.classification.risk,
+    "type": lambda chunk, text, a: a.classification.content_type,
+    "irreducible": lambda chunk, text, a: a.irreducibility.irreducible,
+    "attention": lambda chunk, text, a: a.classification.attention,
+    "actionable": lambda chunk, text, a: a.classification.actionable,
+    "entities": lambda chunk, text, a: a.entities.standards + a.entities.references,
+    "dates": lambda chunk, text, a: list(a.entities.dates),
+    "financial": lambda chunk, text, a: list(a.entities.financial),
+    "irreducibility": lambda chunk, text, a: a.irreducibility.recommendation,
+    "heading": lambda chunk, text, a: chunk.heading,
+    "heading_path": lambda chunk, text, a: chunk.heading_path,
+}
+
+# Unit keys each analysis stage produces; skipping a stage omits them
+STAGE_FIELDS = {
+    "classify": ("authority", "risk", "type", "attention", "actionable"),
+    "entities": ("entities", "dates", "financial"),
+    "irreducibility": ("irreducible", "irreducibility"),
+}
+
+# Values compact units leave out
+_COMPACT_DEFAULTS = {
+    "actionable": False, "entities": [], "dates": [], "financial": [], "irreducibility": "SUMMARIZABLE",
+}
+
+
+def _unit_fields(fields: Iterable[str] | None, stages: frozenset[str] = ALL_STAGES) -> tuple[str, ...] | None:
+    """Validate a fields= projection, in UNIT_FIELDS order, less the fields of skipped stages.
+
+    None keeps every field.
+    """
+    if fields is None and stages == ALL_STAGES:
+        return None
+    wanted = set(UNIT_FIELDS if fields is None else fields)
+    unknown = wanted.difference(UNIT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown unit fields: {', '.join(sorted(unknown))}")
+    for stage in ALL_STAGES.difference(stages):
+        wanted.difference_update(STAGE_FIELDS[stage])
+    return tuple(f for f in UNIT_FIELDS if f in wanted)
+
+
+def _unit_stages(stages: Iterable[str] | None) -> frozenset[str]:
+    """Validate a stages= selection. None runs every stage."""
+    if stages is None:
+        return ALL_STAGES
+    chosen = frozenset(stages)
+    unknown = chosen.difference(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+    return chosen
+
+
+def _build_unit(
+    chunk: Chunk, text: str, analysis: ChunkAnalysis, compact: bool,
+    fields: tuple[str, ...] | None = None, preview: int = 0,
+) -> dict:
+    """Build the output dict for one chunk, whose text the caller has already sliced."""
+    if preview:
+        text = text[:preview]
+    if fields is not None:
+        return _project_unit(chunk, text, analysis, compact, fields)
+
+    cls = analysis.classification
+    ents = analysis.entities
+    irr = analysis.irreducibility
+
+    # Build entity list (standards + references combined)
+    entity_list = ents.standards + ents.references
+
+    unit: dict = {
+        "text": text,
+        "authority": cls.authority,
+        "risk": cls.risk,
+        "type": cls.content_type,
+        "irreducible": irr.irreducible,
+        "attention": cls.attention,
+    }
+
+    # Lists are copied: a cached analysis may back many units
+    if not compact:
+        unit["actionable"] = cls.actionable
+        unit["entities"] = entity_list
+        unit["dates"] = list(ents.dates)
+        unit["financial"] = list(ents.financial)
+        unit["irreducibility"] = irr.recommendation
+        if chunk.heading:
+            unit["heading"] = chunk.heading
+            unit["heading_path"] = chunk.heading_path
+    else:
+        # Compact: only include non-empty/non-default fields
+        if cls.actionable:
+            unit["actionable"] = True
+        if entity_list:
+            unit["entities"] = entity_list
+        if ents.dates:
+            unit["dates"] = list(ents.dates)
+        if ents.financial:
+            unit["financial"] = list(ents.financial)
+        if irr.recommendation != "SUMMARIZABLE":
+            unit["irreducibility"] = irr.recommendation
+        if chunk.heading:
+            unit["heading"] = chunk.heading
+
+    return unit
+
+
+def _project_unit(chunk: Chunk, text: str, analysis: ChunkAnalysis, compact: bool, fields: tuple[str, ...]) -> dict:
+    """Build only ``fields`` of a unit; each key is present exactly when _build_unit() would set it."""
+    unit: dict = {}
+    for name in fields:
+        if name in ("heading", "heading_path") and (not chunk.heading or (compact and name == "heading_path")):
+            continue
+        value = _FIELD_VALUES[name](chunk, text, analysis)
+        if compact and name in _COMPACT_DEFAULTS and value == _COMPACT_DEFAULTS[name]:
+            continue
+        unit[name] = value
+    return unit
+
+
+def _analyze_batch(texts: list[str], stages: frozenset[str] = ALL_STAGES) -> list[ChunkAnalysis]:
+    return [analyze_chunk(text, stages) for text in texts]
+
+
+def _analyze_batch_timed(
+    texts: list[str], indices: list[int], stages: frozenset[str], record: bool,
+) -> tuple[list[ChunkAnalysis], StageTimer]:
+    """_analyze_batch() with a worker-side timer, for the parent to merge."""
+    timer = StageTimer(record=record)
+    return [analyze_chunk(t, stages, timer=timer, chunk=i) for t, i in zip(texts, indices, strict=True)], timer
+
+
+def _analyze_parallel(
+    texts: list[str], workers: int, stages: frozenset[str],
+    timer: StageTimer | None = None, indices: list[int] | None = None,
+) -> list[ChunkAnalysis]:
+    """Analyze chunk batches across a process pool, preserving chunk order."""
+    workers = min(workers, len(texts))
+    # A few batches per worker keeps the pool busy when batch costs differ
+    size = max(1, -(-len(texts) // (workers * 4)))
+    batches = [texts[i : i + size] for i in range(0, len(texts), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if timer is None:
+            return [a for batch in pool.map(_analyze_batch, batches, [stages] * len(batches)) for a in batch]
+        index_batches = [indices[i : i + size] for i in range(0, len(texts), size)]
+        stage_sets = [stages] * len(batches)
+        record = [timer.hook is not None] * len(batches)
+        analyses = []
+        for batch, worker_timer in pool.map(_analyze_batch_timed, batches, index_batches, stage_sets, record):
+            analyses += batch
+            timer.merge(worker_timer)
+        return analyses
+
+
+def _analyze_chunks(
+    texts: list[str], workers: int, parallel: bool, cache: AnalysisCache | None, stages: frozenset[str] = ALL_STAGES,
+    timer: StageTimer | None = None, first: int = 0,
+) -> tuple[list[ChunkAnalysis], int]:
+    """Analyze every chunk, consulting the cache. Returns (analyses, cache_hits).
+
+    With a ``timer``, chunk ``i`` of ``texts`` is timed as chunk ``first + i``.
+    """
+    if cache is None:
+        keys = texts
+        found: dict[str, ChunkAnalysis] = {}
+    else:
+        t0 = clock() if timer is not None else 0
+        keys = [chunk_key(t, stages) for t in texts]
+        found = cache.get_many(dict.fromkeys(keys))
+        if timer is not None:
+            timer.add("cache", t0)
+    hits = sum(1 for k in keys if k in found)
+
+    # Identical chunks within a document are analyzed once
+    todo = {k: t for k, t in zip(keys, texts, strict=True) if k not in found}
+    if todo:
+        if timer is not None:
+            index = {}
+            for i, k in enumerate(keys, first):
+                index.setdefault(k, i)
+            indices = [index[k] for k in todo]
+        if parallel and workers > 1 and len(todo) > 1:
+            computed = _analyze_parallel(
+                list(todo.values()), workers, stages, timer, indices if timer is not None else None,
+            )
+        elif timer is not None:
+            computed = [
+                analyze_chunk(t, stages, timer=timer, chunk=i) for t, i in zip(todo.values(), indices, strict=True)
+            ]
+        else:
+            computed = _analyze_batch(list(todo.values()), stages)
+        new = dict(zip(todo, computed, strict=True))
+        if cache is not None:
+            t0 = clock() if timer is not None else 0
+            cache.set_many(new)
+            if timer is not None:
+                timer.add("cache", t0)
+        found.update(new)
+
+    return [found[k] for k in keys], hits
+
+
 def decompose_text(
     text: str,
     *,
     chunk_size: int = 2000,
     overlap: int = 200,
     compact: bool = False,
+    workers: int = 1,
+    cache: AnalysisCache | None = None,
+    fields: Iterable[str] | None = None,
+    text_preview: int = 0,
+    stages: Iterable[str] | None = None,
+    tokenizer: Tokenizer | None = None,
+    timings: bool = False,
+    span_hook: SpanHook | None = None,
 ) -> dict:
     """Decompose text into classified semantic units.
 
@@ -50,117 +285,111 @@ def decompose_text(
         chunk_size: Maximum characters per chunk.
         overlap: Character overlap between chunks.
         compact: If True, omit zero-value fields for smaller output.
+        workers: Processes to analyze chunks with (0 = one per CPU). Inputs
+            shorter than PARALLEL_MIN_CHARS are always processed serially.
+            Output is identical to a serial run.
+        cache: Chunk analysis cache (e.g. MemoryCache, SQLiteCache). When
+            given, meta reports 'cache' hits and misses per chunk.
+        fields: Unit keys to build, from UNIT_FIELDS (None = all). Other
+            keys are never built; compact still drops empty values. Meta
+            is unaffected.
+        text_preview: If > 0, unit 'text' holds only its first N characters.
+        stages: Analyzers to run, from STAGES (None = all). A skipped
+            stage's unit fields (STAGE_FIELDS) are omitted, as are the meta
+            entries it feeds: 'authority_profile' and 'risk_profile' for
+            classify, 'standards_found' and 'dates_found' for entities.
+        tokenizer: Count meta 'token_estimate' with this instead of ~4
+            chars per token (see decompose.tokens): the input text, and
+            each unit's compact JSON plus one token per bracket or comma.
+        timings: Add meta 'timings': nanoseconds per pipeline stage and the
+            slowest chunk in each (see decompose.timing).
+        span_hook: Called with each stage Span as it ends; implies timings.
+            With workers, analysis spans arrive once each batch returns.
 
     Returns:
         Dictionary with 'units' list and 'meta' summary.
+
+    Raises:
+        ValueError: ``fields`` names a key not in UNIT_FIELDS, or ``stages``
+            a stage not in STAGES.
     """
     start = time.monotonic()
+    timer = stage_timer(timings, span_hook)
+    stages = _unit_stages(stages)
+    fields = _unit_fields(fields, stages)
 
-    if not text or not text.strip():
-        return {"units": [], "meta": {"total_units": 0, "error": "empty_input"}}
-
-    MAX_INPUT = 10_000_000  # 10 MB
-    if len(text) > MAX_INPUT:
-        return {"units": [], "meta": {"total_units": 0, "error": "input_too_large", "max_bytes": MAX_INPUT}}
+    error = _input_error(text)
+    if error is not None:
+        return {"units": [], "meta": error}
 
-    chunk_size = max(100, min(chunk_size, 100_000))
-    overlap = max(0, min(overlap, chunk_size // 2))
+    chunk_size, overlap = _clamp(chunk_size, overlap)
 
     # Chunk
+    t = clock() if timer is not None else 0
     chunks = auto_chunk(text, chunk_size=chunk_size, overlap=overlap)
+    if timer is not None:
+        timer.add("chunk", t)
 
     # Classify + extract per chunk
-    units: list[dict] = []
-    all_standards: list[str] = []
-    all_dates: list[str] = []
-    authority_counts: dict[str, int] = {}
-    risk_counts: dict[str, int] = {}
-
-    for chunk in chunks:
-        cls = classify(chunk.text)
-        ents = extract_entities(chunk.text)
-        irr = detect_irreducibility(chunk.text)
-
-        all_standards.extend(ents.standards)
-        all_dates.extend(ents.dates)
-        authority_counts[cls.authority] = authority_counts.get(cls.authority, 0) + 1
-        risk_counts[cls.risk] = risk_counts.get(cls.risk, 0) + 1
-
-        # Build entity list (standards + references combined)
-        entity_list = ents.standards + ents.references
-
-        unit: dict = {
-            "text": chunk.text,
-            "authority": cls.authority,
-            "risk": cls.risk,
-            "type": cls.content_type,
-            "irreducible": irr.irreducible,
-            "attention": cls.attention,
-        }
-
-        if not compact:
-            unit["actionable"] = cls.actionable
-            unit["entities"] = entity_list
-            unit["dates"] = ents.dates
-            unit["financial"] = ents.financial
-            unit["irreducibility"] = irr.recommendation
-            if chunk.heading:
-                unit["heading"] = chunk.heading
-                unit["heading_path"] = chunk.heading_path
-        else:
-            # Compact: only include non-empty/non-default fields
-            if cls.actionable:
-                unit["actionable"] = True
-            if entity_list:
-                unit["entities"] = entity_list
-            if ents.dates:
-                unit["dates"] = ents.dates
-            if ents.financial:
-                unit["financial"] = ents.financial
-            if irr.recommendation != "SUMMARIZABLE":
-                unit["irreducibility"] = irr.recommendation
-            if chunk.heading:
-                unit["heading"] = chunk.heading
+    workers = (os.cpu_count() or 1) if workers <= 0 else workers
+    texts = [chunk.text for chunk in chunks]
+    analyses, cache_hits = _analyze_chunks(texts, workers, len(text) >= PARALLEL_MIN_CHARS, cache, stages, timer)
+
+    # Merge in chunk order so meta is identical to a serial run
+    summary = _Summary(len(text), start, cache is not None, stages, timer)
+    if tokenizer is not None:
+        summary.count_tokens(token_counter(tokenizer), text)
+    summary.cache_hits = cache_hits
+    if timer is None:
+        units = [
+            summary.add(analysis, _build_unit(chunk, chunk_text, analysis, compact, fields, text_preview))
+            for chunk, chunk_text, analysis in zip(chunks, texts, analyses, strict=True)
+        ]
+    else:
+        units = []
+        for i, (chunk, chunk_text, analysis) in enumerate(zip(chunks, texts, analyses, strict=True)):
+            t = clock()
+            unit = _build_unit(chunk, chunk_text, analysis, compact, fields, text_preview)
+            timer.add("units", t, i)
+            units.append(summary.add(analysis, unit))
+
+    return {"units": units, "meta": summary.meta()}
 
-        units.append(unit)
 
-    elapsed_ms = round((time.monotonic() - start) * 1000)
+# Convenience alias
+decompose = decompose_text
 
-    # Token estimate: ~4 chars per token for English text
-    input_tokens = len(text) // 4
-    output_json = json.dumps(units, separators=(",", ":"))
-    output_tokens = len(output_json) // 4
-    reduction = round((1 - output_tokens / max(input_tokens, 1)) * 100) if input_tokens > 0 else 0
 
-    return {
-        "units": units,
-        "meta": {
-            "total_units": len(units),
-            "input_chars": len(text),
-            "processing_ms": elapsed_ms,
-            "token_estimate": {"input": input_tokens, "output": output_tokens, "reduction_pct": max(0, reduction)},
-            "authority_profile": authority_counts,
-            "risk_profile": risk_counts,
-            "standards_found": list(dict.fromkeys(all_standards)),
-            "dates_found": list(dict.fromkeys(all_dates)),
-            "_decompose": "0.2.0",
-        },
-    }
+_LLM_AUTHORITIES = ("mandatory", "prohibitive", "directive", "conditional")
+_LLM_RISKS = ("safety_critical", "compliance", "financial", "contractual")
+_LLM_TYPES = ("requirement", "constraint", "data", "definition")
 
+# Packing rank after attention: higher risk first
+_RISK_RANK = {
+    "safety_critical": 6, "security": 5, "compliance": 4, "financial": 3,
+    "contractual": 2, "advisory": 1, "informational": 0,
+}
 
-# Convenience alias
-decompose = decompose_text
+# decompose_for_llm() classifies every chunk, then extracts from those kept
+_CLASSIFY = frozenset({"classify"})
+_EXTRACT = ALL_STAGES - _CLASSIFY
+# Classify-only costs ~half a full analysis and the rest ~0.8 of one, so
+# classifying first loses once more than ~60% of chunks pass
+_CLASSIFY_FIRST_WARMUP = 8
+_CLASSIFY_FIRST_MAX_PASS = 0.6
 
 
 def filter_for_llm(
     result: dict,
     *,
-    authorities: tuple[str, ...] = ("mandatory", "prohibitive", "directive", "conditional"),
-    risks: tuple[str, ...] = ("safety_critical", "compliance", "financial", "contractual"),
-    types: tuple[str, ...] = ("requirement", "constraint", "data", "definition"),
+    authorities: tuple[str, ...] = _LLM_AUTHORITIES,
+    risks: tuple[str, ...] = _LLM_RISKS,
+    types: tuple[str, ...] = _LLM_TYPES,
     min_attention: float = 0.0,
     include_headings: bool = True,
     max_tokens: int = 0,
+    pack: bool = False,
+    tokenizer: Tokenizer | None = None,
 ) -> dict:
     """Filter decompose result to high-value units for LLM consumption.
 
@@ -177,18 +406,20 @@ def filter_for_llm(
         min_attention: Minimum attention score (0.0 = no filter).
         include_headings: Prepend heading context to units.
         max_tokens: If > 0, truncate output to approx this many tokens.
+        pack: With max_tokens, instead of truncating, keep the highest-ranked
+            whole units that fit (by attention, then risk), in document order.
+        tokenizer: Count tokens with this instead of ~4 chars per token, for
+            'token_estimate' and max_tokens (see decompose.tokens). Text
+            is counted per unit, plus each separator.
 
     Returns:
         Dict with 'text' (filtered string), 'units' (filtered list),
         and 'meta' (input_units, output_units, reduction_pct, token_estimate).
     """
+    counter = token_counter(tokenizer) if tokenizer is not None else None
     units = result.get("units", [])
     if not units:
-        return {
-            "text": "",
-            "units": [],
-            "meta": {"input_units": 0, "output_units": 0, "reduction_pct": 0, "token_estimate": 0},
-        }
+        return _llm_result([], [], 0, max_tokens, pack, counter)
 
     filtered = []
     for u in units:
@@ -200,31 +431,189 @@ def filter_for_llm(
         ):
             filtered.append(u)
 
-    # Build text with optional heading context
-    parts = []
-    for u in filtered:
-        text_part = u["text"]
-        if include_headings and u.get("heading"):
-            heading_prefix = " > ".join(u.get("heading_path", [u["heading"]]))
-            text_part = f"[{heading_prefix}]\n{text_part}"
-        parts.append(text_part)
-
-    joined = "\n\n".join(parts)
-
-    # Token truncation (~4 chars/token for English)
-    if max_tokens > 0:
-        max_chars = max_tokens * 4
-        if len(joined) > max_chars:
-            joined = joined[:max_chars]
-
-    token_estimate = len(joined) // 4
-    input_count = len(units)
-    output_count = len(filtered)
+    parts = [_llm_part(u, include_headings) for u in filtered]
+    return _llm_result(parts, filtered, len(units), max_tokens, pack, counter)
+
+
+def decompose_for_llm(
+    text: str,
+    *,
+    chunk_size: int = 2000,
+    overlap: int = 200,
+    compact: bool = False,
+    authorities: tuple[str, ...] = _LLM_AUTHORITIES,
+    risks: tuple[str, ...] = _LLM_RISKS,
+    types: tuple[str, ...] = _LLM_TYPES,
+    min_attention: float = 0.0,
+    include_headings: bool = True,
+    max_tokens: int = 0,
+    pack: bool = False,
+    tokenizer: Tokenizer | None = None,
+) -> dict:
+    """Decompose and filter for LLM consumption in one pass.
+
+    Equivalent to ``filter_for_llm(decompose_text(text), ...)``, without
+    the work whose output the filter would discard. Each chunk is
+    classified first. Entities and irreducibility are extracted only
+    for chunks that pass the filter, and only passing chunks become unit
+    dicts. With ``max_tokens``, analysis stops once the text is full.
+    Units past that point are not returned, and they are not counted in
+    'output_units' or 'reduction_pct'. 'text' is exactly what
+    filter_for_llm() would return. With ``pack``, every chunk is
+    analyzed, since any unit may rank into the budget.
+
+    Args:
+        text: Raw input text.
+        chunk_size: Maximum characters per chunk.
+        overlap: Character overlap between chunks.
+        compact: If True, omit zero-value fields for smaller output.
+        authorities, risks, types, min_attention, include_headings,
+            max_tokens, pack, tokenizer: As for filter_for_llm().
+
+    Returns:
+        Dict with 'text', 'units' and 'meta', as filter_for_llm() returns.
+    """
+    counter = token_counter(tokenizer) if tokenizer is not None else None
+    if _input_error(text) is not None:
+        return _llm_result([], [], 0, max_tokens, pack, counter)
+
+    chunk_size, overlap = _clamp(chunk_size, overlap)
+    chunks = auto_chunk(text, chunk_size=chunk_size, overlap=overlap)
+    cost, sep, per_token = _llm_measure(counter)
+    budget = max_tokens * per_token if max_tokens > 0 and not pack else 0
+
+    # Identical chunks within a document are analyzed once
+    known: dict[str, ChunkAnalysis] = {}
+    seen = passed = 0
+
+    units: list[dict] = []
+    parts: list[str] = []
+    length = -sep  # no separator before the first part
+    for chunk in chunks:
+        chunk_text = chunk.text
+        analysis = known.get(chunk_text)
+        if analysis is None:
+            # Classifying first pays while most chunks are dropped; once
+            # most pass, the full single-scan analysis is cheaper
+            full = seen >= _CLASSIFY_FIRST_WARMUP and passed > seen * _CLASSIFY_FIRST_MAX_PASS
+            analysis = known[chunk_text] = analyze_chunk(chunk_text, ALL_STAGES if full else _CLASSIFY)
+        seen += 1
+        cls = analysis.classification
+        if not (
+            cls.authority in authorities
+            or cls.risk in risks
+            or cls.content_type in types
+            or (min_attention > 0 and cls.attention >= min_attention)
+        ):
+            continue
+        passed += 1
+        if analysis.irreducibility is None:
+            rest = analyze_chunk(chunk_text, _EXTRACT)
+            analysis = known[chunk_text] = ChunkAnalysis(cls, rest.entities, rest.irreducibility)
+        unit = _build_unit(chunk, chunk_text, analysis, compact)
+        units.append(unit)
+        parts.append(_llm_part(unit, include_headings))
+        length += sep + cost(parts[-1])
+        if budget and length >= budget:
+            break  # later units would start past the truncation point
+
+    return _llm_result(parts, units, len(chunks), max_tokens, pack, counter)
+
+
+def _llm_part(unit: dict, include_headings: bool) -> str:
+    """A unit's text for the LLM, with optional heading context."""
+    if include_headings and unit.get("heading"):
+        heading_prefix = " > ".join(unit.get("heading_path", [unit["heading"]]))
+        return f"[{heading_prefix}]\n{unit['text']}"
+    return unit["text"]
+
+
+def _llm_measure(counter: TokenCounter | None) -> tuple[Callable[[str], int], int, int]:
+    """How LLM text is budgeted: (cost of a part, cost of a separator, cost per token).
+
+    Without a tokenizer, cost is in characters at ~4 per token.
+    """
+    if counter is None:
+        return len, 2, 4
+    return counter, counter("\n\n"), 1
+
+
+def _pack(costs: list[int], units: list[dict], budget: int, sep: int) -> list[int]:
+    """Indices, in document order, of the top-ranked units whose parts fit ``budget`` joined.
+
+    Units are ranked by attention, then risk, then document order. The
+    selection is the longest run of the ranking that fits, skipping units
+    too large for the budget on their own, so a unit is never kept over a
+    higher-ranked one. A min-heap of the selection so far is kept while
+    scanning, evicting from the bottom: O(n log k) for k selected units.
+    """
+    budget += sep  # each part also costs a separator
+    heap: list[tuple[float, int, int, int]] = []
+    used = 0
+    floor: tuple = ()  # rank of the best unit evicted; nothing below it is admitted
+    for i, (part_cost, unit) in enumerate(zip(costs, units, strict=True)):
+        cost = part_cost + sep
+        item = (unit.get("attention", 0), _RISK_RANK.get(unit.get("risk"), 0), -i, cost)
+        if cost > budget or item < floor:
+            continue
+        heapq.heappush(heap, item)
+        used += cost
+        while used > budget:
+            evicted = heapq.heappop(heap)
+            used -= evicted[3]
+            floor = max(floor, evicted)
+    return sorted(-item[2] for item in heap)
+
+
+def _fit_parts(parts: list[str], counter: TokenCounter, budget: int) -> tuple[list[str], int]:
+    """Parts cut to ``budget`` tokens (0 = no limit), and their token count.
+
+    Whole parts are kept while they fit, then the longest prefix of the next.
+    """
+    sep = counter("\n\n")
+    kept: list[str] = []
+    used = 0
+    for part in parts:
+        extra = sep if kept else 0
+        cost = counter(part)
+        if not budget or used + extra + cost <= budget:
+            kept.append(part)
+            used += extra + cost
+            continue
+        head = counter.fit(part, budget - used - extra)
+        if head:
+            kept.append(head)
+            used += extra + counter(head)
+        break
+    return kept, used
+
+
+def _llm_result(
+    parts: list[str], units: list[dict], input_count: int, max_tokens: int, pack: bool, counter: TokenCounter | None,
+) -> dict:
+    # Token budget: tokenizer counts, or ~4 chars/token for English
+    if max_tokens > 0 and pack:
+        cost, sep, per_token = _llm_measure(counter)
+        keep = _pack([cost(p) for p in parts], units, max_tokens * per_token, sep)
+        parts = [parts[i] for i in keep]
+        units = [units[i] for i in keep]
+    if counter is not None:
+        parts, token_estimate = _fit_parts(parts, counter, 0 if pack else max(max_tokens, 0))
+        joined = "\n\n".join(parts)
+    else:
+        joined = "\n\n".join(parts)
+        if max_tokens > 0 and not pack:
+            max_chars = max_tokens * 4
+            if len(joined) > max_chars:
+                joined = joined[:max_chars]
+        token_estimate = len(joined) // 4
+
+    output_count = len(units)
     reduction = round((1 - output_count / max(input_count, 1)) * 100) if input_count > 0 else 0
 
     return {
         "text": joined,
-        "units": filtered,
+        "units": units,
         "meta": {
             "input_units": input_count,
             "output_units": output_count,
@@ -232,3 +621,279 @@ def filter_for_llm(
             "token_estimate": token_estimate,
         },
     }
+
+
+class UnitStream:
+    """Iterator over one document's units, built as each chunk is analyzed.
+
+    ``meta`` is the running summary of the units yielded so far; once the
+    stream is exhausted it equals decompose_text()'s meta.
+    """
+
+    def __init__(
+        self, text: str | MappedText, chunk_size: int, overlap: int, compact: bool, cache: AnalysisCache | None,
+        fields: tuple[str, ...] | None = None, text_preview: int = 0, stages: frozenset[str] = ALL_STAGES,
+        timer: StageTimer | None = None,
+    ):
+        self._error = _input_error(text)
+        if self._error and isinstance(text, MappedText):
+            text.close()
+        self._summary = _Summary(len(text), time.monotonic(), cache is not None, stages, timer)
+        self._units = (
+            iter(()) if self._error
+            else self._generate(text, chunk_size, overlap, compact, cache, fields, text_preview, stages)
+        )
+
+    def __iter__(self) -> UnitStream:
+        return self
+
+    def __next__(self) -> dict:
+        return next(self._units)
+
+    @property
+    def meta(self) -> dict:
+        return dict(self._error) if self._error else self._summary.meta()
+
+    def _generate(
+        self, text: str | MappedText, chunk_size: int, overlap: int, compact: bool, cache: AnalysisCache | None,
+        fields: tuple[str, ...] | None, text_preview: int, stages: frozenset[str],
+    ) -> Iterator[dict]:
+        chunk_size, overlap = _clamp(chunk_size, overlap)
+        timer = self._summary.timer
+        try:
+            chunks = iter_auto_chunk(text, chunk_size=chunk_size, overlap=overlap)
+            if timer is not None:
+                chunks = _timed_chunks(chunks, timer)
+            for i, chunk in enumerate(chunks):
+                chunk_text = chunk.text
+                (analysis,), hits = _analyze_chunks([chunk_text], 1, False, cache, stages, timer, i)
+                self._summary.cache_hits += hits
+                t = clock() if timer is not None else 0
+                unit = _build_unit(chunk, chunk_text, analysis, compact, fields, text_preview)
+                if timer is not None:
+                    timer.add("units", t, i)
+                yield self._summary.add(analysis, unit)
+        finally:
+            if isinstance(text, MappedText):
+                text.close()
+
+
+def _timed_chunks(chunks: Iterator[Chunk], timer: StageTimer) -> Iterator[Chunk]:
+    """``chunks``, with the time to produce each recorded as its 'chunk' stage."""
+    i = 0
+    while True:
+        t = clock()
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        timer.add("chunk", t, i)
+        yield chunk
+        i += 1
+
+
+def iter_decompose(
+    source: str | os.PathLike | IO[str],
+    *,
+    chunk_size: int = 2000,
+    overlap: int = 200,
+    compact: bool = False,
+    cache: AnalysisCache | None = None,
+    fields: Iterable[str] | None = None,
+    text_preview: int = 0,
+    stages: Iterable[str] | None = None,
+    timings: bool = False,
+    span_hook: SpanHook | None = None,
+) -> UnitStream:
+    """Decompose incrementally, yielding each unit as soon as its chunk is classified.
+
+    Units are identical to decompose_text()'s. Only the current chunk and the
+    running meta are held, so downstream work can start immediately. A path
+    is read through a MappedText: the file is memory-mapped and decoded as
+    UTF-8 a block at a time, and may exceed MAX_INPUT.
+
+    Args:
+        source: Text, a path to a UTF-8 text file, or an open text file.
+        chunk_size: Maximum characters per chunk.
+        overlap: Character overlap between chunks.
+        compact: If True, omit zero-value fields for smaller output.
+        cache: Chunk analysis cache, as for decompose_text().
+        fields: Unit keys to build, as for decompose_text().
+        text_preview: If > 0, truncate unit 'text' to N characters.
+        stages: Analyzers to run, as for decompose_text().
+        timings: Add meta 'timings', as for decompose_text(); chunking is
+            timed per chunk.
+        span_hook: Called with each stage Span, as for decompose_text().
+
+    Returns:
+        A UnitStream: iterate it for units, read ``.meta`` for the summary.
+    """
+    stages = _unit_stages(stages)
+    fields = _unit_fields(fields, stages)
+    if isinstance(source, os.PathLike):
+        text = MappedText(source)
+    elif isinstance(source, str):
+        text = source
+    else:
+        text = source.read()
+    return UnitStream(
+        text, chunk_size, overlap, compact, cache, fields, text_preview, stages, stage_timer(timings, span_hook),
+    )
+
+
+def decompose_file(
+    path: str | os.PathLike,
+    *,
+    chunk_size: int = 2000,
+    overlap: int = 200,
+    compact: bool = False,
+    cache: AnalysisCache | None = None,
+    fields: Iterable[str] | None = None,
+    text_preview: int = 0,
+    stages: Iterable[str] | None = None,
+    timings: bool = False,
+    span_hook: SpanHook | None = None,
+) -> dict:
+    """Decompose a UTF-8 text file without reading it into memory.
+
+    The file is memory-mapped and decoded a block at a time, so no decoded
+    copy of the whole document is ever held, and files larger than
+    MAX_INPUT are accepted. Output equals decompose_text() of the file read
+    in text mode (universal newlines, undecodable bytes replaced). Only the
+    returned units are kept; use iter_decompose(Path(path)) to stream them.
+
+    Args:
+        path: File to decompose.
+        chunk_size: Maximum characters per chunk.
+        overlap: Character overlap between chunks.
+        compact: If True, omit zero-value fields for smaller output.
+        cache: Chunk analysis cache, as for decompose_text().
+        fields: Unit keys to build, as for decompose_text().
+        text_preview: If > 0, truncate unit 'text' to N characters.
+        stages: Analyzers to run, as for decompose_text().
+        timings: Add meta 'timings', as for iter_decompose().
+        span_hook: Called with each stage Span, as for decompose_text().
+
+    Returns:
+        Dictionary with 'units' list and 'meta' summary.
+    """
+    stream = iter_decompose(
+        Path(path), chunk_size=chunk_size, overlap=overlap, compact=compact, cache=cache,
+        fields=fields, text_preview=text_preview, stages=stages, timings=timings, span_hook=span_hook,
+    )
+    units = list(stream)
+    return {"units": units, "meta": stream.meta}
+
+
+def _input_error(text: str | MappedText) -> dict | None:
+    """Meta for input that cannot be decomposed, or None.
+
+    A MappedText is processed out-of-core and has no size limit.
+    """
+    if isinstance(text, MappedText):
+        if text.strip_span(0, len(text))[0] == len(text):
+            return {"total_units": 0, "error": "empty_input"}
+        return None
+    if not text or text.isspace():  # not text.strip(), without copying the text
+        return {"total_units": 0, "error": "empty_input"}
+    if len(text) > MAX_INPUT:
+        return {"total_units": 0, "error": "input_too_large", "max_bytes": MAX_INPUT}
+    return None
+
+
+def _clamp(chunk_size: int, overlap: int) -> tuple[int, int]:
+    chunk_size = max(100, min(chunk_size, 100_000))
+    return chunk_size, max(0, min(overlap, chunk_size // 2))
+
+
+class _Summary:
+    """Running meta aggregate over a document's units, in chunk order."""
+
+    __slots__ = (
+        "input_chars", "start", "cached", "cache_hits", "total_units", "output_chars",
+        "authority_counts", "risk_counts", "standards", "dates", "stages",
+        "counter", "input_tokens", "output_tokens", "timer",
+    )
+
+    def __init__(
+        self, input_chars: int, start: float, cached: bool, stages: frozenset[str] = ALL_STAGES,
+        timer: StageTimer | None = None,
+    ):
+        self.input_chars = input_chars
+        self.timer = timer
+        self.stages = stages
+        self.start = start
+        self.cached = cached
+        self.cache_hits = 0
+        self.total_units = 0
+        self.output_chars = 2  # the brackets of the JSON unit list
+        self.authority_counts: dict[str, int] = {}
+        self.risk_counts: dict[str, int] = {}
+        # Dicts as ordered sets: first-seen order, like dict.fromkeys()
+        self.standards: dict[str, None] = {}
+        self.dates: dict[str, None] = {}
+        self.counter: TokenCounter | None = None
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def count_tokens(self, counter: TokenCounter, text: str) -> None:
+        """Count tokens with ``counter`` instead of estimating them from characters."""
+        self.counter = counter
+        t = clock() if self.timer is not None else 0
+        self.input_tokens = counter(text)
+        if self.timer is not None:
+            self.timer.add("tokens", t)
+        self.output_tokens = 2  # the brackets of the JSON unit list
+
+    def add(self, analysis: ChunkAnalysis, unit: dict) -> dict:
+        cls = analysis.classification
+        if cls is not None:
+            self.authority_counts[cls.authority] = self.authority_counts.get(cls.authority, 0) + 1
+            self.risk_counts[cls.risk] = self.risk_counts.get(cls.risk, 0) + 1
+        if analysis.entities is not None:
+            self.standards.update(dict.fromkeys(analysis.entities.standards))
+            self.dates.update(dict.fromkeys(analysis.entities.dates))
+        # Length of the compact JSON unit list, one unit (and comma) at a time
+        timer = self.timer
+        t = clock() if timer is not None else 0
+        encoded = json.dumps(unit, separators=(",", ":"))
+        if timer is not None:
+            t = timer.add("encode", t, self.total_units)
+        self.output_chars += len(encoded) + (1 if self.total_units else 0)
+        if self.counter is not None:
+            self.output_tokens += self.counter(encoded) + (1 if self.total_units else 0)
+            if timer is not None:
+                timer.add("tokens", t, self.total_units)
+        self.total_units += 1
+        return unit
+
+    def meta(self) -> dict:
+        elapsed_ms = round((time.monotonic() - self.start) * 1000)
+
+        # Token estimate: counted, or ~4 chars per token for English text
+        if self.counter is not None:
+            input_tokens, output_tokens = self.input_tokens, self.output_tokens
+        else:
+            input_tokens = self.input_chars // 4
+            output_tokens = self.output_chars // 4
+        reduction = round((1 - output_tokens / max(input_tokens, 1)) * 100) if input_tokens > 0 else 0
+
+        meta = {
+            "total_units": self.total_units,
+            "input_chars": self.input_chars,
+            "processing_ms": elapsed_ms,
+            "token_estimate": {"input": input_tokens, "output": output_tokens, "reduction_pct": max(0, reduction)},
+            "authority_profile": dict(self.authority_counts),
+            "risk_profile": dict(self.risk_counts),
+            "standards_found": list(self.standards),
+            "dates_found": list(self.dates),
+            "_decompose": "0.2.0",
+        }
+        if "classify" not in self.stages:
+            del meta["authority_profile"], meta["risk_profile"]
+        if "entities" not in self.stages:
+            del meta["standards_found"], meta["dates_found"]
+        if self.cached:
+            meta["cache"] = {"hits": self.cache_hits, "misses": self.total_units - self.cache_hits}
+        if self.timer is not None:
+            meta["timings"] = self.timer.meta()
+        return meta
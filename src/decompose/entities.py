@@ -43,6 +43,11 @@ class Entities:
 
 def extract_entities(text: str) -> Entities:
     """Extract structured entities from text. Pure regex, deterministic."""
+    return _extract_entities(text)
+
+
+def _extract_entities(text: str, *, dollars: bool = True, mdy_dates: bool = True) -> Entities:
+    """Extract entities, skipping dollar or M/D/Y scans already known to find nothing."""
     standards: list[str] = []
     dates: list[str] = []
     financial: list[str] = []
@@ -58,14 +63,16 @@ def extract_entities(text: str) -> Entities:
             references.append(m.group(0).strip())
 
     # Dates
-    for m in _DATE_MDY.finditer(text):
-        dates.append(m.group(0))
+    if mdy_dates:
+        for m in _DATE_MDY.finditer(text):
+            dates.append(m.group(0))
     for m in _DATE_WRITTEN.finditer(text):
         dates.append(m.group(0))
 
     # Financial
-    for m in _DOLLAR.finditer(text):
-        financial.append(f"${m.group(1)}")
+    if dollars:
+        for m in _DOLLAR.finditer(text):
+            financial.append(f"${m.group(1)}")
     for m in _PERCENT.finditer(text):
         financial.append(f"{m.group(1)}%")
 
@@ -0,0 +1,106 @@
+"""Tool executor — run blocking tool calls off the event loop, with backpressure.
+
+The MCP server is async, but decompose and URL fetching are blocking.
+``ToolExecutor`` runs them in a thread or process pool so one large
+document or slow URL never stalls other requests. At most
+``max_concurrency`` calls run at once and at most ``max_queue`` wait;
+beyond that, calls are rejected immediately with ``ExecutorBusy`` so
+clients back off instead of piling up work the server cannot finish.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+PoolKind = Literal["thread", "process"]
+
+
+class ExecutorBusy(RuntimeError):
+    """Raised when the run queue is full."""
+
+
+class ToolExecutor:
+    """Bounded pool for blocking tool calls awaited from an event loop.
+
+    Args:
+        max_concurrency: Calls running at once; also the pool size
+            (0 = one per CPU).
+        max_queue: Calls allowed to wait for a free slot before new ones
+            are rejected.
+        kind: "thread" keeps the loop responsive; "process" also runs CPU-bound
+            calls in parallel. Process-pool callables and arguments must pickle.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue: int = 32, kind: PoolKind = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind!r}")
+        self.max_concurrency = (os.cpu_count() or 1) if max_concurrency <= 0 else max_concurrency
+        self.max_queue = max(0, max_queue)
+        self.kind = kind
+        self.running = 0
+        self.waiting = 0
+        self._pool: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _ensure(self) -> asyncio.Semaphore:
+        # Created lazily, inside the loop that awaits them
+        if self._pool is None:
+            pool_cls = ThreadPoolExecutor if self.kind == "thread" else ProcessPoolExecutor
+            self._pool = pool_cls(max_workers=self.max_concurrency)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the pool and return its result.
+
+        Raises:
+            ExecutorBusy: All slots are busy and ``max_queue`` calls already wait.
+        """
+        slots = self._ensure()
+        if slots.locked() and self.waiting >= self.max_queue:
+            raise ExecutorBusy(
+                f"Server busy: {self.running} running, {self.waiting} queued (limit {self.max_queue})"
+            )
+
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(slots)
+            raise
+        # A cancelled caller cannot stop the worker; the slot stays taken
+        # until the call really finishes, so the limit stays honest
+        future.add_done_callback(lambda f: self._release(slots, f))
+        return await asyncio.shield(future)
+
+    def _release(self, slots: asyncio.Semaphore, future: asyncio.Future | None = None) -> None:
+        self.running -= 1
+        slots.release()
+        if future is not None and not future.cancelled():
+            future.exception()  # retrieved, even if the caller was cancelled
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind, "max_concurrency": self.max_concurrency, "max_queue": self.max_queue,
+            "running": self.running, "waiting": self.waiting,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+        self._slots = None
@@ -0,0 +1,425 @@
+"""Async HTTP fetching — keep-alive connection pools for decompose_url. Stdlib only.
+
+``AsyncFetcher`` speaks just enough HTTP/1.1 for GET: Content-Length,
+chunked and read-to-close bodies, redirects and keep-alive. Idle
+connections are pooled per host, so repeated fetches from the same
+documentation site skip TCP and TLS setup. Every address a hostname
+resolves to is checked against the private-network blocklist, the
+connection is made to a checked address (no second lookup to rebind),
+and every redirect hop is checked again. ``stream()`` hands the body
+over block by block as it arrives; ``fetch()`` reads it whole.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import ssl
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from urllib.parse import urljoin, urlparse
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable
+
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024  # 10 MB — matches MAX_INPUT in core.py
+USER_AGENT = "decompose/0.2"
+
+_BLOCKED_NETS = [
+    ipaddress.ip_network("0.0.0.0/8"),
+    ipaddress.ip_network("10.0.0.0/8"),
+    ipaddress.ip_network("100.64.0.0/10"),
+    ipaddress.ip_network("127.0.0.0/8"),
+    ipaddress.ip_network("169.254.0.0/16"),
+    ipaddress.ip_network("172.16.0.0/12"),
+    ipaddress.ip_network("192.168.0.0/16"),
+    ipaddress.ip_network("::1/128"),
+    ipaddress.ip_network("fc00::/7"),
+    ipaddress.ip_network("fe80::/10"),
+]
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+_READ_SIZE = 64 * 1024
+
+
+class FetchError(OSError):
+    """An HTTP exchange failed or returned an error status."""
+
+
+def _check_url(url: str):
+    """Parse an http(s) URL, rejecting other schemes and missing hostnames."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {parsed.scheme!r}")
+    if not parsed.hostname:
+        raise ValueError("URL has no hostname")
+    if any(c <= " " or c == "\x7f" for c in url):
+        raise ValueError("URL contains whitespace or control characters")
+    return parsed
+
+
+def _check_address(address: str, blocked: Iterable[ipaddress._BaseNetwork]) -> None:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    for net in blocked:
+        if ip in net:
+            raise ValueError(f"URL resolves to blocked address: {ip}")
+
+
+@dataclass(slots=True)
+class Response:
+    """A fetched response. ``headers`` keys are lowercase."""
+
+    url: str
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    truncated: bool = False
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "")
+
+
+@dataclass(slots=True)
+class _BodyState:
+    done: bool = False
+    framed: bool = True  # False when the body runs to connection close
+    truncated: bool = False
+
+
+class StreamingResponse:
+    """A response whose body arrives block by block.
+
+    Iterate it (once) for the body's byte blocks, or ``await read()``.
+    ``headers`` keys are lowercase.
+    """
+
+    __slots__ = ("url", "status", "headers", "_blocks", "_state")
+
+    def __init__(self, url: str, status: int, headers: dict[str, str], blocks: AsyncIterator[bytes], state: _BodyState):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self._blocks = blocks
+        self._state = state
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "")
+
+    @property
+    def truncated(self) -> bool:
+        """The body was cut at max_bytes (known once it has been read)."""
+        return self._state.truncated
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._blocks
+
+    async def read(self) -> bytes:
+        return b"".join([block async for block in self._blocks])
+
+
+@dataclass(slots=True)
+class _Connection:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    idle_since: float = 0.0
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _StaleConnection(Exception):
+    """A pooled connection was closed by the server before responding."""
+
+
+class AsyncFetcher:
+    """Concurrent HTTP GETs over per-host keep-alive connection pools.
+
+    Args:
+        max_per_host: Open connections per host; further fetches wait.
+        timeout: Seconds for a whole fetch, redirects and body included.
+        read_timeout: Seconds any single connect, write or read may take.
+        max_bytes: Body bytes kept; longer bodies are truncated.
+        max_redirects: Redirects followed before giving up.
+        idle_timeout: Seconds an idle pooled connection is reused for.
+        blocked_networks: Address ranges never connected to.
+
+    Pools belong to the event loop that first uses the fetcher.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_per_host: int = 6,
+        timeout: float = 15.0,
+        read_timeout: float = 10.0,
+        max_bytes: int = MAX_RESPONSE_BYTES,
+        max_redirects: int = 10,
+        idle_timeout: float = 30.0,
+        blocked_networks: Iterable[ipaddress._BaseNetwork] = _BLOCKED_NETS,
+    ):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.max_redirects = max_redirects
+        self.idle_timeout = idle_timeout
+        self.blocked_networks = tuple(blocked_networks)
+        self.connections_opened = 0
+        self._idle: dict[tuple, list[_Connection]] = {}
+        self._limits: dict[tuple, asyncio.Semaphore] = {}
+        self._ssl: ssl.SSLContext | None = None
+
+    async def __aenter__(self) -> AsyncFetcher:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every idle pooled connection."""
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+    async def fetch(self, url: str, headers: dict[str, str] | None = None) -> Response:
+        """GET ``url``, following redirects, and read the whole body.
+
+        Raises:
+            ValueError: The URL or a redirect target is not allowed.
+            FetchError: The exchange failed.
+            TimeoutError: The fetch or a single read took too long.
+        """
+        async with self.stream(url, headers) as response:
+            body = await response.read()
+        return Response(response.url, response.status, response.headers, body, response.truncated)
+
+    async def fetch_many(self, urls: Iterable[str]) -> list[Response | BaseException]:
+        """Fetch concurrently; failures are returned in place of responses."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: dict[str, str] | None = None) -> AsyncIterator[StreamingResponse]:
+        """GET ``url``, following redirects; the body is read as it is iterated.
+
+        The connection is pooled on exit if the body was read to the end,
+        and closed otherwise. ``timeout`` covers the body too.
+        """
+        deadline = time.monotonic() + self.timeout
+        for _ in range(self.max_redirects + 1):
+            async with self._open(url, headers or {}, deadline) as response:
+                location = response.headers.get("location")
+                if response.status not in _REDIRECTS or not location:
+                    yield response
+                    return
+                async for _ in response:
+                    pass  # drained so the connection can be reused
+            url = urljoin(url, location)
+        raise FetchError(f"Too many redirects (>{self.max_redirects})")
+
+    async def _resolve(self, host: str, port: int) -> str:
+        """First address of ``host``, after checking all of them."""
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise ValueError(f"Cannot resolve hostname: {e}") from None
+        for *_, sockaddr in infos:
+            _check_address(sockaddr[0], self.blocked_networks)
+        return infos[0][4][0]
+
+    @asynccontextmanager
+    async def _open(self, url: str, headers: dict[str, str], deadline: float) -> AsyncIterator[StreamingResponse]:
+        """One request on a pooled or new connection, held until exit."""
+        parsed = _check_url(url)
+        https = parsed.scheme == "https"
+        host = parsed.hostname
+        port = parsed.port or (443 if https else 80)
+        key = (parsed.scheme, host, port)
+        address = await self._timed(self._resolve(host, port), deadline)
+
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.max_per_host))
+        async with limit:
+            conn = self._take_idle(key)
+            try:
+                if conn is None:
+                    conn = await self._connect(address, port, host if https else None, deadline)
+                    version, status, response_headers = await self._send(conn, parsed, headers, deadline)
+                else:
+                    try:
+                        version, status, response_headers = await self._send(conn, parsed, headers, deadline)
+                    except _StaleConnection:
+                        conn.close()
+                        conn = await self._connect(address, port, host if https else None, deadline)
+                        version, status, response_headers = await self._send(conn, parsed, headers, deadline)
+            except _StaleConnection:
+                conn.close()
+                raise FetchError(f"Connection closed by {host} before responding") from None
+            except BaseException:
+                if conn is not None:
+                    conn.close()
+                raise
+
+            state = _BodyState()
+            blocks = self._body(conn.reader, status, response_headers, deadline, state)
+            try:
+                yield StreamingResponse(url, status, response_headers, blocks, state)
+            finally:
+                await blocks.aclose()
+                reusable = (
+                    state.done
+                    and state.framed
+                    and not state.truncated
+                    and version == "HTTP/1.1"
+                    and "close" not in response_headers.get("connection", "").lower()
+                )
+                if reusable:
+                    conn.idle_since = time.monotonic()
+                    self._idle.setdefault(key, []).append(conn)
+                else:
+                    conn.close()
+
+    def _take_idle(self, key: tuple) -> _Connection | None:
+        conns = self._idle.get(key)
+        now = time.monotonic()
+        while conns:
+            conn = conns.pop()
+            if now - conn.idle_since < self.idle_timeout and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    async def _connect(self, address: str, port: int, server_hostname: str | None, deadline: float) -> _Connection:
+        context = None
+        if server_hostname is not None:
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            context = self._ssl
+        reader, writer = await self._timed(
+            asyncio.open_connection(address, port, ssl=context, server_hostname=server_hostname), deadline,
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _timed(self, awaitable, deadline: float):
+        """Await with the read timeout, cut short by the fetch deadline."""
+        remaining = deadline - time.monotonic()
+        try:
+            if remaining <= 0:
+                if asyncio.iscoroutine(awaitable):
+                    awaitable.close()
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(awaitable, min(self.read_timeout, remaining))
+        except asyncio.TimeoutError:
+            if remaining <= self.read_timeout:
+                raise TimeoutError(f"Fetch timed out after {self.timeout}s") from None
+            raise TimeoutError(f"No progress within {self.read_timeout}s") from None
+
+    async def _send(
+        self, conn: _Connection, parsed, headers: dict[str, str], deadline: float,
+    ) -> tuple[str, int, dict[str, str]]:
+        """Send one GET and read the status line and headers."""
+        target = parsed.path or "/"
+        if parsed.query:
+            target += "?" + parsed.query
+        host = parsed.hostname if ":" not in parsed.hostname else f"[{parsed.hostname}]"
+        if parsed.port:
+            host += f":{parsed.port}"
+        lines = [
+            f"GET {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+            "Accept: text/markdown, text/plain, text/html", "Accept-Encoding: identity", "Connection: keep-alive",
+        ]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        try:
+            await self._timed(conn.writer.drain(), deadline)
+            status_line = await self._timed(conn.reader.readline(), deadline)
+        except ConnectionError:
+            raise _StaleConnection() from None
+        if not status_line:
+            raise _StaleConnection()
+
+        try:
+            version, status_text = status_line.decode("latin-1").split(None, 2)[:2]
+            status = int(status_text)
+        except ValueError:
+            raise FetchError(f"Malformed status line: {status_line[:100]!r}") from None
+
+        response_headers: dict[str, str] = {}
+        while True:
+            line = await self._timed(conn.reader.readline(), deadline)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            response_headers[name] = f"{response_headers[name]}, {value}" if name in response_headers else value
+        return version, status, response_headers
+
+    async def _body(
+        self, reader: asyncio.StreamReader, status: int, headers: dict[str, str], deadline: float, state: _BodyState,
+    ) -> AsyncIterator[bytes]:
+        """Yield body blocks up to max_bytes, recording how the body ended in ``state``."""
+        if status in (204, 304) or 100 <= status < 200:
+            state.done = True
+            return
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            size = 0
+            while True:
+                line = await self._timed(reader.readline(), deadline)
+                try:
+                    length = int(line.split(b";", 1)[0].strip(), 16)
+                except ValueError:
+                    raise FetchError(f"Malformed chunk size: {line[:40]!r}") from None
+                if length == 0:
+                    while (await self._timed(reader.readline(), deadline)) not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    state.done = True
+                    return
+                if size + length > self.max_bytes:
+                    async for block in self._blocks(reader, self.max_bytes - size, deadline):
+                        yield block
+                    state.done = state.truncated = True
+                    return
+                async for block in self._blocks(reader, length, deadline):
+                    yield block
+                size += length
+                await self._timed(reader.readline(), deadline)
+
+        if "content-length" in headers:
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                raise FetchError("Malformed Content-Length") from None
+            async for block in self._blocks(reader, min(length, self.max_bytes), deadline):
+                yield block
+            state.done = True
+            state.truncated = length > self.max_bytes
+            return
+
+        # No length: the body runs to connection close
+        state.framed = False
+        size = 0
+        while size < self.max_bytes:
+            data = await self._timed(reader.read(min(_READ_SIZE, self.max_bytes - size)), deadline)
+            if not data:
+                break
+            size += len(data)
+            yield data
+        state.done = True
+        state.truncated = size >= self.max_bytes
+
+    async def _blocks(self, reader: asyncio.StreamReader, n: int, deadline: float) -> AsyncIterator[bytes]:
+        """Yield exactly ``n`` bytes as they arrive; the read timeout applies per block."""
+        while n > 0:
+            data = await self._timed(reader.read(min(_READ_SIZE, n)), deadline)
+            if not data:
+                raise FetchError("Connection closed mid-body")
+            n -= len(data)
+            yield data
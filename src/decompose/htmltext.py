@@ -0,0 +1,293 @@
+"""Incremental body-to-text conversion for fetched pages. No dependencies.
+
+``BodyToText`` takes a response body block by block, as it arrives, and
+returns the text completed so far: bytes are decoded incrementally (a
+multi-byte character split across blocks is held back), and HTML is fed
+to the parser as it comes, so no full copy of the body or its markup is
+ever needed. The joined output equals converting the whole body at once.
+
+HTML is converted to Markdown-equivalent text in the same single pass,
+without building a DOM: headings become ATX headers, list items ``- `` /
+``1. `` lines and table rows ``| a | b |`` lines, so auto_chunk() sections
+a page by its headings just as it would the page's Markdown source.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+_SKIPPED = ("script", "style", "nav", "footer")
+_HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+_PARAGRAPHS = ("p", "pre", "blockquote")
+_LINES = ("br", "div")
+_CELLS = ("td", "th")
+# Every tag the converter acts on; others (inline markup) are passed over
+_STRUCTURE = frozenset(
+    _SKIPPED + _HEADINGS + _PARAGRAPHS + _LINES + _CELLS + ("header", "ul", "ol", "li", "table", "tr")
+)
+
+# Page text that would read as a header line is escaped; a line ending
+# in "#"s waits for the next character to decide
+_HEADER_LIKE = re.compile(r"(?<=\n)#{1,6}(?=\s)")
+_OPEN_HASHES = re.compile(r"(?<=\n)#{1,6}\Z")
+
+
+class _HTMLToText(HTMLParser):
+    """Streaming HTML-to-Markdown converter. No dependencies.
+
+    Script, style, nav and footer content is dropped, and so is a
+    ``<header>`` except for its headings (often the page title).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._parts: list[str] = []
+        self._skip = 0  # depth inside skipped elements
+        self._header = 0  # depth inside <header>
+        self._trail = 2  # newlines ending the output; the start counts as a blank line
+        self._newlines = 0  # line breaks owed before the next output
+        self._marker = False  # a list marker was just written
+        self._hashes = ""  # "#"s starting a line, held until what follows is known
+        self._capture: tuple[str, list[str]] | None = None  # heading or table cell being collected
+        self._lists: list[int] = []  # per open list: next item number, 0 for bullets
+        self._rows: list[int] = []  # per open table: rows written
+        self._cells = 0  # cells written in the current row
+        self._head_row = False  # the current row has <th> cells
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in _STRUCTURE:
+            return
+        if tag in _SKIPPED:
+            self._skip += 1
+        elif tag == "header":
+            self._header += 1
+        if self._skip or (self._header and tag not in _HEADINGS):
+            return
+
+        if tag in _HEADINGS:
+            self._end_heading()
+            if self._capture is None:
+                self._capture = (tag, [])
+        elif tag in _PARAGRAPHS:
+            self._break(2)
+        elif tag in _LINES:
+            self._break(1)
+        elif tag in ("ul", "ol"):
+            self._marker = False
+            self._break(1)
+            self._lists.append(1 if tag == "ol" else 0)
+        elif tag == "li":
+            self._marker = False
+            self._break(1)
+            depth = max(len(self._lists), 1)
+            number = self._lists[-1] if self._lists else 0
+            if number:
+                self._lists[-1] += 1
+            self._write("  " * (depth - 1) + (f"{number}. " if number else "- "))
+            self._marker = True
+        elif tag == "table":
+            self._break(2)
+            self._rows.append(0)
+        elif tag == "tr":
+            self._end_row()
+            self._break(1)
+        elif tag in _CELLS:
+            self._end_cell()
+            if self._capture is None:
+                self._capture = (tag, [])
+            self._head_row = self._head_row or tag == "th"
+
+    def handle_endtag(self, tag):
+        if tag not in _STRUCTURE:
+            return
+        if tag in _SKIPPED:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if tag == "header":
+            self._header = max(self._header - 1, 0)
+            return
+        if self._skip or (self._header and tag not in _HEADINGS):
+            return
+
+        if tag in _HEADINGS:
+            self._end_heading()
+        elif tag in _PARAGRAPHS:
+            self._break(2)
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._break(1 if self._lists else 2)
+        elif tag in _CELLS:
+            self._end_cell()
+        elif tag == "tr":
+            self._end_row()
+        elif tag == "table":
+            self._end_row()
+            if self._rows:
+                self._rows.pop()
+            self._break(2)
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._capture is not None:
+            self._capture[1].append(data)
+        elif self._header or self._rows:
+            return  # text directly inside a table, outside its cells, is dropped
+        elif self._newlines or self._marker or self._hashes or "#" in data or not data:
+            self._write(data, data=True)
+        else:
+            # Nothing owed or held: the text goes out as it is
+            self._parts.append(data)
+            self._trail = 0 if data[-1] != "\n" else self._trail_after(data)
+
+    def take(self) -> str:
+        """Text produced since the last call."""
+        text = "".join(self._parts)
+        self._parts.clear()
+        return text
+
+    def finish(self) -> None:
+        """Write out whatever is still open at the end of the page."""
+        self._end_heading()
+        self._end_row()
+        if self._hashes:
+            self._parts.append(self._hashes)
+            self._hashes = ""
+
+    def _break(self, n: int) -> None:
+        """Owe ``n`` line breaks (n=2: a blank line) before the next output.
+
+        Blocks inside a list item are kept on single lines, so lists stay tight.
+        """
+        if self._capture is not None:
+            self._capture[1].append(" ")
+        elif not self._marker:
+            self._newlines = max(self._newlines, 1 if self._lists else n)
+
+    def _end_heading(self) -> None:
+        if self._capture is None or self._capture[0] not in _HEADINGS:
+            return
+        tag, parts = self._capture
+        self._capture = None
+        text = " ".join("".join(parts).split())
+        if text:
+            self._break(2)
+            self._write("#" * int(tag[1]) + " " + text)
+            self._break(2)
+
+    def _end_cell(self) -> None:
+        if self._capture is None or self._capture[0] not in _CELLS:
+            return
+        _, parts = self._capture
+        self._capture = None
+        text = " ".join("".join(parts).split()).replace("|", "\\|")
+        self._write(("| " if self._cells == 0 else " | ") + text)
+        self._cells += 1
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if not self._cells:
+            return
+        self._write(" |")
+        if self._head_row and self._rows and self._rows[-1] == 0:
+            self._break(1)
+            self._write("|" + " --- |" * self._cells)
+        if self._rows:
+            self._rows[-1] += 1
+        self._cells = 0
+        self._head_row = False
+
+    def _write(self, text: str, data: bool = False) -> None:
+        if data and (self._newlines or self._marker):
+            text = text.lstrip()
+            if not text:
+                return
+        if self._newlines:
+            owed = self._newlines - (0 if self._hashes else self._trail)
+            self._newlines = 0
+            if owed > 0:
+                if data or not self._hashes:
+                    text = "\n" * owed + text
+                else:
+                    self._out("\n" * owed, data=True)
+        self._out(text, data)
+        self._marker = False
+
+    def _out(self, text: str, data: bool) -> None:
+        if data and (self._hashes or "#" in text):
+            # Escape header-like lines; one leading char stands in for the line before
+            s = ("\n" if self._hashes or self._trail else " ") + self._hashes + text
+            self._hashes = ""
+            m = _OPEN_HASHES.search(s)
+            if m:
+                self._hashes = m.group()
+                s = s[: m.start()]
+            s = _HEADER_LIKE.sub(r"\\\g<0>", s)[1:]
+        elif self._hashes:
+            s = ("\\" if text[:1].isspace() else "") + self._hashes + text
+            self._hashes = ""
+        else:
+            s = text
+        if not s:
+            return
+        self._parts.append(s)
+        self._trail = 0 if s[-1] != "\n" else self._trail_after(s)
+
+    def _trail_after(self, s: str) -> int:
+        kept = s.rstrip("\n")
+        return len(s) - len(kept) + (self._trail if not kept else 0)
+
+
+def is_plain(content_type: str) -> bool:
+    """Whether a body of this type is used as text as-is, not parsed as HTML."""
+    return "text/markdown" in content_type or "text/plain" in content_type
+
+
+class BodyToText:
+    """Convert a response body to text one block at a time.
+
+    Markdown and plain text pass through unchanged; anything else is read
+    as HTML and converted to Markdown, stripped of surrounding whitespace.
+    """
+
+    __slots__ = ("_decoder", "_parser", "_started", "_held")
+
+    def __init__(self, content_type: str):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parser = None if is_plain(content_type) else _HTMLToText()
+        self._started = False
+        self._held = ""  # trailing whitespace, kept back in case the text ends there
+
+    def feed(self, block: bytes) -> str:
+        """Text completed by this block."""
+        return self._convert(self._decoder.decode(block), final=False)
+
+    def close(self) -> str:
+        """The rest of the text, once the body has ended."""
+        return self._convert(self._decoder.decode(b"", final=True), final=True)
+
+    def _convert(self, text: str, final: bool) -> str:
+        if self._parser is None:
+            return text
+        self._parser.feed(text)
+        if final:
+            self._parser.close()
+            self._parser.finish()
+        text = self._held + self._parser.take()
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        if final:
+            return text.rstrip()
+        kept = text.rstrip()
+        self._held = text[len(kept) :]
+        return kept
+
+
+def body_to_text(content_type: str, body: bytes) -> str:
+    """Convert a whole response body to text, as BodyToText would."""
+    converter = BodyToText(content_type)
+    return converter.feed(body) + converter.close()
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass, field
 
+from decompose.rules import RuleSet
+
 IRREDUCIBLE_PATTERNS: list[tuple[str, str]] = [
     (r"\bshall\s+(?:not\s+)?(?:be|provide|comply|ensure|maintain)\b", "legal_mandate"),
     (r"\b\d+(?:\.\d+)?\s*(?:kg|lb|km|mi|m|cm|mm|ft|in\.?|%)\b", "measured_value"),
@@ -19,6 +20,9 @@ IRREDUCIBLE_PATTERNS: list[tuple[str, str]] = [
 ]
 
 
+_RULES = RuleSet((p, ("irreducibility", category)) for p, category in IRREDUCIBLE_PATTERNS)
+
+
 @dataclass(slots=True)
 class IrreducibilityResult:
     irreducible: bool
@@ -30,15 +34,18 @@ class IrreducibilityResult:
 
 def detect_irreducibility(text: str) -> IrreducibilityResult:
     """Determine if text content is computationally irreducible."""
-    matches = []
-    categories_seen: set[str] = set()
+    return _irreducibility_totals(_RULES.tally(text))
+
 
-    for pattern, category in IRREDUCIBLE_PATTERNS:
-        for m in re.finditer(pattern, text, re.IGNORECASE):
-            matches.append(m.group(0)[:80])
+def _irreducibility_totals(totals: dict) -> IrreducibilityResult:
+    """Build an IrreducibilityResult from ``("irreducibility", category)`` match totals."""
+    count = 0
+    categories_seen: set[str] = set()
+    for (table, category), n in totals.items():
+        if table == "irreducibility":
+            count += n
             categories_seen.add(category)
 
-    count = len(matches)
     confidence = min(1.0, count * 0.2)
 
     if confidence >= 0.6:
@@ -0,0 +1,227 @@
+"""Memory-mapped UTF-8 text — decoded block by block, never as a whole.
+
+``MappedText`` reads a file the way ``Path.read_text(encoding="utf-8",
+errors="replace")`` would, universal newlines included, but keeps only an
+index of block offsets plus a few decoded blocks. The chunker runs over it
+through a handful of methods mirroring the ``str`` operations it needs.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+BLOCK_BYTES = 1 << 20  # 1 MiB
+
+_NON_SPACE = re.compile(r"\S")
+
+
+class MappedText:
+    """A UTF-8 file exposed as lazily decoded text.
+
+    Blocks are cut only where no UTF-8 sequence (or invalid partial one)
+    spans the cut and never inside ``\\r\\n``, so decoding them
+    independently gives exactly the text of decoding the whole file.
+
+    Args:
+        path: File to map.
+        block_bytes: Bytes per decoded block.
+        spaced: Read non-breaking spaces as plain spaces (as chunk_text does).
+    """
+
+    def __init__(self, path: str | os.PathLike, block_bytes: int = BLOCK_BYTES, *, spaced: bool = False):
+        self.path = os.fspath(path)
+        self.spaced = spaced
+        self._cache: OrderedDict[int, str] = OrderedDict()
+        self._window: tuple[int, int, str] = (0, 0, "")
+
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        # Char offset and byte range of every block, from one decoding pass
+        self._char_starts: list[int] = []
+        self._byte_ranges: list[tuple[int, int]] = []
+        chars = 0
+        pos = 0
+        while pos < size:
+            end = self._cut(pos, min(pos + block_bytes, size), size)
+            self._char_starts.append(chars)
+            self._byte_ranges.append((pos, end))
+            chars += len(self._decode(pos, end))
+            pos = end
+        self.length = chars
+
+    def __len__(self) -> int:
+        return self.length
+
+    def with_spaces(self) -> MappedText:
+        """A view of the same file that reads non-breaking spaces as spaces."""
+        view = object.__new__(MappedText)
+        view.path = self.path
+        view.spaced = True
+        view._cache = OrderedDict()
+        view._window = (0, 0, "")
+        view._map = self._map
+        view._char_starts = self._char_starts
+        view._byte_ranges = self._byte_ranges
+        view.length = self.length
+        return view
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+    # ── Decoding ──────────────────────────────────────────────────
+
+    def _cut(self, start: int, end: int, size: int) -> int:
+        """Nearest offset to ``end`` (after ``start``) where decoding can split."""
+        if end >= size:
+            return size
+        for cut in range(end, max(start, end - 4), -1):
+            if self._splits_at(cut):
+                return cut
+        for cut in range(end + 1, size):
+            if self._splits_at(cut):
+                return cut
+        return size
+
+    def _splits_at(self, pos: int) -> bool:
+        # Never inside \r\n; and a sequence, valid or not, ends before a
+        # byte that is not a continuation byte or after three of them
+        data = self._map
+        if data[pos - 1] == 0x0D and data[pos] == 0x0A:
+            return False
+        if not 0x80 <= data[pos] <= 0xBF:
+            return True
+        return pos >= 3 and all(0x80 <= data[i] <= 0xBF for i in range(pos - 3, pos))
+
+    def _decode(self, start: int, end: int) -> str:
+        text = str(self._map[start:end], "utf-8", "replace")
+        self._release(start, end)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    def _release(self, start: int, end: int) -> None:
+        # Drop the decoded pages from this process's resident set; they stay
+        # in the OS page cache and fault back in if read again
+        if hasattr(mmap, "MADV_DONTNEED") and isinstance(self._map, mmap.mmap):
+            start -= start % mmap.PAGESIZE
+            self._map.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def block(self, i: int) -> str:
+        """Decoded text of block ``i``; the last few blocks are kept."""
+        text = self._cache.get(i)
+        if text is None:
+            text = self._decode(*self._byte_ranges[i])
+            if self.spaced:
+                text = text.replace("\u00a0", " ")
+            self._cache[i] = text
+            if len(self._cache) > 3:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(i)
+        return text
+
+    def blocks(self) -> Iterator[tuple[int, str]]:
+        """Yield ``(char_offset, text)`` for every block in order."""
+        for i, start in enumerate(self._char_starts):
+            yield start, self.block(i)
+
+    def _block_at(self, pos: int) -> int:
+        return bisect_right(self._char_starts, pos) - 1
+
+    # ── str-like operations used by the chunker ───────────────────
+
+    def window(self, lo: int, hi: int) -> tuple[str, int]:
+        """Return ``(buf, base)`` with ``buf[lo - base : hi - base]`` the text in ``[lo, hi)``.
+
+        ``buf`` is whole decoded blocks; a single block is returned without
+        copying, and the last window is reused while requests fall inside it.
+        """
+        base, end, buf = self._window
+        if base <= lo and hi <= end:
+            return buf, base
+        first = self._block_at(lo)
+        last = self._block_at(max(hi - 1, lo))
+        buf = "".join(self.block(i) for i in range(first, last + 1))
+        base = self._char_starts[first]
+        self._window = (base, base + len(buf), buf)
+        return buf, base
+
+    def __getitem__(self, key: slice) -> str:
+        start, stop, _ = key.indices(self.length)
+        if start >= stop:
+            return ""
+        buf, base = self.window(start, stop)
+        return buf[start - base : stop - base]
+
+    def strip_span(self, lo: int, hi: int) -> tuple[int, int]:
+        """Bounds of ``text[lo:hi].strip()``, scanning block by block."""
+        first = None
+        for i in range(max(self._block_at(lo), 0), len(self._char_starts)):
+            start = self._char_starts[i]
+            if start >= hi:
+                break
+            m = _NON_SPACE.search(self.block(i), max(lo - start, 0), hi - start)
+            if m is not None:
+                first = start + m.start()
+                break
+        if first is None:
+            return (hi, hi)
+        # text[first] is not whitespace, so this stops by then
+        while True:
+            buf, base = self.window(hi - 1, hi)
+            floor = max(first, base)
+            while hi > floor and buf[hi - 1 - base].isspace():
+                hi -= 1
+            if hi > floor or hi == first:
+                return (first, hi)
+
+    def search(self, pattern: re.Pattern, max_len: int) -> bool:
+        """Whether ``pattern`` matches anywhere; matches span at most ``max_len`` chars."""
+        carry = ""
+        for offset, text in self.blocks():
+            window = carry + text
+            # Past the file start the carry's first char lacks its predecessor
+            if pattern.search(window, 1 if offset > len(carry) else 0):
+                return True
+            carry = window[-max_len:]
+        return False
+
+    def finditer(self, pattern: re.Pattern, pending: re.Pattern) -> Iterator[tuple[int, re.Match]]:
+        """Yield ``(offset, match)`` for every line-anchored match, in order.
+
+        ``pattern`` must start at a line start and end at a line end.
+        ``pending`` matches, at a line start, a beginning of ``pattern``
+        reaching the end of the decoded text so far, which later text may
+        still extend.
+        """
+        carry = ""
+        for offset, text in self.blocks():
+            window = carry + text
+            base = offset - len(carry)
+            final = offset + len(text) >= self.length
+            # Only lines completed by a newline in this window are final
+            limit = len(window) if final else window.rfind("\n")
+            resume = len(window) if final else limit + 1
+            done = 0
+            for m in pattern.finditer(window):
+                if m.end() > limit or (not final and pending.match(window, m.start())):
+                    resume = min(resume, m.start())
+                    break
+                done = m.end()
+                yield base, m
+            if not final:
+                p = pending.search(window, done)
+                if p is not None:
+                    resume = min(resume, p.start())
+                carry = window[resume:]
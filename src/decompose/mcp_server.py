@@ -2,110 +2,77 @@
 
 from __future__ import annotations
 
-import ipaddress
+import asyncio
 import json
-import socket
-import urllib.error
-import urllib.request
-from html.parser import HTMLParser
-from urllib.parse import urlparse
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import TextContent, Tool
 
-from decompose.core import decompose_text
-
-_BLOCKED_NETS = [
-    ipaddress.ip_network("0.0.0.0/8"),
-    ipaddress.ip_network("10.0.0.0/8"),
-    ipaddress.ip_network("100.64.0.0/10"),
-    ipaddress.ip_network("127.0.0.0/8"),
-    ipaddress.ip_network("169.254.0.0/16"),
-    ipaddress.ip_network("172.16.0.0/12"),
-    ipaddress.ip_network("192.168.0.0/16"),
-    ipaddress.ip_network("::1/128"),
-    ipaddress.ip_network("fc00::/7"),
-    ipaddress.ip_network("fe80::/10"),
-]
-
-
-def _validate_url(url: str) -> None:
-    """Reject URLs targeting internal/private networks or non-HTTP schemes."""
-    parsed = urlparse(url)
-    if parsed.scheme not in ("http", "https"):
-        raise ValueError(f"Unsupported URL scheme: {parsed.scheme!r}")
-    hostname = parsed.hostname
-    if not hostname:
-        raise ValueError("URL has no hostname")
-    try:
-        addrs = socket.getaddrinfo(hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
-    except socket.gaierror as e:
-        raise ValueError(f"Cannot resolve hostname: {e}") from None
-    for _, _, _, _, sockaddr in addrs:
-        ip = ipaddress.ip_address(sockaddr[0])
-        for net in _BLOCKED_NETS:
-            if ip in net:
-                raise ValueError(f"URL resolves to blocked address: {ip}")
+from decompose.cache import MemoryCache, chunk_key
+from decompose.chunker import TextStreamChunker
+from decompose.core import STAGES, UNIT_FIELDS, _analyze_batch, _unit_stages, decompose_text
+from decompose.executor import ExecutorBusy, PoolKind, ToolExecutor
+from decompose.fetch import AsyncFetcher, StreamingResponse
+from decompose.htmltext import BodyToText
+from decompose.paging import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ResultStore, UnitFilter
+from decompose.urlcache import UrlCache, fetch_page
 
 server = Server("decompose")
 
-
-class _HTMLToText(HTMLParser):
-    """Minimal HTML-to-text converter. No dependencies."""
-
-    def __init__(self):
-        super().__init__()
-        self._parts: list[str] = []
-        self._skip = False
-
-    def handle_starttag(self, tag, attrs):
-        self._skip = tag in ("script", "style", "nav", "footer", "header")
-        if tag in ("p", "br", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "tr"):
-            self._parts.append("\n")
-
-    def handle_endtag(self, tag):
-        if tag in ("script", "style", "nav", "footer", "header"):
-            self._skip = False
-
-    def handle_data(self, data):
-        if not self._skip:
-            self._parts.append(data)
-
-    def get_text(self) -> str:
-        return "".join(self._parts).strip()
-
-
-_MAX_RESPONSE_BYTES = 10 * 1024 * 1024  # 10 MB — matches MAX_INPUT in core.py
-
-
-class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
-    """Block HTTP redirects to prevent SSRF via open redirect."""
-
-    def redirect_request(self, req, fp, code, msg, headers, newurl):
-        _validate_url(newurl)
-        return super().redirect_request(req, fp, code, msg, headers, newurl)
-
-
-def _fetch_url(url: str, timeout: int = 15) -> str:
-    """Fetch URL content, convert HTML to plain text. Stdlib only."""
-    _validate_url(url)
-    req = urllib.request.Request(
-        url,
-        headers={"User-Agent": "decompose/0.2", "Accept": "text/markdown, text/plain, text/html"},
-    )
-    opener = urllib.request.build_opener(_NoRedirectHandler)
-    with opener.open(req, timeout=timeout) as resp:
-        content_type = resp.headers.get("Content-Type", "")
-        body = resp.read(_MAX_RESPONSE_BYTES).decode("utf-8", errors="replace")
-
-        if "text/markdown" in content_type or "text/plain" in content_type:
-            return body
-
-        # HTML → plain text
-        parser = _HTMLToText()
-        parser.feed(body)
-        return parser.get_text()
+# Blocking tool work runs here, off the event loop; serve() reconfigures it
+_executor = ToolExecutor()
+
+
+# Shared across tool calls so repeated hosts reuse pooled connections and
+# unchanged pages are revalidated instead of re-downloaded
+_fetcher = AsyncFetcher()
+_url_cache = UrlCache()
+
+# Chunks settled while a page downloads are analyzed this many at a time
+_PREFETCH_BATCH = 8
+
+# Results too large for one response, paged out by decompose_page
+_results = ResultStore()
+
+_PAGING_PROPERTIES = {
+    "page_size": {
+        "type": "integer", "description": "Units per response; larger results return a cursor for decompose_page",
+        "default": DEFAULT_PAGE_SIZE, "minimum": 1, "maximum": MAX_PAGE_SIZE,
+    },
+    "min_attention": {"type": "number", "description": "Only units with at least this attention score"},
+    "authority": {
+        "type": "array", "items": {"type": "string"},
+        "description": "Only units with these authority levels (e.g. mandatory, prohibitive)",
+    },
+    "risk": {
+        "type": "array", "items": {"type": "string"},
+        "description": "Only units with these risk levels (e.g. safety_critical, compliance)",
+    },
+}
+
+
+_PROJECTION_PROPERTIES = {
+    "fields": {
+        "type": "array", "items": {"type": "string", "enum": list(UNIT_FIELDS)},
+        "description": (
+            "Only these unit fields (e.g. authority, risk, attention); others are not included. "
+            "Use stages to skip the analyzers behind them"
+        ),
+    },
+    "text_preview": {
+        "type": "integer", "description": "Truncate unit text to this many characters (0 = full text)",
+        "default": 0, "minimum": 0,
+    },
+    "stages": {
+        "type": "array", "items": {"type": "string", "enum": list(STAGES)},
+        "description": (
+            "Analyzers to run (default: all). Without classify, units have no authority, risk, type, "
+            "attention or actionable; without entities, no entities, dates or financial; without "
+            "irreducibility, no irreducible or irreducibility"
+        ),
+    },
+}
 
 
 @server.list_tools()
@@ -127,6 +94,8 @@ async def list_tools() -> list[Tool]:
                         "type": "integer", "description": "Max chars per unit (100-100000)",
                         "default": 2000, "minimum": 100, "maximum": 100000,
                     },
+                    **_PROJECTION_PROPERTIES,
+                    **_PAGING_PROPERTIES,
                 },
                 "required": ["text"],
             },
@@ -142,38 +111,190 @@ async def list_tools() -> list[Tool]:
                 "properties": {
                     "url": {"type": "string", "format": "uri", "description": "URL to fetch and decompose"},
                     "compact": {"type": "boolean", "description": "Omit zero-value fields", "default": False},
+                    **_PROJECTION_PROPERTIES,
+                    **_PAGING_PROPERTIES,
                 },
                 "required": ["url"],
             },
         ),
+        Tool(
+            name="decompose_page",
+            description=(
+                "Get the next page of units from a decompose_text or decompose_url result, "
+                "using the next_cursor it returned."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {"cursor": {"type": "string", "description": "A next_cursor from an earlier response"}},
+                "required": ["cursor"],
+            },
+        ),
     ]
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    if name == "decompose_text":
-        result = decompose_text(
-            arguments["text"],
-            compact=arguments.get("compact", False),
-            chunk_size=arguments.get("chunk_size", 2000),
-        )
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
-
-    elif name == "decompose_url":
-        url = arguments["url"]
-        try:
-            text = _fetch_url(url)
-        except (urllib.error.URLError, TimeoutError, OSError, ValueError) as e:
-            return [TextContent(type="text", text=json.dumps({"error": f"Failed to fetch URL: {e}"}))]
+def _unit_options(arguments: dict) -> dict:
+    """decompose_text() output options from tool arguments.
+
+    A projection keeps the fields the paging filters read, and a stage
+    selection the classify stage that produces them.
+    """
+    filtered = [
+        name for name, value in (
+            ("attention", arguments.get("min_attention")),
+            ("authority", arguments.get("authority")),
+            ("risk", arguments.get("risk")),
+        ) if value
+    ]
+    fields = arguments.get("fields")
+    if fields is not None:
+        fields = sorted({*fields, *filtered})
+    stages = arguments.get("stages")
+    if stages is not None:
+        stages = sorted({*stages, *(("classify",) if filtered else ())})
+    return {
+        "compact": arguments.get("compact", False),
+        "fields": fields,
+        "text_preview": max(0, int(arguments.get("text_preview") or 0)),
+        "stages": stages,
+    }
+
+
+def _run_decompose_text(arguments: dict) -> dict:
+    return decompose_text(
+        arguments["text"],
+        chunk_size=arguments.get("chunk_size") or 2000,
+        **_unit_options(arguments),
+    )
+
+
+def _run_decompose_url(url: str, text: str, options: dict, prefetched: MemoryCache) -> dict:
+    result = decompose_text(text, cache=prefetched, **options)
+    del result["meta"]["cache"]  # prefetch hits are not part of the result
+    result["meta"]["source_url"] = url
+    return result
+
+
+def _first_page(result: dict, arguments: dict) -> dict:
+    """Filter a result as the arguments ask, and cut it to its first page."""
+    unit_filter = UnitFilter(
+        min_attention=float(arguments.get("min_attention") or 0.0),
+        authorities=tuple(arguments.get("authority") or ()),
+        risks=tuple(arguments.get("risk") or ()),
+    )
+    page_size = max(1, min(int(arguments.get("page_size") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+    return _results.first_page(result, page_size, unit_filter)
 
-        result = decompose_text(text, compact=arguments.get("compact", False))
-        result["meta"]["source_url"] = url
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
 
-    return [TextContent(type="text", text=json.dumps({"error": f"Unknown tool: {name}"}))]
+def _next_page(cursor: str) -> dict:
+    try:
+        return _results.next_page(cursor)
+    except (KeyError, ValueError):
+        return {"error": "Unknown or expired cursor; call the original tool again", "retryable": False}
+
+
+async def _decompose_url(url: str, options: dict) -> dict:
+    """Fetch (or revalidate) a URL and decompose it, reusing cached results.
+
+    The body is converted to text as it downloads, and chunks are analyzed
+    in the worker pool as soon as they are settled, overlapping the
+    transfer. The final decompose runs over the whole text (its format is
+    only known at the end) and picks those analyses up from a cache.
+    """
+    stages = _unit_stages(options["stages"])
+    prefetched = MemoryCache()
+    pending: list[asyncio.Future] = []
+
+    async def prefetch(texts: list[str]) -> None:
+        try:
+            analyses = await _executor.run(_analyze_batch, texts, stages)
+        except ExecutorBusy:
+            return  # analyzed by the final decompose instead
+        prefetched.set_many({chunk_key(t, stages): a for t, a in zip(texts, analyses, strict=True)})
+
+    async def convert(response: StreamingResponse) -> str:
+        # Conversion is incremental, so each block is a short step on the loop
+        to_text = BodyToText(response.content_type)
+        chunker = TextStreamChunker()
+        parts: list[str] = []
+        batch: list[str] = []
+        async for block in response:
+            text = to_text.feed(block)
+            parts.append(text)
+            batch += chunker.feed(text)
+            if len(batch) >= _PREFETCH_BATCH:
+                pending.append(asyncio.ensure_future(prefetch(batch)))
+                batch = []
+        parts.append(to_text.close())
+        return "".join(parts)
+
+    try:
+        page, _ = await fetch_page(url, _fetcher, _url_cache, convert)
+    except (TimeoutError, OSError, ValueError) as e:
+        for task in pending:
+            task.cancel()
+        return {"error": f"Failed to fetch URL: {e}"}
+    finally:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    key = json.dumps(options, sort_keys=True)
+    result = page.results.get(key)
+    if result is None:
+        result = await _executor.run(_run_decompose_url, url, page.text, options, prefetched)
+        _url_cache.add_result(page, key, result)
+    return result
 
 
-async def serve():
-    """Run the MCP server on stdio."""
-    async with stdio_server() as (read, write):
-        await server.run(read, write, server.create_initialization_options())
+@server.call_tool()
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    try:
+        if name == "decompose_text":
+            result = _first_page(await _executor.run(_run_decompose_text, arguments), arguments)
+        elif name == "decompose_url":
+            # Fetched and converted on the event loop (non-blocking,
+            # pooled); analyzed and decomposed in the worker pool
+            result = await _decompose_url(arguments["url"], _unit_options(arguments))
+            if "error" not in result:
+                result = _first_page(result, arguments)
+        elif name == "decompose_page":
+            result = _next_page(arguments["cursor"])
+        else:
+            result = {"error": f"Unknown tool: {name}"}
+    except ExecutorBusy as e:
+        result = {"error": str(e), "retryable": True, **_executor.stats()}
+    except ValueError as e:
+        result = {"error": str(e), "retryable": False}
+    # Compact separators: agents parse the JSON, and whitespace costs tokens
+    return [TextContent(type="text", text=json.dumps(result, separators=(",", ":")))]
+
+
+async def serve(
+    *,
+    workers: int = 4,
+    pool: PoolKind = "thread",
+    max_queue: int = 32,
+    url_cache_chars: int = 64_000_000,
+    url_ttl: float = 300.0,
+    result_cache_chars: int = 32_000_000,
+):
+    """Run the MCP server on stdio.
+
+    Args:
+        workers: Tool calls running at once (0 = one per CPU).
+        pool: "thread", or "process" to run CPU-bound decomposition in parallel.
+        max_queue: Calls waiting for a worker before new ones are rejected
+            with a retryable 'Server busy' error.
+        url_cache_chars: Size of the decompose_url page cache (0 disables it).
+        url_ttl: Seconds a cached page is served before being revalidated.
+        result_cache_chars: Unit text kept for paging with decompose_page
+            (0 returns first pages only).
+    """
+    global _executor, _url_cache, _results
+    _executor = ToolExecutor(workers, max_queue, pool)
+    _url_cache = UrlCache(url_cache_chars, url_ttl)
+    _results = ResultStore(result_cache_chars)
+    try:
+        async with stdio_server() as (read, write):
+            await server.run(read, write, server.create_initialization_options())
+    finally:
+        _executor.shutdown(wait=False)
+        await _fetcher.close()
@@ -0,0 +1,126 @@
+"""Paged results — large decompose results handed out a page of units at a time.
+
+A result with more units than fit on one page is kept in a ``ResultStore``
+under a random handle. The first page carries the document meta and a
+cursor, and ``next_page(cursor)`` returns each later page. Filters apply
+before paging, so pages and totals count only the units asked for.
+"""
+
+from __future__ import annotations
+
+import secrets
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# Characters a unit is charged beyond its text, so projected units without
+# 'text' still count toward the bound
+UNIT_OVERHEAD = 32
+
+
+def units_size(units: list[dict]) -> int:
+    """Stored size of units: their text plus UNIT_OVERHEAD each."""
+    return sum(len(u.get("text", "")) for u in units) + UNIT_OVERHEAD * len(units)
+
+
+@dataclass(slots=True, frozen=True)
+class UnitFilter:
+    """Units to keep. Every given criterion must hold; empty ones match anything."""
+
+    min_attention: float = 0.0
+    authorities: tuple[str, ...] = ()
+    risks: tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return self.min_attention > 0 or bool(self.authorities) or bool(self.risks)
+
+    def matches(self, unit: dict) -> bool:
+        return (
+            unit.get("attention", 0) >= self.min_attention
+            and (not self.authorities or unit.get("authority") in self.authorities)
+            and (not self.risks or unit.get("risk") in self.risks)
+        )
+
+
+@dataclass(slots=True)
+class _Stored:
+    units: list[dict]
+    page_size: int
+    size: int
+
+
+class ResultStore:
+    """LRU of paged results, bounded by the total size of their units.
+
+    Args:
+        max_chars: Total units_size() kept. A result larger than this (or any
+            result, with 0) gets only its first page, without a cursor.
+    """
+
+    def __init__(self, max_chars: int = 32_000_000):
+        self.max_chars = max_chars
+        self.size = 0
+        self._results: OrderedDict[str, _Stored] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def first_page(
+        self, result: dict, page_size: int = DEFAULT_PAGE_SIZE, unit_filter: UnitFilter | None = None,
+    ) -> dict:
+        """Meta and the first page of ``result``'s units, filtered.
+
+        An unfiltered result that fits one page is returned as it is.
+        Otherwise the response has a 'page' entry: the units' 'offset',
+        'returned', 'total' and, while units remain, 'next_cursor'.
+        """
+        units = result["units"]
+        if unit_filter:
+            units = [u for u in units if unit_filter.matches(u)]
+        elif len(units) <= page_size:
+            return result
+
+        cursor = self._put(units, page_size) if len(units) > page_size else None
+        first = units[:page_size]
+        page = {"offset": 0, "returned": len(first), "total": len(units), "next_cursor": cursor}
+        return {"units": first, "meta": result["meta"], "page": page}
+
+    def next_page(self, cursor: str) -> dict:
+        """The page of units at ``cursor``.
+
+        Raises:
+            ValueError: The cursor is malformed.
+            KeyError: The cursor's result is unknown or has been evicted.
+        """
+        handle, _, offset_text = cursor.partition(":")
+        try:
+            offset = int(offset_text)
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            raise ValueError(f"Malformed cursor: {cursor!r}")
+
+        stored = self._results.get(handle)
+        if stored is None:
+            raise KeyError(cursor)
+        self._results.move_to_end(handle)
+
+        end = offset + stored.page_size
+        units = stored.units[offset:end]
+        next_cursor = f"{handle}:{end}" if end < len(stored.units) else None
+        page = {"offset": offset, "returned": len(units), "total": len(stored.units), "next_cursor": next_cursor}
+        return {"units": units, "page": page}
+
+    def _put(self, units: list[dict], page_size: int) -> str | None:
+        size = units_size(units)
+        if size > self.max_chars:
+            return None
+        handle = secrets.token_hex(8)
+        self._results[handle] = _Stored(units, page_size, size)
+        self.size += size
+        while self.size > self.max_chars:
+            _, evicted = self._results.popitem(last=False)
+            self.size -= evicted.size
+        return f"{handle}:{page_size}"
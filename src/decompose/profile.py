@@ -0,0 +1,296 @@
+"""Rule profiler — time and match counts per regex and per table, over your own documents.
+
+``profile_rules(documents)`` chunks each document as decompose_text() does
+and runs every chunk through the rule scans with each pattern timed on
+its own:
+
+- the shared ``RuleSet`` of analysis.py (authority, risk, content type,
+  irreducibility and the dollar gate) on the lowercased chunk: the
+  candidate scan, each rule's confirmations at candidate positions, and
+  the ``findall`` of rules without a literal prefix;
+- each entity regex of entities.py, skipped like in analyze_chunk() when
+  the shared scan rules its matches out.
+
+Each pattern also gets a ``standalone`` time, a plain ``findall`` over
+every chunk: what the rule would cost if it were scanned on its own, and
+what it costs wherever the candidate scan cannot narrow it down.
+
+Every timed call adds one clock read; its median cost is measured first
+and subtracted, so rules confirmed at many positions are not overcharged.
+The numbers rank rules against each other. For end-to-end throughput use
+``benchmarks/``.
+"""
+
+from __future__ import annotations
+
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from decompose import entities
+from decompose.analysis import _DOLLAR_GATE, _MDY_GATE, _RULES
+from decompose.chunker import DEFAULT_CHUNK_SIZE, DEFAULT_OVERLAP, auto_chunk
+from decompose.timing import clock
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from decompose.rules import RuleSet
+
+# The entity regexes and the Entities field each fills
+ENTITY_RULES = (
+    (entities._STANDARD_INTL, "standards"),
+    (entities._CFR, "references"),
+    (entities._USC, "references"),
+    (entities._DATE_MDY, "dates"),
+    (entities._DATE_WRITTEN, "dates"),
+    (entities._DOLLAR, "financial"),
+    (entities._PERCENT, "financial"),
+)
+
+# The shared scan's rules that gate the dollar and M/D/Y entity scans
+_GATES = ((entities._DOLLAR, _DOLLAR_GATE), (entities._DATE_MDY, _MDY_GATE))
+
+# Key of the candidate scanner's own record. Its time is the whole scan
+# loop less the confirmations: the trie match and the per-candidate lookups.
+SCANNER_KEY = ("rules", "candidate_scan")
+
+# Rankings accepted by RuleProfile.ranked()
+ORDERS = ("ns", "standalone_ns", "matches", "calls")
+
+
+@dataclass(slots=True)
+class PatternCost:
+    """Time and matches of one pattern over the profiled documents.
+
+    ``ns`` is the time spent in the pattern during the production scan,
+    over ``calls`` regex calls: candidate confirmations for a rule with a
+    literal prefix, or one ``findall`` / ``finditer`` per chunk otherwise.
+    ``standalone_ns`` is a full ``findall`` over every chunk. ``keys`` are
+    the ``(table, label)`` pairs its matches count for.
+    """
+
+    pattern: str
+    keys: list[tuple[str, str]]
+    ns: int = 0
+    calls: int = 0
+    matches: int = 0
+    standalone_ns: int = 0
+
+    @property
+    def tables(self) -> list[str]:
+        return list(dict.fromkeys(table for table, _ in self.keys))
+
+
+@dataclass(slots=True)
+class RuleProfile:
+    """Per-pattern costs over ``chars`` characters in ``chunks`` chunks.
+
+    Costs per MB are nanoseconds per million input characters.
+    """
+
+    documents: int
+    chunks: int
+    chars: int
+    clock_overhead_ns: int
+    patterns: list[PatternCost] = field(default_factory=list)
+
+    def per_mb(self, ns: float) -> float:
+        return ns * 1_000_000 / self.chars if self.chars else 0.0
+
+    def ranked(self, by: str = "ns") -> list[PatternCost]:
+        """Patterns by descending ``by`` (one of ``ORDERS``)."""
+        if by not in ORDERS:
+            raise ValueError(f"Unknown order: {by!r} (expected one of {', '.join(ORDERS)})")
+        return sorted(self.patterns, key=lambda p: getattr(p, by), reverse=True)
+
+    def tables(self) -> dict[str, dict]:
+        """Totals per table, most expensive first.
+
+        A pattern in several tables is matched once, so its time is split
+        evenly between them; its matches count for each.
+        """
+        totals: dict[str, dict] = {}
+        for p in self.patterns:
+            tables = p.tables
+            for table in tables:
+                t = totals.setdefault(table, {"patterns": 0, "ns": 0.0, "standalone_ns": 0.0, "matches": 0})
+                t["patterns"] += 1
+                t["ns"] += p.ns / len(tables)
+                t["standalone_ns"] += p.standalone_ns / len(tables)
+                t["matches"] += p.matches
+        return dict(sorted(totals.items(), key=lambda kv: kv[1]["ns"], reverse=True))
+
+    def to_dict(self, top: int | None = None, by: str = "ns") -> dict:
+        """JSON-ready report: totals, per-table costs and the ``top`` patterns by ``by``."""
+        total = sum(p.ns for p in self.patterns)
+        ranked = self.ranked(by)[:top] if top else self.ranked(by)
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "chars": self.chars,
+            "clock_overhead_ns": self.clock_overhead_ns,
+            "total_ns": total,
+            "ns_per_mb": round(self.per_mb(total)),
+            "tables": {
+                table: {
+                    "patterns": t["patterns"], "matches": t["matches"],
+                    "ns": round(t["ns"]), "ns_per_mb": round(self.per_mb(t["ns"])),
+                    "standalone_ns_per_mb": round(self.per_mb(t["standalone_ns"])),
+                    "share": round(t["ns"] / total, 4) if total else 0.0,
+                }
+                for table, t in self.tables().items()
+            },
+            "patterns": [
+                {
+                    "pattern": p.pattern, "keys": [list(k) for k in p.keys],
+                    "ns": p.ns, "calls": p.calls, "matches": p.matches,
+                    "ns_per_mb": round(self.per_mb(p.ns)),
+                    "standalone_ns_per_mb": round(self.per_mb(p.standalone_ns)),
+                    "share": round(p.ns / total, 4) if total else 0.0,
+                }
+                for p in ranked
+            ],
+        }
+
+
+def clock_overhead(samples: int = 1001) -> int:
+    """Median nanoseconds one timed call adds to what it measures."""
+    deltas = []
+    for _ in range(samples):
+        t = clock()
+        deltas.append(clock() - t)
+    return int(statistics.median(deltas))
+
+
+def profile_rules(
+    documents: Iterable[str | Path],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    repeat: int = 3,
+    standalone: bool = True,
+) -> RuleProfile:
+    """Attribute rule-scan time and matches to each pattern over ``documents``.
+
+    Args:
+        documents: Texts, or paths of UTF-8 files.
+        chunk_size: Max characters per chunk, as for decompose_text().
+        overlap: Chunk overlap, as for decompose_text().
+        repeat: Passes over the chunks; each pattern keeps its fastest
+            pass, which filters out one-off stalls.
+        standalone: Also time a plain ``findall`` of each pattern.
+
+    Returns:
+        A RuleProfile with one PatternCost per rule, per entity regex, and
+        one for the candidate scanner (``SCANNER_KEY``).
+    """
+    texts = []
+    documents_seen = 0
+    for doc in documents:
+        text = doc.read_text(encoding="utf-8") if isinstance(doc, Path) else doc
+        texts += [c.text for c in auto_chunk(text, chunk_size=chunk_size, overlap=overlap)]
+        documents_seen += 1
+
+    rules = _RULES
+    overhead = clock_overhead()
+    costs = [PatternCost(p, [tuple(k) for k in keys]) for p, keys in zip(rules.patterns, rules.keys, strict=True)]
+    costs += [PatternCost(rx.pattern, [("entities", name)]) for rx, name in ENTITY_RULES]
+    scanner = PatternCost(rules._scanner.pattern if rules._scanner else "", [SCANNER_KEY])
+    gates = {id(rx): next(i for i, keys in enumerate(rules.keys) if key in keys) for rx, key in _GATES}
+
+    best: list[int] | None = None
+    best_alone: list[int] | None = None
+    for _ in range(max(1, repeat)):
+        ns = [0] * (len(costs) + 1)
+        calls = [0] * len(costs)
+        matches = [0] * len(costs)
+        for text in texts:
+            lower = text.lower()
+            counts = _scan(rules, lower, ns, calls, overhead)
+            for i, n in enumerate(counts):
+                matches[i] += n
+            for j, (rx, _) in enumerate(ENTITY_RULES):
+                gate = gates.get(id(rx))
+                if gate is not None and not counts[gate]:
+                    continue
+                i = len(rules.patterns) + j
+                t = clock()
+                found = sum(1 for _ in rx.finditer(text))
+                ns[i] += clock() - t - overhead
+                calls[i] += 1
+                matches[i] += found
+        best = ns if best is None else [min(a, b) for a, b in zip(best, ns, strict=True)]
+        if standalone:
+            alone = _standalone(rules, texts, overhead)
+            best_alone = alone if best_alone is None else [min(a, b) for a, b in zip(best_alone, alone, strict=True)]
+
+    for i, cost in enumerate(costs):
+        cost.ns = max(0, best[i])
+        cost.calls, cost.matches = calls[i], matches[i]
+        cost.standalone_ns = max(0, best_alone[i]) if best_alone else 0
+    scanner.ns = max(0, best[-1])
+    scanner.calls = len(texts) if rules._scanner else 0
+    scanner.standalone_ns = max(0, best_alone[-1]) if best_alone else 0
+    return RuleProfile(documents_seen, len(texts), sum(map(len, texts)), overhead, [*costs, scanner])
+
+
+def _scan(rules: RuleSet, text: str, ns: list[int], calls: list[int], overhead: int) -> list[int]:
+    """RuleSet.counts(), adding each rule's time to ``ns`` and the scanner's to ``ns[-1]``."""
+    counts = [0] * len(rules.patterns)
+    compiled = rules._compiled
+
+    if rules._scanner is not None:
+        resume = [0] * len(rules.patterns)
+        confirmed = 0
+        timed = 0
+        start = clock()
+        for cand in rules._scanner.finditer(text):
+            pos = cand.start()
+            for i in rules._candidates(cand.group()):
+                if pos >= resume[i]:
+                    t = clock()
+                    m = compiled[i].match(text, pos)
+                    elapsed = clock() - t
+                    ns[i] += elapsed - overhead
+                    calls[i] += 1
+                    confirmed += elapsed
+                    timed += 1
+                    if m is not None:
+                        counts[i] += 1
+                        resume[i] = m.end()
+        # What is left is the candidate scan itself, less the clock reads
+        ns[-1] += clock() - start - confirmed - timed * overhead
+
+    for i in rules._fallback:
+        t = clock()
+        counts[i] = len(compiled[i].findall(text))
+        ns[i] += clock() - t - overhead
+        calls[i] += 1
+
+    return counts
+
+
+def _standalone(rules: RuleSet, texts: list[str], overhead: int) -> list[int]:
+    """A full findall per pattern over every chunk, in ``_scan``'s index order."""
+    lowered = [t.lower() for t in texts]
+    ns = []
+    for rx in rules._compiled:
+        t = clock()
+        for text in lowered:
+            rx.findall(text)
+        ns.append(clock() - t - overhead)
+    for rx, _ in ENTITY_RULES:
+        t = clock()
+        for text in texts:
+            rx.findall(text)
+        ns.append(clock() - t - overhead)
+    scan = rules._scanner
+    t = clock()
+    if scan is not None:
+        for text in lowered:
+            for _ in scan.finditer(text):
+                pass
+    ns.append(clock() - t - overhead)
+    return ns
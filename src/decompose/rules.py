@@ -0,0 +1,252 @@
+"""Compiled rule tables — many regexes, one scan.
+
+A pattern table such as ``AUTHORITY_PATTERNS`` is a list of independent
+regexes, each counted with ``re.findall``. Scanning the text once per
+pattern is simple but costs one full pass per rule. ``RuleSet`` compiles a
+table into a single candidate scanner keyed on each rule's literal prefix
+(``\\bshall``, ``\\bin``, ``\\$`` ...), shaped as a prefix trie, then
+confirms only the rules whose prefix occurs at a candidate position.
+Counts are exactly those of calling ``re.findall`` per pattern: matches of
+one rule never overlap, matches of different rules may.
+
+Rules without a usable literal prefix fall back to a dedicated ``findall``.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable
+
+_QUANTIFIERS = frozenset("?*{")
+
+
+def _literal_prefixes(pattern: str) -> tuple[tuple[str, ...], bool]:
+    """Return ``(prefixes, anchored)`` for a pattern, or ``((), False)``.
+
+    ``anchored`` means the pattern starts with ``\\b``. A prefix is the run
+    of ASCII letters a match must begin with, or a single escaped
+    punctuation character such as ``\\$``. A leading ``(?:a|b|c)`` group
+    yields one prefix per branch. Patterns with a top-level ``|`` have no
+    common prefix.
+    """
+    if len(_split_alternatives(pattern)) > 1:
+        return ((), False)
+
+    anchored = pattern.startswith(r"\b")
+    rest = pattern[2:] if anchored else pattern
+
+    if len(rest) >= 2 and rest[0] == "\\" and not rest[1].isalnum() and rest[1] != "\\":
+        if rest[2:3] and rest[2] in _QUANTIFIERS:
+            return ((), False)
+        return ((rest[1],), anchored)
+
+    if not anchored:
+        # An unanchored letter prefix can start mid-word, inside another
+        # candidate; leave those rules to the fallback scan.
+        return ((), False)
+
+    if rest.startswith("(?:"):
+        end = _group_end(rest)
+        after = rest[end + 1 : end + 2]
+        if end < 0 or (after and after in "?*{+"):
+            return ((), False)
+        branches = _split_alternatives(rest[3:end])
+    else:
+        branches = [rest]
+
+    prefixes = tuple(_letter_prefix(b) for b in branches)
+    if not all(prefixes):
+        return ((), False)
+    return (prefixes, True)
+
+
+def _letter_prefix(fragment: str) -> str:
+    i = 0
+    while i < len(fragment) and fragment[i].isascii() and fragment[i].isalpha():
+        i += 1
+    if i < len(fragment) and fragment[i] in _QUANTIFIERS:
+        return fragment[: i - 1]  # the quantifier makes the last letter optional
+    return fragment[:i]
+
+
+def _group_end(pattern: str) -> int:
+    """Index of the ``)`` closing the group that opens ``pattern``, or -1."""
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return -1
+
+
+def _split_alternatives(pattern: str) -> list[str]:
+    """Split a pattern on its top-level ``|``."""
+    parts = []
+    depth = 0
+    in_class = False
+    last = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            parts.append(pattern[last:i])
+            last = i + 1
+        i += 1
+    parts.append(pattern[last:])
+    return parts
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation of ``words`` shaped as a prefix trie."""
+    root: dict = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return "(?:" + emit(root) + ")"
+
+
+class RuleSet:
+    """A table of regex rules counted in a single candidate scan.
+
+    Args:
+        rules: ``(pattern, key)`` pairs. The same pattern may appear under
+            several keys (e.g. ``\\bshall\\s+comply\\b`` is both an authority
+            and a risk rule); it is matched once and credited to each key.
+        flags: Regex flags applied to every pattern.
+    """
+
+    __slots__ = ("patterns", "keys", "_compiled", "_flags", "_scanner", "_prefixes", "_tries", "_fallback")
+
+    def __init__(self, rules: Iterable[tuple[str, Hashable]], flags: int = re.IGNORECASE):
+        self.patterns: list[str] = []
+        self.keys: list[list[Hashable]] = []
+        index: dict[str, int] = {}
+        for pattern, key in rules:
+            i = index.get(pattern)
+            if i is None:
+                i = index[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+                self.keys.append([])
+            self.keys[i].append(key)
+
+        self._compiled = [re.compile(p, flags) for p in self.patterns]
+
+        by_prefix: dict[str, list[int]] = {}
+        anchored_only: dict[str, bool] = {}
+        self._fallback: list[int] = []
+        for i, p in enumerate(self.patterns):
+            prefixes, anchored = _literal_prefixes(p)
+            if not prefixes:
+                self._fallback.append(i)
+            for prefix in prefixes:
+                if flags & re.IGNORECASE:
+                    prefix = prefix.lower()
+                by_prefix.setdefault(prefix, []).append(i)
+                anchored_only[prefix] = anchored_only.get(prefix, True) and anchored
+
+        # One trie-shaped alternation per anchoring: the regex engine then
+        # tests a single branch per character instead of every prefix, and
+        # the optional tails make it report the longest prefix present.
+        # Every shorter prefix matching at that position is one of its
+        # string prefixes.
+        self._flags = flags
+        self._tries: dict[str, tuple[int, ...]] = {}
+        for prefix in by_prefix:
+            self._tries[prefix] = tuple(sorted({
+                i for other, ids in by_prefix.items() if prefix.startswith(other) for i in ids
+            }))
+        self._prefixes = tuple(by_prefix)
+        anchored = [k for k in by_prefix if anchored_only[k]]
+        loose = [k for k in by_prefix if not anchored_only[k]]
+        branches = []
+        if anchored:
+            branches.append("\\b" + _trie_pattern(anchored))
+        if loose:
+            branches.append(_trie_pattern(loose))
+        self._scanner = re.compile("|".join(branches), flags) if branches else None
+
+    def _candidates(self, found: str) -> tuple[int, ...]:
+        """Rule indices whose prefix is a prefix of the scanned text ``found``."""
+        key = found.casefold() if self._flags & re.IGNORECASE else found
+        ids = self._tries.get(key)
+        if ids is None:
+            # A case-insensitive equivalent that casefolds differently (rare
+            # non-ASCII letters): find the prefix it stands for directly.
+            ids = ()
+            for prefix in self._prefixes:
+                if re.fullmatch(re.escape(prefix), found, self._flags):
+                    ids = self._tries[prefix]
+                    break
+        return ids
+
+    def counts(self, text: str) -> list[int]:
+        """Per-pattern match counts, equal to ``len(re.findall(p, text))``."""
+        counts = [0] * len(self.patterns)
+
+        if self._scanner is not None:
+            compiled = self._compiled
+            resume = [0] * len(self.patterns)
+            for cand in self._scanner.finditer(text):
+                pos = cand.start()
+                for i in self._candidates(cand.group()):
+                    if pos >= resume[i]:
+                        m = compiled[i].match(text, pos)
+                        if m is not None:
+                            counts[i] += 1
+                            resume[i] = m.end()
+
+        for i in self._fallback:
+            counts[i] = len(self._compiled[i].findall(text))
+
+        return counts
+
+    def tally(self, text: str) -> dict[Hashable, int]:
+        """Total match count per key, omitting keys with no matches."""
+        totals: dict[Hashable, int] = {}
+        for i, n in enumerate(self.counts(text)):
+            if n:
+                for key in self.keys[i]:
+                    totals[key] = totals.get(key, 0) + n
+        return totals
@@ -0,0 +1,132 @@
+"""Stage timings — opt-in per-stage nanosecond totals, per-chunk maxima, and span hooks.
+
+Pass ``timings=True`` to decompose_text(), iter_decompose() or
+decompose_file() to get ``meta["timings"]``: the total and, per stage,
+the cumulative nanoseconds, the number of timed calls, and the slowest
+single call with the chunk it ran on. Pass ``span_hook=`` to receive each
+``Span`` as it ends, e.g. to forward it to a tracer. With neither, nothing
+is timed and the pipeline only checks for a missing timer.
+
+Stages (``TIMED_STAGES``), in pipeline order:
+
+- ``chunk``: auto_chunk() (per chunk when streaming).
+- ``cache``: analysis cache lookups and stores.
+- ``scan``: the rule scan whose tallies feed classify and irreducibility.
+- ``classify``, ``entities``, ``irreducibility``: each analyzer's own work.
+- ``units``: building unit dicts.
+- ``encode``: the json.dumps of each unit behind the output token estimate.
+- ``tokens``: tokenizer counts, when a tokenizer is given.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+TIMED_STAGES = ("chunk", "cache", "scan", "classify", "entities", "irreducibility", "units", "encode", "tokens")
+
+clock = time.perf_counter_ns
+
+
+@dataclass(slots=True, frozen=True)
+class Span:
+    """One timed stage call, on the ``time.perf_counter_ns()`` clock.
+
+    ``chunk`` is the chunk's index in document order, or None for a
+    stage that ran over the whole document.
+    """
+
+    stage: str
+    start_ns: int
+    end_ns: int
+    chunk: int | None = None
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+SpanHook = Callable[[Span], None]
+
+
+class StageTimer:
+    """Accumulates stage spans; passes each to ``hook`` if given.
+
+    Args:
+        hook: Called with each Span as it ends.
+        record: Keep the spans, so a timer filled in a worker process can
+            replay them to the parent's hook (see merge()).
+    """
+
+    __slots__ = ("hook", "spans", "start_ns", "totals", "calls", "max_ns", "max_chunk")
+
+    def __init__(self, hook: SpanHook | None = None, record: bool = False):
+        self.hook = hook
+        self.spans: list[Span] | None = [] if record else None
+        self.start_ns = clock()
+        self.totals: dict[str, int] = {}
+        self.calls: dict[str, int] = {}
+        self.max_ns: dict[str, int] = {}
+        self.max_chunk: dict[str, int | None] = {}
+
+    def add(self, stage: str, start_ns: int, chunk: int | None = None) -> int:
+        """Record ``stage`` as running from ``start_ns`` until now; returns now.
+
+        The return value can start the next stage's span, so consecutive
+        stages cost one clock read each.
+        """
+        end = clock()
+        elapsed = end - start_ns
+        self.totals[stage] = self.totals.get(stage, 0) + elapsed
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        if elapsed > self.max_ns.get(stage, -1):
+            self.max_ns[stage] = elapsed
+            self.max_chunk[stage] = chunk
+        if self.hook is not None or self.spans is not None:
+            span = Span(stage, start_ns, end, chunk)
+            if self.spans is not None:
+                self.spans.append(span)
+            if self.hook is not None:
+                self.hook(span)
+        return end
+
+    def merge(self, other: StageTimer, offset: int = 0) -> None:
+        """Fold in ``other``'s timings, its chunk indices shifted by ``offset``.
+
+        Recorded spans are replayed to this timer's hook. perf_counter_ns
+        is system-wide on Linux and macOS, so worker spans line up with ours.
+        """
+        for stage, ns in other.totals.items():
+            self.totals[stage] = self.totals.get(stage, 0) + ns
+            self.calls[stage] = self.calls.get(stage, 0) + other.calls[stage]
+            if other.max_ns[stage] > self.max_ns.get(stage, -1):
+                chunk = other.max_chunk[stage]
+                self.max_ns[stage] = other.max_ns[stage]
+                self.max_chunk[stage] = None if chunk is None else chunk + offset
+        if self.hook is not None and other.spans:
+            for span in other.spans:
+                chunk = None if span.chunk is None else span.chunk + offset
+                self.hook(Span(span.stage, span.start_ns, span.end_ns, chunk))
+
+    def meta(self) -> dict:
+        """``meta["timings"]``: the total, then each stage in pipeline order."""
+        order = {stage: i for i, stage in enumerate(TIMED_STAGES)}
+        stages = sorted(self.totals, key=lambda s: order.get(s, len(order)))
+        return {
+            "total_ns": clock() - self.start_ns,
+            "stages": {
+                stage: {
+                    "ns": self.totals[stage],
+                    "calls": self.calls[stage],
+                    "max_ns": self.max_ns[stage],
+                    "max_chunk": self.max_chunk[stage],
+                }
+                for stage in stages
+            },
+        }
+
+
+def stage_timer(timings: bool, span_hook: SpanHook | None) -> StageTimer | None:
+    """A timer if timings or a hook were asked for, else None."""
+    return StageTimer(span_hook) if timings or span_hook is not None else None
@@ -0,0 +1,189 @@
+"""Token counting — exact counts from a pluggable tokenizer, cached by content.
+
+Token estimates default to ~4 characters per token. Pass ``tokenizer=`` to
+decompose_text(), filter_for_llm() or decompose_for_llm() for real counts.
+It may be any callable returning a count or a token sequence (such as
+``tiktoken.get_encoding("cl100k_base").encode``), the path to a local BPE
+vocabulary file, or a TokenCounter. Counts are cached per text by a hash of
+its content, and the counter for a given tokenizer is kept between calls,
+so repeated boilerplate units are tokenized once across documents.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import re
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from pathlib import Path
+from types import MethodType
+
+# cl100k-style pre-tokenizer for the stdlib ``re`` module: letters are
+# [^\W\d_] and digits \d, in place of \p{L} and \p{N}
+BPE_PATTERN = (
+    r"(?i:'s|'t|'re|'ve|'m|'ll|'d)|(?:[^\r\n\w]|_)?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+
+
+class BPETokenizer:
+    """Byte-pair encoding from a local tiktoken-format vocabulary file.
+
+    Each line of the file is a base64-encoded token and its merge rank,
+    as in ``cl100k_base.tiktoken``. Text is split with ``pattern``, then
+    each piece's bytes are merged lowest rank first. Nothing is downloaded.
+
+    Args:
+        path: Vocabulary file.
+        pattern: Pre-tokenizer regex (default BPE_PATTERN).
+    """
+
+    def __init__(self, path: str | os.PathLike, pattern: str = BPE_PATTERN):
+        self.path = os.fspath(path)
+        self._split = re.compile(pattern).findall
+        self._ranks: dict[bytes, int] = {}
+        for line in Path(path).read_bytes().splitlines():
+            if line.strip():
+                token, rank = line.split()
+                self._ranks[base64.b64decode(token)] = int(rank)
+        self._pieces: dict[str, int] = {}  # tokens per pre-tokenized piece
+
+    def __call__(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        pieces = self._pieces
+        total = 0
+        for piece in self._split(text):
+            n = pieces.get(piece)
+            if n is None:
+                n = self._merge(piece.encode("utf-8", "surrogatepass"))
+                if len(pieces) < 1_000_000:
+                    pieces[piece] = n
+            total += n
+        return total
+
+    def _merge(self, data: bytes) -> int:
+        ranks = self._ranks
+        if data in ranks:
+            return 1
+        parts = [data[i : i + 1] for i in range(len(data))]
+        while len(parts) > 1:
+            best, at = None, -1
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best is None or rank < best):
+                    best, at = rank, i
+            if best is None:
+                break
+            parts[at : at + 2] = [parts[at] + parts[at + 1]]
+        return len(parts)
+
+
+class TokenCounter:
+    """Token counts of texts, cached by content hash in a bounded LRU.
+
+    Args:
+        tokenizer: Callable returning a count or a token sequence.
+        max_entries: Counts kept (0 disables caching).
+    """
+
+    def __init__(self, tokenizer: Callable[[str], int | Sequence], max_entries: int = 100_000):
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._counts: OrderedDict[bytes, int] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __call__(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        n = self._counts.get(key)
+        if n is not None:
+            self.hits += 1
+            self._counts.move_to_end(key)
+            return n
+        self.misses += 1
+        n = self.count(text)
+        if self.max_entries > 0:
+            self._counts[key] = n
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return n
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``, bypassing the cache."""
+        n = self.tokenizer(text)
+        return n if isinstance(n, int) else len(n)
+
+    def fit(self, text: str, budget: int) -> str:
+        """The longest prefix of ``text`` with at most ``budget`` tokens."""
+        if budget <= 0:
+            return ""
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.count(text[:mid]) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        return text[:lo]
+
+
+Tokenizer = Callable[[str], int | Sequence] | str | os.PathLike | TokenCounter
+
+
+class _WeakCall:
+    """Calls a tokenizer through a weak reference, so a shared counter does not keep it alive."""
+
+    __slots__ = ("_ref",)
+
+    def __init__(self, tokenizer: Callable[[str], int | Sequence]):
+        self._ref = weakref.WeakMethod(tokenizer) if isinstance(tokenizer, MethodType) else weakref.ref(tokenizer)
+
+    def __call__(self, text: str) -> int | Sequence:
+        return self._ref()(text)
+
+
+# Shared counters per callable tokenizer, dropped with it. Bound methods
+# such as ``encoding.encode`` are new objects on each access, so they are
+# keyed by the instance they are bound to, then by function.
+_COUNTERS: weakref.WeakKeyDictionary[object, dict[object, TokenCounter]] = weakref.WeakKeyDictionary()
+
+
+def token_counter(tokenizer: Tokenizer) -> TokenCounter:
+    """The shared TokenCounter for a tokenizer, so its counts persist between calls.
+
+    A callable's counter lives as long as the callable. One that cannot be
+    weakly referenced or hashed gets a fresh counter each call.
+
+    Args:
+        tokenizer: A TokenCounter (returned as is), a path to a BPE
+            vocabulary file, or a callable as for TokenCounter.
+    """
+    if isinstance(tokenizer, TokenCounter):
+        return tokenizer
+    if isinstance(tokenizer, (str, os.PathLike)):
+        return _path_counter(os.fspath(tokenizer))
+
+    owner, func = (tokenizer.__self__, tokenizer.__func__) if isinstance(tokenizer, MethodType) else (tokenizer, None)
+    try:
+        counters = _COUNTERS.get(owner)
+        if counters is None:
+            counters = _COUNTERS[owner] = {}
+    except TypeError:
+        return TokenCounter(tokenizer)
+    counter = counters.get(func)
+    if counter is None:
+        counter = counters[func] = TokenCounter(_WeakCall(tokenizer))
+    return counter
+
+
+@lru_cache(maxsize=16)
+def _path_counter(path: str) -> TokenCounter:
+    return TokenCounter(BPETokenizer(path))
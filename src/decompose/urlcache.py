@@ -0,0 +1,145 @@
+"""URL cache — conditional requests so unchanged pages are never re-downloaded.
+
+A cached page keeps the text converted from the response, the decompose
+results computed from it, and the
+response's ETag / Last-Modified. Within ``ttl`` a page is served without
+touching the network; after that it is revalidated with If-None-Match /
+If-Modified-Since, and a 304 keeps serving the cached text and results.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from decompose.fetch import AsyncFetcher, FetchError, StreamingResponse
+from decompose.paging import units_size
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+
+@dataclass(slots=True)
+class CachedPage:
+    """Converted text of a URL, its validators, and results computed from it."""
+
+    url: str
+    text: str
+    etag: str | None = None
+    last_modified: str | None = None
+    stored_at: float = 0.0
+    results: dict[str, dict] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        """Characters of text, counting each result by units_size()."""
+        return len(self.text) + sum(units_size(r["units"]) for r in self.results.values())
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this page."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class UrlCache:
+    """In-memory LRU of fetched pages, bounded by total size in characters.
+
+    Args:
+        max_chars: Total text and result size kept (0 disables caching).
+        ttl: Seconds a page is served without revalidation.
+        clock: Time source, in seconds.
+    """
+
+    def __init__(self, max_chars: int = 64_000_000, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_chars = max_chars
+        self.ttl = ttl
+        self.clock = clock
+        self.size = 0
+        self._pages: OrderedDict[str, CachedPage] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, url: str) -> CachedPage | None:
+        page = self._pages.get(url)
+        if page is not None:
+            self._pages.move_to_end(url)
+        return page
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return self.clock() - page.stored_at < self.ttl
+
+    def put(self, url: str, text: str, headers: dict[str, str]) -> CachedPage:
+        """Store a freshly fetched page, replacing any earlier version."""
+        page = CachedPage(
+            url, text, etag=headers.get("etag"), last_modified=headers.get("last-modified"), stored_at=self.clock(),
+        )
+        self.discard(url)
+        if "no-store" not in headers.get("cache-control", "").lower():
+            self._pages[url] = page
+            self.size += page.size
+            self._evict()
+        return page
+
+    def refresh(self, page: CachedPage, headers: dict[str, str]) -> None:
+        """Mark a page revalidated by a 304, taking any updated validators."""
+        page.stored_at = self.clock()
+        page.etag = headers.get("etag", page.etag)
+        page.last_modified = headers.get("last-modified", page.last_modified)
+
+    def add_result(self, page: CachedPage, key: str, result: dict) -> None:
+        """Keep a decompose result computed from ``page`` under ``key``."""
+        stored = self._pages.get(page.url) is page
+        if stored:
+            self.size -= page.size
+        page.results[key] = result
+        if stored:
+            self.size += page.size
+            self._evict()
+
+    def discard(self, url: str) -> None:
+        page = self._pages.pop(url, None)
+        if page is not None:
+            self.size -= page.size
+
+    def _evict(self) -> None:
+        while self._pages and self.size > self.max_chars:
+            _, page = self._pages.popitem(last=False)
+            self.size -= page.size
+
+
+async def fetch_page(
+    url: str,
+    fetcher: AsyncFetcher,
+    cache: UrlCache,
+    convert: Callable[[StreamingResponse], Awaitable[str]],
+) -> tuple[CachedPage, str]:
+    """Get a URL's converted text, through the cache.
+
+    ``convert(response)`` reads a streaming response's body and returns
+    its text, so conversion can keep pace with the download.
+    Returns (page, how), where ``how`` is "fresh" (served from cache),
+    "revalidated" (304 Not Modified) or "fetched".
+
+    Raises:
+        FetchError: The response had an error status.
+    """
+    page = cache.get(url)
+    if page is not None and cache.is_fresh(page):
+        return page, "fresh"
+
+    validators = page.validators() if page is not None else {}
+    async with fetcher.stream(url, validators) as response:
+        if response.status == 304 and page is not None:
+            cache.refresh(page, response.headers)
+            return page, "revalidated"
+        if response.status >= 400:
+            raise FetchError(f"HTTP Error {response.status}")
+        text = await convert(response)
+    return cache.put(url, text, response.headers), "fetched"
@@ -0,0 +1,53 @@
+"""Tests for decompose.analysis."""
+
+from pathlib import Path
+
+import pytest
+
+from decompose.analysis import analyze_chunk
+from decompose.chunker import auto_chunk
+from decompose.classifier import classify
+from decompose.entities import extract_entities
+from decompose.irreducibility import detect_irreducibility
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _assert_same(text: str):
+    a = analyze_chunk(text)
+    assert a.classification == classify(text)
+    assert a.entities == extract_entities(text)
+    assert a.irreducibility == detect_irreducibility(text)
+
+
+class TestAnalyzeChunk:
+    def test_matches_separate_analyzers_on_fixtures(self):
+        for path in sorted(FIXTURES.glob("*.txt")):
+            for chunk in auto_chunk(path.read_text(), chunk_size=500, overlap=50):
+                _assert_same(chunk.text)
+
+    def test_dollars_and_dates(self):
+        _assert_same("Payment of $1,500.00 is due 12/31/2025. Retainage is 5%.")
+
+    def test_no_dollar_or_date(self):
+        a = analyze_chunk("The contractor shall provide all materials.")
+        assert a.entities.financial == []
+        assert a.entities.dates == []
+
+    def test_case_changing_length_falls_back(self):
+        # "İ".lower() is two characters, so the shared scan is not used.
+        _assert_same("İnspection: the contractor SHALL pay $500 by 1/2/2026.")
+
+    def test_long_chunk_falls_back(self):
+        _assert_same("x " * 30_000 + "The owner shall pay $5,000 on 3/4/2026.")
+
+    @pytest.mark.parametrize("stages", [{"classify"}, {"entities"}, {"irreducibility"}, {"classify", "entities"},
+                                        {"entities", "irreducibility"}, set()])
+    def test_stages(self, stages):
+        for text in ("Payment of $1,500.00 is due 12/31/2025. The owner shall pay.",
+                     "İnspection: the contractor SHALL pay $500 by 1/2/2026."):
+            full = analyze_chunk(text)
+            a = analyze_chunk(text, stages)
+            assert a.classification == (full.classification if "classify" in stages else None)
+            assert a.entities == (full.entities if "entities" in stages else None)
+            assert a.irreducibility == (full.irreducibility if "irreducibility" in stages else None)
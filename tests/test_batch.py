@@ -0,0 +1,57 @@
+"""Tests for decompose.batch."""
+
+from pathlib import Path
+
+from decompose.batch import decompose_many
+from decompose.core import decompose_text
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _without_timing(result: dict) -> dict:
+    result["meta"].pop("processing_ms", None)
+    return result
+
+
+class TestDecomposeMany:
+    def test_matches_decompose_text(self):
+        paths = sorted(FIXTURES.glob("*.txt"))
+        results = {r["source"]: _without_timing(r) for r in decompose_many(paths, workers=2)}
+        assert sorted(results) == [str(p) for p in paths]
+        for p in paths:
+            expected = _without_timing(decompose_text(p.read_text()))
+            assert results[str(p)]["units"] == expected["units"]
+            assert results[str(p)]["meta"] == expected["meta"]
+
+    def test_ordered(self):
+        paths = sorted(FIXTURES.glob("*.txt"))
+        sources = [r["source"] for r in decompose_many(paths, workers=2, ordered=True)]
+        assert sources == [str(p) for p in paths]
+
+    def test_in_process_with_lazy_iterable(self):
+        paths = (p for p in sorted(FIXTURES.glob("*.txt")))
+        results = list(decompose_many(paths, workers=1, compact=True))
+        assert len(results) == len(list(FIXTURES.glob("*.txt")))
+        assert all(r["meta"]["total_units"] > 0 for r in results)
+
+    def test_unreadable_file(self, tmp_path):
+        missing = tmp_path / "missing.txt"
+        (result,) = decompose_many([missing], workers=1)
+        assert result["source"] == str(missing)
+        assert result["units"] == []
+        assert result["meta"]["error"] == "read_failed"
+
+    def test_empty_file(self, tmp_path):
+        empty = tmp_path / "empty.txt"
+        empty.write_text("")
+        (result,) = decompose_many([empty], workers=1)
+        assert result["meta"]["error"] == "empty_input"
+
+    def test_shared_sqlite_cache(self, tmp_path):
+        from decompose.cache import SQLiteCache
+
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+        paths = sorted(FIXTURES.glob("*.txt"))
+        list(decompose_many(paths, workers=2, cache=cache))
+        again = list(decompose_many(paths, workers=2, cache=cache))
+        assert all(r["meta"]["cache"]["misses"] == 0 for r in again)
@@ -0,0 +1,112 @@
+"""Tests for decompose.cache."""
+
+import pickle
+
+from decompose.analysis import analyze_chunk
+from decompose.cache import MemoryCache, SQLiteCache, chunk_key
+from decompose.core import decompose_text
+
+TEXT = (
+    "# General Conditions\nThe contractor shall comply with ISO 9001:2015. Payment of $5,000 is due 1/15/2026.\n"
+    "# Safety\nEmergency exits shall not be obstructed.\n"
+    "# Repeat\nThe contractor shall comply with ISO 9001:2015. Payment of $5,000 is due 1/15/2026.\n"
+)
+
+
+def _without_volatile(result: dict) -> dict:
+    result["meta"].pop("processing_ms")
+    result["meta"].pop("cache", None)
+    return result
+
+
+class TestChunkKey:
+    def test_stable_and_content_addressed(self):
+        assert chunk_key("shall comply") == chunk_key("shall comply")
+        assert chunk_key("shall comply") != chunk_key("shall  comply")
+
+    def test_partial_stages_keyed_apart(self):
+        assert chunk_key("shall", {"classify", "entities", "irreducibility"}) == chunk_key("shall")
+        assert chunk_key("shall", {"entities"}) != chunk_key("shall")
+        assert chunk_key("shall", {"entities"}) != chunk_key("shall", {"classify"})
+
+
+class TestMemoryCache:
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        a, b, c = (analyze_chunk(t) for t in ("shall", "may", "must"))
+        cache.set_many({"a": a, "b": b})
+        cache.get_many(["a"])  # "b" is now least recently used
+        cache.set_many({"c": c})
+        assert len(cache) == 2
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+    def test_decompose_hits_and_misses(self):
+        cache = MemoryCache()
+        first = decompose_text(TEXT, cache=cache)
+        assert first["meta"]["cache"] == {"hits": 0, "misses": 3}
+        second = decompose_text(TEXT, cache=cache)
+        assert second["meta"]["cache"] == {"hits": 3, "misses": 0}
+
+    def test_output_unchanged(self):
+        cache = MemoryCache()
+        plain = _without_volatile(decompose_text(TEXT))
+        decompose_text(TEXT, cache=cache)
+        cached = _without_volatile(decompose_text(TEXT, cache=cache))
+        assert cached == plain
+
+    def test_units_do_not_share_cached_lists(self):
+        cache = MemoryCache()
+        r = decompose_text(TEXT, cache=cache)
+        r["units"][0]["dates"].append("mutated")
+        again = decompose_text(TEXT, cache=cache)
+        assert "mutated" not in again["units"][0]["dates"]
+
+    def test_no_cache_no_meta(self):
+        assert "cache" not in decompose_text(TEXT)["meta"]
+
+
+class TestSQLiteCache:
+    def test_round_trip_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        plain = _without_volatile(decompose_text(TEXT))
+        decompose_text(TEXT, cache=SQLiteCache(path))
+        r = decompose_text(TEXT, cache=SQLiteCache(path))
+        assert r["meta"]["cache"]["hits"] == 3
+        assert _without_volatile(r) == plain
+
+    def test_partial_analysis_round_trip(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        plain = _without_volatile(decompose_text(TEXT, stages=["entities"]))
+        decompose_text(TEXT, cache=SQLiteCache(path), stages=["entities"])
+        r = decompose_text(TEXT, cache=SQLiteCache(path), stages=["entities"])
+        assert r["meta"]["cache"]["hits"] == 3
+        assert _without_volatile(r) == plain
+        assert decompose_text(TEXT, cache=SQLiteCache(path))["meta"]["cache"]["hits"] == 0
+
+    def test_max_entries(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+        cache.set_many({k: analyze_chunk(k) for k in ("shall", "may", "must")})
+        assert len(cache) == 2
+        assert set(cache.get_many(["shall", "may", "must"])) == {"may", "must"}
+
+    def test_max_entries_with_replaced_keys(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=3)
+        a = analyze_chunk("shall")
+        cache.set_many({"a": a, "b": a, "c": a})
+        cache.set_many({"a": a})  # replaced: newest now, leaving a rowid gap
+        assert len(cache) == 3
+        cache.set_many({"d": a})
+        assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+
+    def test_no_delete_under_max_entries(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=10)
+        statements = []
+        cache._connect().set_trace_callback(statements.append)
+        cache.set_many({k: analyze_chunk(k) for k in ("shall", "may", "must")})
+        assert not any(s.startswith("DELETE") for s in statements)
+
+    def test_pickles_by_path(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.db"))
+        cache.set_many({"k": analyze_chunk("shall")})
+        clone = pickle.loads(pickle.dumps(cache))
+        assert clone.get_many(["k"])["k"] == analyze_chunk("shall")
@@ -1,6 +1,8 @@
 """Tests for decompose.chunker."""
 
-from decompose.chunker import auto_chunk, chunk_markdown, chunk_text
+import pytest
+
+from decompose.chunker import TextStreamChunker, auto_chunk, chunk_markdown, chunk_text
 
 
 class TestChunkText:
@@ -28,6 +30,34 @@ class TestChunkText:
         chunks = chunk_text(text, chunk_size=200, overlap=50)
         assert len(chunks) > 1
 
+    def test_breaks_at_highest_priority_separator(self):
+        # "? " appears later in the window, but ". " has priority
+        text = "a" * 80 + ". " + "b" * 40 + "? " + "c" * 200
+        chunks = chunk_text(text, chunk_size=150, overlap=0)
+        assert chunks[0].end == 82
+        assert chunks[0].text.endswith(".")
+
+    def test_early_break_with_large_overlap_terminates(self):
+        # A break near a small chunk's start used to step the overlap back
+        # past the chunk start and repeat the same span forever.
+        text = "a. " + "x" * 300 + ". " + "y" * 300
+        chunks = chunk_text(text, chunk_size=100, overlap=50)
+        starts = [c.start for c in chunks]
+        assert starts == sorted(set(starts))
+        assert chunks[-1].end == len(text)
+
+    def test_early_break_in_first_chunk_keeps_following_text(self):
+        # The overlap once stepped the start negative here, and the chunk
+        # beginning "bb c" was silently dropped.
+        text = (
+            "dddddddddd! c  dddddddddd. bb c  dddddddddd\n\nbb\n\nbb  dddddddddd\n\n"
+            "aaaa\n\nc\n\nbb bb dddddddddd\n\naaaa\n\naaaa  "
+        )
+        chunks = chunk_text(text, chunk_size=100, overlap=31)
+        assert [c.start for c in chunks] == [0, 27]
+        assert chunks[1].text.startswith("bb c  dddddddddd")
+        assert chunks[-1].end == len(text)
+
 
 class TestChunkMarkdown:
     def test_splits_by_headers(self):
@@ -56,6 +86,35 @@ class TestChunkMarkdown:
         assert chunks[0].heading is None
         assert "Preamble" in chunks[0].text
 
+    def test_oversized_section_reads_nbsp_as_space(self):
+        md = "# Small\nA\u00a0B.\n# Big\n" + "Word\u00a0word. " * 40
+        chunks = chunk_markdown(md, chunk_size=200, overlap=20)
+        assert "\u00a0" in chunks[0].text
+        assert all("\u00a0" not in c.text for c in chunks[1:])
+        assert all(c.heading == "Big" for c in chunks[1:])
+
+
+class TestChunkOffsets:
+    def test_chunks_share_the_source(self):
+        text = "The contractor shall comply. " * 200
+        chunks = chunk_text(text, chunk_size=500, overlap=50)
+        for c in chunks:
+            assert c.source is text
+            assert c.text == text[c.text_start : c.text_end]
+            assert c.char_count == c.text_end - c.text_start
+
+    def test_text_is_stripped_span(self):
+        (chunk,) = chunk_text("   padded text  \n", chunk_size=100)
+        assert chunk.text == "padded text"
+        assert (chunk.text_start, chunk.text_end) == (3, 14)
+        assert chunk.word_count == 2
+
+    def test_markdown_sections_are_offsets(self):
+        md = "Intro.\n# One\nBody one.\n# Two\nBody two."
+        for c in chunk_markdown(md):
+            assert c.source is md
+            assert c.text == md[c.text_start : c.text_end]
+
 
 class TestAutoChunk:
     def test_detects_markdown(self):
@@ -67,3 +126,44 @@ class TestAutoChunk:
         plain = "No headers here. Just sentences."
         chunks = auto_chunk(plain)
         assert chunks[0].heading is None
+
+
+def _stream(text: str, piece: int, **kwargs) -> tuple[list[str], list[int]]:
+    """Feed text in pieces; returns the chunk texts and how many each feed settled."""
+    chunker = TextStreamChunker(**kwargs)
+    texts, settled = [], []
+    for i in range(0, len(text), piece):
+        new = chunker.feed(text[i : i + piece])
+        settled.append(len(new))
+        texts += new
+    return texts + chunker.close(), settled
+
+
+class TestTextStreamChunker:
+    @pytest.mark.parametrize("piece", [1, 7, 64, 333, 10_000])
+    def test_matches_chunk_text(self, piece):
+        text = ("The contractor shall comply. Payment is due!\n\nIs it? " * 40 + "\u00a0trailing words ") * 3
+        texts, _ = _stream(text, piece, chunk_size=300, overlap=40)
+        assert texts == [c.text for c in chunk_text(text, chunk_size=300, overlap=40)]
+
+    def test_chunks_settle_before_the_end(self):
+        text = "The contractor shall comply. " * 500
+        _, settled = _stream(text, 1000, chunk_size=500, overlap=50)
+        assert sum(settled[: len(settled) // 2]) > 0
+
+    def test_short_and_blank_text(self):
+        assert _stream("  short  ", 3)[0] == ["short"]
+        assert _stream(" \n\n ", 2)[0] == []
+
+    @pytest.mark.parametrize("piece", [1, 9, 120, 10_000])
+    def test_matches_auto_chunk_for_markdown(self, piece):
+        md = "Preamble text.\n# One\n" + "Body sentence. " * 40 + "\n## Two\nShort.\n#\n\nSpanning\n### \n   \n"
+        texts, _ = _stream(md * 2, piece, chunk_size=200, overlap=30)
+        assert texts == [c.text for c in auto_chunk(md * 2, chunk_size=200, overlap=30)]
+
+    def test_markdown_detected_across_pieces(self):
+        chunker = TextStreamChunker()
+        chunker.feed("Intro.\n#")
+        assert not chunker.markdown
+        chunker.feed("# Section\nBody.")
+        assert chunker.markdown
@@ -0,0 +1,65 @@
+"""Tests for the benchmark regression gate (benchmarks/compare.py)."""
+
+import random
+
+import pytest
+from compare import compare, mann_whitney
+from harness import SCHEMA
+
+
+def _results(medians: dict, calibration: float = 1.0, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+
+    def timing(median):
+        return {"median_ms": median, "samples_ms": [median * rng.uniform(0.95, 1.05) for _ in range(60)]}
+
+    return {
+        "schema": SCHEMA,
+        "environment": {"cpu": "x", "machine": "x86_64", "python": "3.12.0", "implementation": "CPython"},
+        "calibration": timing(calibration),
+        "benchmarks": [{"file": "doc.txt", "time": {stage: timing(m) for stage, m in medians.items()}}],
+    }
+
+
+class TestMannWhitney:
+    def test_one_sided(self):
+        base = [1.0, 1.1, 0.9, 1.05, 0.95] * 4
+        slower = [v * 1.5 for v in base]
+        assert mann_whitney(base, slower) < 0.001
+        assert mann_whitney(slower, base) > 0.999
+        assert mann_whitney(base, base) == pytest.approx(0.5, abs=0.1)
+
+    def test_degenerate(self):
+        assert mann_whitney([], [1.0]) == 1.0
+        assert mann_whitney([1.0] * 5, [1.0] * 5) == 1.0
+
+
+class TestCompare:
+    def test_verdicts(self):
+        base = _results({"classify": 1.0, "entities": 1.0, "chunk": 1.0})
+        current = _results({"classify": 1.4, "entities": 0.5, "chunk": 1.03}, seed=1)
+        report = compare(base, current, threshold=0.10)
+        verdicts = {r["stage"]: r["verdict"] for r in report["rows"]}
+        assert verdicts == {"classify": "regression", "entities": "improvement", "chunk": "same"}
+        assert report["regressions"] == ["doc.txt/classify"]
+
+    def test_threshold(self):
+        report = compare(_results({"classify": 1.0}), _results({"classify": 1.4}, seed=1), threshold=0.5)
+        assert report["regressions"] == []
+
+    def test_calibration_cancels_machine_speed(self):
+        # Everything, calibration included, ran twice as slow: no regression
+        base = _results({"classify": 1.0, "decompose": 3.0})
+        current = _results({"classify": 2.0, "decompose": 6.0}, calibration=2.0, seed=1)
+        report = compare(base, current)
+        assert report["scale"] == pytest.approx(2.0, rel=0.05)
+        assert report["regressions"] == []
+        assert compare(base, current, normalize=False)["regressions"] == ["doc.txt/classify", "doc.txt/decompose"]
+
+    def test_environment_and_schema(self):
+        base, current = _results({"classify": 1.0}), _results({"classify": 1.0})
+        current["environment"]["cpu"] = "y"
+        assert any("cpu" in w for w in compare(base, current)["warnings"])
+        current["schema"] = SCHEMA - 1
+        with pytest.raises(ValueError, match="schema"):
+            compare(base, current)
@@ -1,6 +1,14 @@
 """Integration tests for decompose.core — the full pipeline."""
 
-from decompose.core import decompose_text, filter_for_llm
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from decompose import core
+from decompose.analysis import analyze_chunk
+from decompose.core import UNIT_FIELDS, decompose_for_llm, decompose_text, filter_for_llm, iter_decompose
 
 
 class TestDecomposeText:
@@ -65,6 +73,185 @@ class TestDecomposeText:
         assert len(unit.get("financial", [])) >= 2
 
 
+# ── Parallel decompose ───────────────────────────────────────────
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class TestParallel:
+    def _corpus(self) -> str:
+        return "\n\n".join(p.read_text() for p in sorted(FIXTURES.glob("*.txt"))) * 3
+
+    def _strip_timing(self, result: dict) -> dict:
+        result["meta"].pop("processing_ms")
+        return result
+
+    def test_parallel_matches_serial(self, monkeypatch):
+        monkeypatch.setattr(core, "PARALLEL_MIN_CHARS", 0)
+        text = self._corpus()
+        serial = self._strip_timing(decompose_text(text))
+        parallel = self._strip_timing(decompose_text(text, workers=2))
+        assert json.dumps(parallel) == json.dumps(serial)
+
+    def test_parallel_matches_serial_compact(self, monkeypatch):
+        monkeypatch.setattr(core, "PARALLEL_MIN_CHARS", 0)
+        text = self._corpus()
+        serial = self._strip_timing(decompose_text(text, compact=True))
+        parallel = self._strip_timing(decompose_text(text, compact=True, workers=2))
+        assert json.dumps(parallel) == json.dumps(serial)
+
+    def test_small_input_stays_serial(self, monkeypatch):
+        def fail(*args):
+            raise AssertionError("process pool used for small input")
+
+        monkeypatch.setattr(core, "_analyze_parallel", fail)
+        r = decompose_text("The contractor shall provide all materials. " * 100, chunk_size=200, workers=4)
+        assert r["meta"]["total_units"] > 1
+
+    @pytest.mark.parametrize(("flags", "workers"), [([], 1), (["--workers", "0"], 0), (["-w", "3"], 3)])
+    def test_cli_workers(self, monkeypatch, flags, workers):
+        from decompose import cli
+
+        seen = []
+
+        def spy(text, **kwargs):
+            seen.append(kwargs["workers"])
+            return decompose_text(text, **kwargs)
+
+        monkeypatch.setattr(cli, "decompose_text", spy)
+        monkeypatch.setattr(sys, "argv", ["decompose", "--text", "The contractor shall comply.", *flags])
+        cli.main()
+        assert seen == [workers]
+
+
+# ── Streaming ────────────────────────────────────────────────────
+
+
+class TestIterDecompose:
+    def _meta(self, meta: dict) -> dict:
+        meta = dict(meta)
+        meta.pop("processing_ms", None)
+        return meta
+
+    def test_matches_decompose_text(self):
+        for path in sorted(FIXTURES.glob("*.txt")):
+            text = path.read_text()
+            for compact in (False, True):
+                expected = decompose_text(text, compact=compact, chunk_size=500)
+                stream = iter_decompose(text, compact=compact, chunk_size=500)
+                assert list(stream) == expected["units"]
+                assert self._meta(stream.meta) == self._meta(expected["meta"])
+
+    def test_running_meta(self):
+        stream = iter_decompose("# A\nThe contractor shall comply.\n# B\nThe owner may inspect.\n")
+        assert stream.meta["total_units"] == 0
+        first = next(stream)
+        assert first["heading"] == "A"
+        assert stream.meta["total_units"] == 1
+        assert stream.meta["authority_profile"] == {"mandatory": 1}
+        list(stream)
+        assert stream.meta["total_units"] == 2
+
+    def test_path_and_file_sources(self):
+        path = FIXTURES / "spec_structural.txt"
+        expected = decompose_text(path.read_text())["units"]
+        assert list(iter_decompose(path)) == expected
+        with open(path) as f:
+            assert list(iter_decompose(f)) == expected
+
+    def test_empty_input(self):
+        stream = iter_decompose("   ")
+        assert list(stream) == []
+        assert stream.meta == {"total_units": 0, "error": "empty_input"}
+
+
+# ── Field projection ─────────────────────────────────────────────
+
+
+class TestProjection:
+    def _texts(self) -> list[str]:
+        return [p.read_text() for p in sorted(FIXTURES.glob("*.txt"))]
+
+    def test_all_fields_match_default(self):
+        for text in self._texts():
+            for compact in (False, True):
+                full = decompose_text(text, compact=compact, chunk_size=500)["units"]
+                projected = decompose_text(text, compact=compact, chunk_size=500, fields=UNIT_FIELDS)["units"]
+                assert json.dumps(projected) == json.dumps(full)
+
+    def test_subset(self):
+        text = "# Scope\nThe contractor shall comply with ASTM C150 by 2026-03-01.\n"
+        full = decompose_text(text)["units"]
+        units = decompose_text(text, fields=["risk", "authority", "heading"])["units"]
+        assert units == [{"authority": u["authority"], "risk": u["risk"], "heading": u["heading"]} for u in full]
+        assert list(units[0]) == ["authority", "risk", "heading"]
+
+    def test_compact_still_drops_empty_values(self):
+        text = "General background information."
+        units = decompose_text(text, compact=True, fields=["entities", "attention"])["units"]
+        assert list(units[0]) == ["attention"]
+
+    def test_meta_unaffected(self):
+        text = self._texts()[0]
+        full = decompose_text(text)["meta"]
+        meta = decompose_text(text, fields=["attention"])["meta"]
+        assert meta["token_estimate"]["output"] < full["token_estimate"]["output"]
+        for key in ("total_units", "authority_profile", "risk_profile", "standards_found", "dates_found"):
+            assert meta[key] == full[key]
+
+    def test_text_preview(self):
+        text = "The contractor shall provide all materials. " * 100
+        full = decompose_text(text, chunk_size=500)["units"]
+        units = decompose_text(text, chunk_size=500, text_preview=20)["units"]
+        assert [u["text"] for u in units] == [u["text"][:20] for u in full]
+        assert [u["attention"] for u in units] == [u["attention"] for u in full]
+
+    def test_streaming(self):
+        text = self._texts()[0]
+        expected = decompose_text(text, fields=["text", "risk"], text_preview=10)["units"]
+        assert list(iter_decompose(text, fields=["text", "risk"], text_preview=10)) == expected
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match="colour"):
+            decompose_text("Some text.", fields=["risk", "colour"])
+
+
+# ── Stage selection ──────────────────────────────────────────────
+
+
+class TestStages:
+    TEXT = "# Scope\nThe contractor shall comply with ASTM C150 and pay $5,000 by 3/1/2026.\n"
+
+    def test_all_stages_match_default(self):
+        full = decompose_text(self.TEXT)
+        staged = decompose_text(self.TEXT, stages=["classify", "entities", "irreducibility"])
+        full["meta"].pop("processing_ms"), staged["meta"].pop("processing_ms")
+        assert staged == full
+
+    def test_skipped_stage_fields_omitted(self):
+        full = decompose_text(self.TEXT)["units"][0]
+        unit = decompose_text(self.TEXT, stages=["entities"])["units"][0]
+        assert unit == {k: full[k] for k in ("text", "entities", "dates", "financial", "heading", "heading_path")}
+        unit = decompose_text(self.TEXT, stages=["classify", "irreducibility"])["units"][0]
+        assert set(unit) == set(full) - set(core.STAGE_FIELDS["entities"])
+
+    def test_meta_omits_skipped_stages(self):
+        meta = decompose_text(self.TEXT, stages=["irreducibility"])["meta"]
+        for key in ("authority_profile", "risk_profile", "standards_found", "dates_found"):
+            assert key not in meta
+        meta = decompose_text(self.TEXT, stages=["entities"])["meta"]
+        assert meta["dates_found"] == ["3/1/2026"] and "risk_profile" not in meta
+
+    def test_with_fields_and_streaming(self):
+        expected = decompose_text(self.TEXT, stages=["classify"], fields=["risk", "entities"])["units"]
+        assert expected == [{"risk": "compliance"}]
+        assert list(iter_decompose(self.TEXT, stages=["classify"], fields=["risk", "entities"])) == expected
+
+    def test_unknown_stage(self):
+        with pytest.raises(ValueError, match="tokenize"):
+            decompose_text("Some text.", stages=["classify", "tokenize"])
+
+
 # ── filter_for_llm ──────────────────────────────────────────────
 
 
@@ -146,6 +333,30 @@ class TestFilterForLlm:
         r = filter_for_llm(self._make_result(units), max_tokens=0)
         assert len(r["text"]) == 1000
 
+    def test_pack_keeps_top_ranked_whole_units_in_order(self):
+        def unit(text, attention, risk="compliance"):
+            return {"text": text, "authority": "mandatory", "risk": risk, "type": "requirement", "attention": attention}
+
+        units = [unit("a" * 30, 1.0), unit("b" * 30, 8.0), unit("c" * 30, 2.0), unit("d" * 30, 8.0, "safety_critical")]
+        r = filter_for_llm(self._make_result(units), max_tokens=16, pack=True, include_headings=False)  # 64 chars
+        assert r["text"] == "b" * 30 + "\n\n" + "d" * 30
+        assert [u["text"][0] for u in r["units"]] == ["b", "d"]
+        assert r["meta"]["output_units"] == 2 and r["meta"]["token_estimate"] == 15
+
+    def test_pack_never_keeps_a_lower_ranked_unit(self):
+        units = [
+            {"text": "x" * 10, "authority": "mandatory", "attention": 1.0},
+            {"text": "y" * 50, "authority": "mandatory", "attention": 5.0},
+            {"text": "z" * 50, "authority": "mandatory", "attention": 3.0},
+            {"text": "w" * 500, "authority": "mandatory", "attention": 9.0},  # larger than the budget
+        ]
+        r = filter_for_llm(self._make_result(units), max_tokens=20, pack=True)
+        assert [u["text"][0] for u in r["units"]] == ["y"]
+
+    def test_pack_without_max_tokens_keeps_all(self):
+        units = [{"text": "A" * 100, "authority": "mandatory"}] * 3
+        assert filter_for_llm(self._make_result(units), pack=True) == filter_for_llm(self._make_result(units))
+
     def test_reduction_pct(self):
         units = [
             {"text": "Keep.", "authority": "mandatory", "risk": "informational", "type": "requirement"},
@@ -189,3 +400,43 @@ class TestFilterForLlm:
         assert r["meta"]["input_units"] >= 1
         assert r["meta"]["output_units"] >= 1
         assert len(r["text"]) > 0
+
+
+class TestDecomposeForLlm:
+    def _texts(self) -> list[str]:
+        return [p.read_text() for p in sorted(FIXTURES.glob("*.txt"))]
+
+    def test_matches_filter_for_llm(self):
+        for text in self._texts():
+            for kwargs in ({}, {"compact": True, "include_headings": False}, {"min_attention": 3.0, "types": ()}):
+                expected = filter_for_llm(decompose_text(text, chunk_size=500, compact=kwargs.get("compact", False)),
+                                          **{k: v for k, v in kwargs.items() if k != "compact"})
+                assert decompose_for_llm(text, chunk_size=500, **kwargs) == expected
+
+    def test_max_tokens_stops_early(self, monkeypatch):
+        text = "The contractor shall provide all materials per ISO 9001. " * 400
+        expected = filter_for_llm(decompose_text(text, chunk_size=500), max_tokens=300)
+        calls = []
+        monkeypatch.setattr(core, "analyze_chunk", lambda t, stages: calls.append(t) or analyze_chunk(t, stages))
+        r = decompose_for_llm(text, chunk_size=500, max_tokens=300)
+        assert r["text"] == expected["text"]
+        assert r["units"] == expected["units"][: len(r["units"])]
+        assert r["meta"]["input_units"] == expected["meta"]["input_units"]
+        assert len(r["units"]) == 3 and len(calls) < 10
+
+    def test_dropped_chunks_not_extracted(self, monkeypatch):
+        text = "General background about the site. " * 50 + "\n\nEmergency exits shall not be obstructed."
+        stages = []
+        monkeypatch.setattr(core, "analyze_chunk", lambda t, s: stages.append(set(s)) or analyze_chunk(t, s))
+        r = decompose_for_llm(text, chunk_size=500)
+        assert r["meta"]["output_units"] == 1 < r["meta"]["input_units"]
+        assert stages.count({"entities", "irreducibility"}) == 1
+
+    def test_pack(self):
+        text = self._texts()[0]
+        expected = filter_for_llm(decompose_text(text, chunk_size=500), max_tokens=400, pack=True)
+        assert decompose_for_llm(text, chunk_size=500, max_tokens=400, pack=True) == expected
+        assert 0 < len(expected["text"]) <= 1600
+
+    def test_empty_input(self):
+        assert decompose_for_llm("  ") == filter_for_llm(decompose_text("  "))
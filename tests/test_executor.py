@@ -0,0 +1,113 @@
+"""Tests for decompose.executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from decompose.core import decompose_text
+from decompose.executor import ExecutorBusy, ToolExecutor
+
+
+def _blocking(gate: threading.Event, value: int) -> int:
+    gate.wait(5)
+    return value
+
+
+class TestToolExecutor:
+    def test_runs_off_the_event_loop(self):
+        async def main():
+            executor = ToolExecutor(max_concurrency=2)
+            gate = threading.Event()
+            task = asyncio.ensure_future(executor.run(_blocking, gate, 7))
+            # The loop keeps serving while the call blocks in a worker
+            ticks = 0
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            gate.set()
+            result = await task
+            executor.shutdown()
+            return ticks, result
+
+        assert asyncio.run(main()) == (5, 7)
+
+    def test_concurrency_and_queue_limits(self):
+        async def main():
+            executor = ToolExecutor(max_concurrency=2, max_queue=1)
+            gate = threading.Event()
+            tasks = [asyncio.ensure_future(executor.run(_blocking, gate, i)) for i in range(3)]
+            await asyncio.sleep(0.05)
+            assert executor.stats()["running"] == 2
+            assert executor.stats()["waiting"] == 1
+            with pytest.raises(ExecutorBusy):
+                await executor.run(_blocking, gate, 99)
+            gate.set()
+            results = await asyncio.gather(*tasks)
+            assert executor.stats()["running"] == executor.stats()["waiting"] == 0
+            executor.shutdown()
+            return results
+
+        assert asyncio.run(main()) == [0, 1, 2]
+
+    def test_cancelled_waiter_frees_queue(self):
+        async def main():
+            executor = ToolExecutor(max_concurrency=1, max_queue=1)
+            gate = threading.Event()
+            running = asyncio.ensure_future(executor.run(_blocking, gate, 1))
+            await asyncio.sleep(0.02)
+            waiter = asyncio.ensure_future(executor.run(_blocking, gate, 2))
+            await asyncio.sleep(0.02)
+            waiter.cancel()
+            await asyncio.sleep(0)
+            assert executor.waiting == 0
+            gate.set()
+            result = await running
+            executor.shutdown()
+            return result
+
+        assert asyncio.run(main()) == 1
+
+    def test_cancelled_call_keeps_slot_until_done(self):
+        async def main():
+            executor = ToolExecutor(max_concurrency=1, max_queue=0)
+            gate = threading.Event()
+            call = asyncio.ensure_future(executor.run(_blocking, gate, 1))
+            await asyncio.sleep(0.02)
+            call.cancel()
+            await asyncio.sleep(0.02)
+            with pytest.raises(ExecutorBusy):
+                await executor.run(_blocking, gate, 2)
+            gate.set()
+            await asyncio.sleep(0.05)
+            result = await executor.run(_blocking, gate, 3)
+            executor.shutdown()
+            return result
+
+        assert asyncio.run(main()) == 3
+
+    def test_process_pool(self):
+        async def main():
+            executor = ToolExecutor(max_concurrency=2, kind="process")
+            texts = ["The contractor shall comply with ASTM C150.", "The owner may inspect the work."]
+            results = await asyncio.gather(*(executor.run(decompose_text, t, compact=True) for t in texts))
+            executor.shutdown()
+            return results
+
+        results = asyncio.run(main())
+        assert [r["units"][0]["authority"] for r in results] == ["mandatory", "permissive"]
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            ToolExecutor(kind="fiber")
+
+    def test_overlapping_calls_finish_concurrently(self):
+        async def main():
+            executor = ToolExecutor(max_concurrency=4)
+            start = time.monotonic()
+            await asyncio.gather(*(executor.run(time.sleep, 0.1) for _ in range(4)))
+            executor.shutdown()
+            return time.monotonic() - start
+
+        assert asyncio.run(main()) < 0.35
@@ -0,0 +1,282 @@
+"""Tests for decompose.fetch, against a local HTTP server."""
+
+import asyncio
+import ipaddress
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from decompose.fetch import AsyncFetcher, FetchError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send(self, status: int, body: bytes = b"", headers: dict | None = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/doc":
+            self._send(200, b"The contractor shall comply.", {"Content-Type": "text/plain"})
+        elif self.path == "/chunked":
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in (b"Hello, ", b"chunked ", b"world."):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+        elif self.path == "/close":
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(b"read to close")
+            self.close_connection = True
+        elif self.path == "/redirect":
+            self._send(302, headers={"Location": "/doc"})
+        elif self.path == "/loop":
+            self._send(302, headers={"Location": "/loop"})
+        elif self.path == "/private":
+            self._send(302, headers={"Location": "http://10.0.0.1/secret"})
+        elif self.path == "/slow":
+            time.sleep(1)
+            self._send(200, b"late")
+        elif self.path == "/drop":
+            # Claims keep-alive, then closes: the pooled connection goes stale
+            self._send(200, b"dropped")
+            self.close_connection = True
+        elif self.path == "/big":
+            self._send(200, b"x" * 5000)
+        else:
+            self._send(404, b"missing")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients that time out leave broken pipes behind
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = _Server(("127.0.0.1", 0), _Handler)
+    httpd.connections = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+def _url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def _fetcher(**kwargs) -> AsyncFetcher:
+    # Loopback is blocked by default; tests allow it but keep 10/8 blocked
+    kwargs.setdefault("blocked_networks", [ipaddress.ip_network("10.0.0.0/8")])
+    return AsyncFetcher(**kwargs)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestAsyncFetcher:
+    def test_fetch(self, server):
+        async def main():
+            async with _fetcher() as f:
+                return await f.fetch(_url(server, "/doc"))
+
+        response = _run(main())
+        assert response.status == 200
+        assert response.body == b"The contractor shall comply."
+        assert response.content_type == "text/plain"
+
+    def test_keep_alive_reuses_connection(self, server):
+        async def main():
+            async with _fetcher() as f:
+                for _ in range(5):
+                    await f.fetch(_url(server, "/doc"))
+                return f.connections_opened
+
+        before = server.connections
+        assert _run(main()) == 1
+        assert server.connections - before == 1
+
+    def test_concurrent_fetches_bounded_per_host(self, server):
+        async def main():
+            async with _fetcher(max_per_host=2) as f:
+                responses = await f.fetch_many([_url(server, "/doc")] * 8)
+                return responses, f.connections_opened
+
+        responses, opened = _run(main())
+        assert all(r.body == b"The contractor shall comply." for r in responses)
+        assert opened <= 2
+
+    def test_chunked_body(self, server):
+        async def main():
+            async with _fetcher() as f:
+                first = await f.fetch(_url(server, "/chunked"))
+                await f.fetch(_url(server, "/doc"))
+                return first, f.connections_opened
+
+        response, opened = _run(main())
+        assert response.body == b"Hello, chunked world."
+        assert opened == 1
+
+    def test_read_to_close_body_is_not_pooled(self, server):
+        async def main():
+            async with _fetcher() as f:
+                first = await f.fetch(_url(server, "/close"))
+                await f.fetch(_url(server, "/doc"))
+                return first, f.connections_opened
+
+        response, opened = _run(main())
+        assert response.body == b"read to close"
+        assert not response.truncated
+        assert opened == 2
+
+    def test_redirect_followed(self, server):
+        async def main():
+            async with _fetcher() as f:
+                return await f.fetch(_url(server, "/redirect"))
+
+        response = _run(main())
+        assert response.url.endswith("/doc")
+        assert response.body == b"The contractor shall comply."
+
+    def test_redirect_loop(self, server):
+        async def main():
+            async with _fetcher(max_redirects=3) as f:
+                await f.fetch(_url(server, "/loop"))
+
+        with pytest.raises(FetchError, match="Too many redirects"):
+            _run(main())
+
+    def test_redirect_to_blocked_network(self, server):
+        async def main():
+            async with _fetcher() as f:
+                await f.fetch(_url(server, "/private"))
+
+        with pytest.raises(ValueError, match="blocked address"):
+            _run(main())
+
+    def test_loopback_blocked_by_default(self, server):
+        async def main():
+            async with AsyncFetcher() as f:
+                await f.fetch(_url(server, "/doc"))
+
+        with pytest.raises(ValueError, match="blocked address"):
+            _run(main())
+
+    @pytest.mark.parametrize("url", ["file:///etc/passwd", "http:///nohost", "http://example.com/a\r\nX-Evil: 1"])
+    def test_rejected_urls(self, url):
+        async def main():
+            async with AsyncFetcher() as f:
+                await f.fetch(url)
+
+        with pytest.raises(ValueError):
+            _run(main())
+
+    def test_read_timeout(self, server):
+        async def main():
+            async with _fetcher(read_timeout=0.2) as f:
+                await f.fetch(_url(server, "/slow"))
+
+        with pytest.raises(TimeoutError):
+            _run(main())
+
+    def test_total_timeout(self, server):
+        async def main():
+            async with _fetcher(timeout=0.2) as f:
+                await f.fetch(_url(server, "/slow"))
+
+        with pytest.raises(TimeoutError):
+            _run(main())
+
+    def test_max_bytes_truncates(self, server):
+        async def main():
+            async with _fetcher(max_bytes=1000) as f:
+                big = await f.fetch(_url(server, "/big"))
+                await f.fetch(_url(server, "/doc"))
+                return big, f.connections_opened
+
+        response, opened = _run(main())
+        assert response.body == b"x" * 1000
+        assert response.truncated
+        assert opened == 2  # the truncated connection was not reused
+
+    def test_error_status_returned(self, server):
+        async def main():
+            async with _fetcher() as f:
+                return await f.fetch(_url(server, "/nope"))
+
+        assert _run(main()).status == 404
+
+    def test_stale_pooled_connection_retried(self, server):
+        async def main():
+            async with _fetcher() as f:
+                await f.fetch(_url(server, "/drop"))
+                await asyncio.sleep(0.05)
+                return await f.fetch(_url(server, "/doc")), f.connections_opened
+
+        response, opened = _run(main())
+        assert response.body == b"The contractor shall comply."
+        assert opened == 2
+
+
+class TestStream:
+    def test_body_arrives_in_blocks(self, server):
+        async def main():
+            async with _fetcher() as f:
+                async with f.stream(_url(server, "/chunked")) as response:
+                    blocks = [block async for block in response]
+                return response, blocks
+
+        response, blocks = _run(main())
+        assert response.status == 200
+        assert blocks == [b"Hello, ", b"chunked ", b"world."]
+
+    def test_fully_read_stream_is_pooled(self, server):
+        async def main():
+            async with _fetcher() as f:
+                async with f.stream(_url(server, "/doc")) as response:
+                    await response.read()
+                await f.fetch(_url(server, "/doc"))
+                return f.connections_opened
+
+        assert _run(main()) == 1
+
+    def test_abandoned_stream_is_not_pooled(self, server):
+        async def main():
+            async with _fetcher(max_bytes=10_000) as f:
+                async with f.stream(_url(server, "/big")) as response:
+                    pass
+                await f.fetch(_url(server, "/doc"))
+                return response.status, f.connections_opened
+
+        assert _run(main()) == (200, 2)
+
+    def test_redirect_followed(self, server):
+        async def main():
+            async with _fetcher() as f, f.stream(_url(server, "/redirect")) as response:
+                return response.url, await response.read(), f.connections_opened
+
+        url, body, opened = _run(main())
+        assert url.endswith("/doc")
+        assert body == b"The contractor shall comply."
+        assert opened == 1  # the redirect body was drained and its connection reused
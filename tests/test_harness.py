@@ -0,0 +1,55 @@
+"""Tests for the benchmark harness (benchmarks/harness.py)."""
+
+import json
+
+import pytest
+from harness import dump_results, environment, measure, measure_interleaved, percentile, summarize, throughput
+
+
+class TestHarness:
+    def test_measure_warmup_and_repeat(self):
+        calls = []
+        samples = measure(lambda: calls.append(1), warmup=2, repeat=5, min_time=0)
+        assert len(samples) == 5 and len(calls) == 7
+        assert all(isinstance(s, int) and s >= 0 for s in samples)
+
+    def test_measure_min_time(self):
+        assert len(measure(lambda: None, warmup=0, repeat=1, min_time=0.001)) > 1
+
+    def test_percentile(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 50) == 2.5
+        assert percentile(values, 100) == 4.0
+        with pytest.raises(ValueError):
+            percentile([], 50)
+
+    def test_summarize(self):
+        stats = summarize([1_000_000, 2_000_000, 3_000_000, 10_000_000])
+        assert stats["n"] == 4
+        assert stats["median_ms"] == 2.5
+        assert stats["min_ms"] == 1.0 and stats["max_ms"] == 10.0
+        assert stats["median_ms"] < stats["p95_ms"] < stats["p99_ms"] <= stats["max_ms"]
+        assert stats["stdev_ms"] > 0
+        assert throughput(stats, chars=5000, units=10) == {"chars_per_s": 2_000_000, "units_per_s": 4000.0}
+
+    def test_environment(self):
+        env = environment()
+        assert env["python"] and env["cpu"] and env["decompose"]
+        assert env["_decompose"] == env["decompose"]
+
+    def test_measure_interleaved(self):
+        order = []
+        samples = measure_interleaved(
+            [lambda: order.append("a"), lambda: order.append("b")], warmup=1, repeat=3, min_time=0,
+        )
+        assert order == ["a", "b"] * 4
+        assert [len(s) for s in samples] == [3, 3]
+        assert len(measure_interleaved([lambda: None], warmup=0, repeat=1, min_time=1, max_repeat=5)[0]) == 5
+
+    def test_dump_results_keeps_samples_on_one_line(self):
+        results = {"time": {"samples_ms": [1.5, 2.0, 1e-05]}, "env": {"cpu": "x [1,\n 2]"}, "kinds": ["a", "b"]}
+        text = dump_results(results)
+        assert json.loads(text) == results
+        assert '"samples_ms": [1.5, 2.0, 1e-05]' in text
+        assert '"kinds": [\n' in text
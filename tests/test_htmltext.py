@@ -0,0 +1,78 @@
+"""Tests for decompose.htmltext."""
+
+import pytest
+
+from decompose.chunker import auto_chunk
+from decompose.htmltext import BodyToText, body_to_text
+
+PAGE = (
+    "<html><head><style>p { color: red }</style><script>var s = '<p>';</script></head>\n"
+    "<body>\n  <nav>Menu</nav><h1>Spec</h1><p>AT&amp;T shall comply &mdash; café 日本.</p>"
+    "<ul><li>one<li>two</ul>\n\n  </body></html>  "
+).encode()
+
+
+def _feed(content_type: str, body: bytes, piece: int) -> list[str]:
+    converter = BodyToText(content_type)
+    parts = [converter.feed(body[i : i + piece]) for i in range(0, len(body), piece)]
+    return parts + [converter.close()]
+
+
+class TestBodyToText:
+    def test_html(self):
+        assert body_to_text("text/html", PAGE) == "# Spec\n\nAT&T shall comply — café 日本.\n\n- one\n- two"
+
+    @pytest.mark.parametrize("piece", [1, 2, 5, 13, 64])
+    def test_any_block_split_gives_same_text(self, piece):
+        assert "".join(_feed("text/html", PAGE, piece)) == body_to_text("text/html", PAGE)
+
+    def test_text_is_returned_as_it_completes(self):
+        parts = _feed("text/html", PAGE, 16)
+        assert sum(1 for part in parts[:-1] if part) > 1  # not all held until close()
+
+    def test_plain_passes_through_unstripped(self):
+        body = "  # Title\n\nBody café  \n".encode()
+        assert "".join(_feed("text/markdown; charset=utf-8", body, 3)) == body.decode()
+        assert body_to_text("text/plain", body) == body.decode()
+
+    def test_invalid_utf8_replaced(self):
+        assert body_to_text("text/plain", b"ok \xff end \xe6\x97") == "ok \ufffd end \ufffd"
+
+    def test_trailing_text_kept(self):
+        assert body_to_text("text/html", b"<p>Terms &copy") == "Terms ©"
+
+
+def _html(markup: str) -> str:
+    return body_to_text("text/html", markup.encode())
+
+
+class TestStructure:
+    def test_headings(self):
+        text = _html("<h1>Title</h1><p>Intro.</p><h2>Scope <em>of</em>\n work</h2><p>Body.</p>")
+        assert text == "# Title\n\nIntro.\n\n## Scope of work\n\nBody."
+
+    def test_empty_heading_dropped(self):
+        assert _html("<h2> </h2><p>Body.</p>") == "Body."
+
+    def test_lists(self):
+        text = _html("<ul><li>one</li><li><p>two</p><ol><li>a</li><li>b</li></ol></li></ul>")
+        assert text == "- one\n- two\n  1. a\n  2. b"
+
+    def test_table(self):
+        text = _html("<table><tr><th>Item</th><th>Due</th></tr>\n<tr><td>Pour | cure</td><td>May</td></tr></table>")
+        assert text == "| Item | Due |\n| --- | --- |\n| Pour \\| cure | May |"
+
+    def test_page_chrome_skipped(self):
+        text = _html("<header><a>Logo</a><nav><ul><li>Home</li></ul></nav><h1>Title</h1></header>"
+                     "<p>Body.</p><footer><p>Copyright</p></footer>")
+        assert text == "# Title\n\nBody."
+
+    def test_header_like_text_escaped(self):
+        text = _html("<pre># comment\ncode\n## more</pre><p>#tag</p>")
+        assert text == "\\# comment\ncode\n\\## more\n\n#tag"
+        assert auto_chunk(text)[0].heading is None
+
+    def test_sections_follow_headings(self):
+        page = "<h1>Spec</h1><p>Intro.</p><h2>Concrete</h2><p>Shall comply.</p><h2>Steel</h2><p>May vary.</p>"
+        chunks = auto_chunk(_html(page))
+        assert [c.heading_path for c in chunks] == [["Spec"], ["Spec", "Concrete"], ["Spec", "Steel"]]
@@ -0,0 +1,108 @@
+"""Tests for decompose.mapped and decompose_file."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from decompose import core
+from decompose.chunker import auto_chunk
+from decompose.core import decompose_file, decompose_text, iter_decompose
+from decompose.mapped import MappedText
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Multi-byte chars, CRLF and lone CR, invalid bytes, nbsp, and headers whose
+# whitespace spans lines — all cut across tiny blocks
+AWKWARD = (
+    "Preamble é€😀 text.\r\n\r\n#\n\xa0\n\n# Scope\r\nThe contractor shall comply with ASTM C150.\r"
+    "## Payment\n$1,200 due 01/02/2025. ".encode() + b"\xff\xe2\x80 bad bytes. "
+    + ("word " * 200 + "\xa0end.\n").encode()
+    + b"# \n# B\nThe owner may inspect.\n   \n"
+)
+
+
+def _without_timing(result: dict) -> dict:
+    result["meta"].pop("processing_ms", None)
+    return result
+
+
+class TestMappedText:
+    @pytest.mark.parametrize("block_bytes", [1, 2, 3, 7, 64, 1 << 20])
+    def test_decodes_like_read_text(self, tmp_path, block_bytes):
+        path = tmp_path / "doc.md"
+        path.write_bytes(AWKWARD)
+        expected = path.read_text(encoding="utf-8", errors="replace")
+        text = MappedText(path, block_bytes)
+        assert len(text) == len(expected)
+        assert text[0 : len(text)] == expected
+        assert "".join(block for _, block in text.blocks()) == expected
+
+    @pytest.mark.parametrize("block_bytes", [1, 5, 64])
+    def test_chunks_like_str(self, tmp_path, block_bytes):
+        path = tmp_path / "doc.md"
+        path.write_bytes(AWKWARD)
+        expected = auto_chunk(path.read_text(encoding="utf-8", errors="replace"), chunk_size=100, overlap=20)
+        chunks = auto_chunk(MappedText(path, block_bytes), chunk_size=100, overlap=20)
+        assert [(c.text, c.start, c.end, c.heading_path) for c in chunks] == [
+            (c.text, c.start, c.end, c.heading_path) for c in expected
+        ]
+
+    def test_strip_span_across_blocks(self, tmp_path):
+        path = tmp_path / "doc.txt"
+        path.write_text("  \n\n  x y  \n \n  ")
+        assert MappedText(path, 2).strip_span(0, 16) == (6, 9)
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        assert len(MappedText(path)) == 0
+
+
+class TestDecomposeFile:
+    def test_matches_decompose_text(self):
+        for path in sorted(FIXTURES.glob("*.txt")):
+            for compact in (False, True):
+                expected = _without_timing(decompose_text(path.read_text(), compact=compact))
+                assert _without_timing(decompose_file(path, compact=compact)) == expected
+
+    def test_iter_decompose_path_is_mapped(self, tmp_path):
+        path = tmp_path / "doc.md"
+        path.write_bytes(AWKWARD)
+        stream = iter_decompose(path, chunk_size=100, overlap=20)
+        expected = decompose_text(path.read_text(encoding="utf-8", errors="replace"), chunk_size=100, overlap=20)
+        assert list(stream) == expected["units"]
+
+    def test_no_input_size_limit(self, tmp_path, monkeypatch):
+        path = tmp_path / "big.txt"
+        path.write_text("The contractor shall comply with ASTM C150. " * 100)
+        monkeypatch.setattr(core, "MAX_INPUT", 1000)
+        assert decompose_text(path.read_text())["meta"]["error"] == "input_too_large"
+        result = decompose_file(path)
+        assert "error" not in result["meta"]
+        assert result["meta"]["input_chars"] == len(path.read_text())
+
+    def test_whitespace_file(self, tmp_path):
+        path = tmp_path / "blank.txt"
+        path.write_text(" \n\t\n")
+        assert decompose_file(path) == {"units": [], "meta": {"total_units": 0, "error": "empty_input"}}
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(OSError):
+            decompose_file(tmp_path / "missing.txt")
+
+
+class TestCliFile:
+    @pytest.mark.parametrize("flags", [[], ["--pretty"], ["--compact"]])
+    def test_streamed_json_matches_dump(self, tmp_path, monkeypatch, capsys, flags):
+        from decompose.cli import main
+
+        path = FIXTURES / "spec_structural.txt"
+        monkeypatch.setattr(sys, "argv", ["decompose", "--file", str(path), *flags])
+        main()
+        out = capsys.readouterr().out
+        result = _without_timing(decompose_file(path, compact="--compact" in flags))
+        assert _without_timing(json.loads(out)) == result
+        expected = json.dumps(json.loads(out), indent=2 if "--pretty" in flags else None)
+        assert out == expected
@@ -0,0 +1,260 @@
+"""Tests for decompose.mcp_server tool calls."""
+
+import asyncio
+import ipaddress
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from decompose.core import decompose_text
+from decompose.executor import ToolExecutor
+from decompose.fetch import AsyncFetcher
+from decompose.paging import ResultStore
+from decompose.urlcache import UrlCache
+
+pytest.importorskip("mcp")
+
+from decompose import mcp_server  # noqa: E402
+
+DOC = "The contractor shall comply with ASTM C150. Payment of $1,200 is due on 01/02/2025."
+HTML = (
+    "<html><head><script>var x = 1;</script></head><body><nav><a href='/'>Home</a></nav>"
+    "<h1>Specification</h1><h2>Scope</h2><p>" + DOC + "</p>"
+    "<h2>Terms</h2><ul><li>Net 30</li><li>No retainage</li></ul></body></html>"
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            status, body = 304, b""
+        elif self.path == "/html":
+            status, body = 200, HTML.encode()
+        elif self.path == "/long":
+            status, body = 200, " ".join([DOC] * 200).encode()
+        else:
+            status, body = 200, DOC.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html" if self.path == "/html" else "text/plain")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = _Clock()
+    # Loopback is blocked by default; tests allow it but keep 10/8 blocked
+    fetcher = AsyncFetcher(blocked_networks=[ipaddress.ip_network("10.0.0.0/8")])
+    monkeypatch.setattr(mcp_server, "_fetcher", fetcher)
+    monkeypatch.setattr(mcp_server, "_url_cache", UrlCache(ttl=60, clock=clock))
+    return clock
+
+
+def _url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+    executor = ToolExecutor(max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(mcp_server, "_executor", executor)
+    monkeypatch.setattr(mcp_server, "_results", ResultStore())
+    yield executor
+    executor.shutdown()
+
+
+async def _call_async(name: str, arguments: dict) -> dict:
+    (content,) = await mcp_server.call_tool(name, arguments)
+    return json.loads(content.text)
+
+
+def _call(name: str, arguments: dict) -> dict:
+    return asyncio.run(_call_async(name, arguments))
+
+
+class TestCallTool:
+    def test_decompose_text(self):
+        result = _call("decompose_text", {"text": DOC})
+        assert result["meta"]["total_units"] == len(result["units"]) == 1
+        assert result["units"][0]["authority"] == "mandatory"
+
+    def test_unknown_tool(self):
+        assert _call("decompose_everything", {}) == {"error": "Unknown tool: decompose_everything"}
+
+    def test_invalid_argument_is_not_retryable(self):
+        result = _call("decompose_text", {"text": DOC, "stages": ["spelling"]})
+        assert result["retryable"] is False
+        assert "spelling" in result["error"]
+
+    def test_busy_executor_is_retryable(self, executor):
+        async def main():
+            gate = threading.Event()
+            blocker = asyncio.ensure_future(executor.run(gate.wait, 5))
+            await asyncio.sleep(0.02)
+            try:
+                return await _call_async("decompose_text", {"text": DOC})
+            finally:
+                gate.set()
+                await blocker
+
+        result = asyncio.run(main())
+        assert result["error"].startswith("Server busy")
+        assert result["retryable"] is True
+        assert result["running"] == 1
+
+
+class TestUnitOptions:
+    def test_projection_keeps_filtered_fields(self):
+        options = mcp_server._unit_options({"fields": ["heading"], "min_attention": 1, "risk": ["security"]})
+        assert options["fields"] == ["attention", "heading", "risk"]
+        assert options["stages"] is None
+
+    def test_stage_selection_keeps_classify_for_filters(self):
+        assert mcp_server._unit_options({"stages": ["entities"], "authority": ["mandatory"]})["stages"] == [
+            "classify", "entities",
+        ]
+        assert mcp_server._unit_options({"stages": ["entities"]})["stages"] == ["entities"]
+
+    def test_filtered_projection_through_call_tool(self):
+        text = DOC + "\n\n" + "General background information."
+        arguments = {"text": text, "chunk_size": 100, "fields": ["heading"], "stages": [], "min_attention": 0.1}
+        result = _call("decompose_text", arguments)
+        assert result["units"] == [{"attention": result["units"][0]["attention"]}]
+        assert result["page"]["total"] == 1
+
+    def test_null_arguments_take_defaults(self):
+        arguments = {
+            "text": DOC, "chunk_size": None, "text_preview": None, "page_size": None,
+            "min_attention": None, "authority": None, "risk": None,
+        }
+        assert _call("decompose_text", arguments)["units"] == decompose_text(DOC)["units"]
+
+
+class TestDecomposeUrl:
+    def test_result_is_cached(self, server, clock):
+        async def main():
+            url = _url(server, "/doc")
+            first = await _call_async("decompose_url", {"url": url})
+            second = await _call_async("decompose_url", {"url": url})
+            await mcp_server._fetcher.close()
+            return first, second
+
+        first, second = asyncio.run(main())
+        assert first == second
+        assert first["meta"]["source_url"].endswith("/doc")
+        assert "cache" not in first["meta"]
+        assert [u["text"] for u in first["units"]] == [DOC]
+        assert len(server.requests) == 1
+
+    def test_stale_page_revalidated_with_304(self, server, clock):
+        async def main():
+            url = _url(server, "/doc")
+            first = await _call_async("decompose_url", {"url": url})
+            clock.now += 61
+            second = await _call_async("decompose_url", {"url": url})
+            await mcp_server._fetcher.close()
+            return first, second
+
+        first, second = asyncio.run(main())
+        assert first == second
+        assert server.requests == [("/doc", None), ("/doc", '"v1"')]
+
+    def test_options_cached_separately(self, server, clock):
+        async def main():
+            url = _url(server, "/doc")
+            full = await _call_async("decompose_url", {"url": url})
+            projected = await _call_async("decompose_url", {"url": url, "fields": ["authority"]})
+            await mcp_server._fetcher.close()
+            return full, projected
+
+        full, projected = asyncio.run(main())
+        assert projected["units"] == [{"authority": "mandatory"}]
+        assert full["units"][0]["text"] == DOC
+        assert len(server.requests) == 1
+
+    def test_html_becomes_sections(self, server, clock):
+        async def main():
+            result = await _call_async("decompose_url", {"url": _url(server, "/html")})
+            await mcp_server._fetcher.close()
+            return result
+
+        units = asyncio.run(main())["units"]
+        paths = [u["heading_path"] for u in units]
+        assert paths == [["Specification"], ["Specification", "Scope"], ["Specification", "Terms"]]
+        assert DOC in units[1]["text"]
+        assert "- Net 30\n- No retainage" in units[2]["text"]
+        assert not any("var x" in u["text"] or "Home" in u["text"] for u in units)
+
+    def test_chunks_analyzed_during_download_are_reused(self, server, clock, monkeypatch):
+        prefetched = []
+        run_decompose_url = mcp_server._run_decompose_url
+
+        def spy(url, text, options, cache):
+            prefetched.append(len(cache))
+            return run_decompose_url(url, text, options, cache)
+
+        monkeypatch.setattr(mcp_server, "_PREFETCH_BATCH", 2)
+        monkeypatch.setattr(mcp_server, "_run_decompose_url", spy)
+
+        async def main():
+            result = await _call_async("decompose_url", {"url": _url(server, "/long"), "page_size": 1000})
+            await mcp_server._fetcher.close()
+            return result
+
+        result = asyncio.run(main())
+
+        expected = decompose_text(" ".join([DOC] * 200))
+        assert result["units"] == expected["units"]
+        assert prefetched[0] > 0
+
+    def test_fetch_error(self, clock):
+        result = _call("decompose_url", {"url": "http://10.0.0.1/secret"})
+        assert result["error"].startswith("Failed to fetch URL")
+
+
+class TestDecomposePage:
+    def test_pages_through_a_result(self):
+        text = " ".join([DOC] * 200)
+        first = _call("decompose_text", {"text": text, "chunk_size": 100, "page_size": 40})
+        units = first["units"]
+        cursor = first["page"]["next_cursor"]
+        while cursor:
+            page = _call("decompose_page", {"cursor": cursor})
+            units += page["units"]
+            cursor = page["page"]["next_cursor"]
+        assert first["page"]["total"] == len(units) > 40
+        assert units == decompose_text(text, chunk_size=100)["units"]
+
+    @pytest.mark.parametrize("cursor", ["0123456789abcdef:50", "not-a-cursor"])
+    def test_unknown_cursor(self, cursor):
+        result = _call("decompose_page", {"cursor": cursor})
+        assert result["error"].startswith("Unknown or expired cursor")
+        assert result["retryable"] is False
@@ -0,0 +1,79 @@
+"""Tests for decompose.paging."""
+
+import pytest
+
+from decompose.core import decompose_text
+from decompose.paging import ResultStore, UnitFilter
+
+
+def _result(n: int) -> dict:
+    units = [
+        {"text": f"unit {i}", "authority": "mandatory" if i % 2 else "informational",
+         "risk": "compliance" if i % 3 == 0 else "informational", "attention": i / 10}
+        for i in range(n)
+    ]
+    return {"units": units, "meta": {"total_units": n}}
+
+
+def _pages(store: ResultStore, first: dict) -> list[dict]:
+    pages = [first]
+    while pages[-1]["page"]["next_cursor"]:
+        pages.append(store.next_page(pages[-1]["page"]["next_cursor"]))
+    return pages
+
+
+class TestResultStore:
+    def test_small_result_returned_as_is(self):
+        result = _result(3)
+        assert ResultStore().first_page(result, page_size=5) is result
+
+    def test_pages_cover_every_unit_once(self):
+        store = ResultStore()
+        result = _result(23)
+        pages = _pages(store, store.first_page(result, page_size=10))
+        assert [p["page"]["returned"] for p in pages] == [10, 10, 3]
+        assert [u for p in pages for u in p["units"]] == result["units"]
+        assert pages[0]["meta"] == {"total_units": 23}
+        assert "meta" not in pages[1]
+
+    def test_filters_apply_before_paging(self):
+        store = ResultStore()
+        first = store.first_page(_result(30), page_size=4, unit_filter=UnitFilter(authorities=("mandatory",)))
+        units = [u for p in _pages(store, first) for u in p["units"]]
+        assert first["page"]["total"] == 15
+        assert len(units) == 15 and all(u["authority"] == "mandatory" for u in units)
+
+    def test_filtered_result_that_fits_has_page_info(self):
+        first = ResultStore().first_page(_result(10), unit_filter=UnitFilter(min_attention=0.5, risks=("compliance",)))
+        assert [u["text"] for u in first["units"]] == ["unit 6", "unit 9"]
+        assert first["page"] == {"offset": 0, "returned": 2, "total": 2, "next_cursor": None}
+
+    def test_pages_can_be_reread(self):
+        store = ResultStore()
+        cursor = store.first_page(_result(12), page_size=5)["page"]["next_cursor"]
+        assert store.next_page(cursor) == store.next_page(cursor)
+
+    def test_lru_eviction(self):
+        store = ResultStore(max_chars=1000)
+        first = store.first_page(_result(20), page_size=5)  # 130 chars of unit text + 20 * UNIT_OVERHEAD
+        store.first_page(_result(20), page_size=5)
+        assert len(store) == 1
+        with pytest.raises(KeyError):
+            store.next_page(first["page"]["next_cursor"])
+
+    def test_disabled_store_returns_first_page_only(self):
+        first = ResultStore(max_chars=0).first_page(_result(20), page_size=5)
+        assert first["page"]["returned"] == 5 and first["page"]["total"] == 20
+        assert first["page"]["next_cursor"] is None
+
+    @pytest.mark.parametrize("cursor", ["nohandle", "abc:-5", "abc:x"])
+    def test_malformed_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            ResultStore().next_page(cursor)
+
+    def test_decompose_result(self):
+        result = decompose_text("The contractor shall comply with ASTM C150. " * 300, chunk_size=200)
+        store = ResultStore()
+        pages = _pages(store, store.first_page(result, page_size=8))
+        assert len(pages) > 1
+        assert [u for p in pages for u in p["units"]] == result["units"]
@@ -0,0 +1,105 @@
+"""Tests for decompose.profile and ``decompose profile``."""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from decompose.analysis import _RULES
+from decompose.chunker import auto_chunk
+from decompose.profile import ENTITY_RULES, SCANNER_KEY, profile_rules
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+TEXT = (
+    "The contractor shall comply with ASTM C150 and 29 CFR 1926.451. "
+    "If the load exceeds 50 psf, then the engineer shall be notified by 03/15/2025. "
+    "Payment of $12,500.00 is due within 30 days; retainage is 10%. "
+) * 40
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return profile_rules([TEXT], repeat=1)
+
+
+class TestProfileRules:
+    def test_one_record_per_rule_entity_and_scanner(self, profile):
+        assert len(profile.patterns) == len(_RULES.patterns) + len(ENTITY_RULES) + 1
+        assert [p for p in profile.patterns if p.keys == [SCANNER_KEY]]
+
+    def test_rule_matches_equal_the_production_counts(self, profile):
+        expected = [0] * len(_RULES.patterns)
+        for chunk in auto_chunk(TEXT):
+            for i, n in enumerate(_RULES.counts(chunk.text.lower())):
+                expected[i] += n
+        assert [p.matches for p in profile.patterns[: len(_RULES.patterns)]] == expected
+
+    def test_entity_matches(self, profile):
+        chunks = [c.text for c in auto_chunk(TEXT)]
+        percent = next(p for p in profile.patterns if p.pattern == ENTITY_RULES[-1][0].pattern)
+        assert percent.calls == len(chunks)
+        assert percent.matches == sum(len(ENTITY_RULES[-1][0].findall(t)) for t in chunks)
+
+    def test_counts_and_sizes(self, profile):
+        chunks = auto_chunk(TEXT)
+        assert (profile.documents, profile.chunks) == (1, len(chunks))
+        assert profile.chars == sum(len(c.text) for c in chunks)
+        assert all(p.ns >= 0 and p.standalone_ns >= 0 for p in profile.patterns)
+
+    def test_ranked(self, profile):
+        ranked = profile.ranked("matches")
+        assert [p.matches for p in ranked] == sorted((p.matches for p in ranked), reverse=True)
+        with pytest.raises(ValueError, match="Unknown order"):
+            profile.ranked("speed")
+
+    def test_shared_pattern_time_is_split_between_tables(self, profile):
+        tables = profile.tables()
+        assert {"authority", "risk", "content_type", "irreducibility", "entities"} <= set(tables)
+        shared = next(p for p in profile.patterns if p.pattern == r"\bshall\s+comply\b")
+        assert shared.tables == ["authority", "risk"]
+        total = sum(p.ns for p in profile.patterns)
+        assert sum(t["ns"] for t in tables.values()) == pytest.approx(total)
+        assert tables["authority"]["matches"] >= shared.matches
+
+    def test_to_dict(self, profile):
+        report = profile.to_dict(top=5)
+        assert len(report["patterns"]) == 5
+        assert report["patterns"][0]["ns"] >= report["patterns"][-1]["ns"]
+        assert sum(t["share"] for t in report["tables"].values()) == pytest.approx(1, abs=1e-3)
+        json.dumps(report)
+
+    def test_paths_and_texts_agree(self):
+        path = FIXTURES / "spec_structural.txt"
+        by_path = profile_rules([path], repeat=1, standalone=False)
+        by_text = profile_rules([path.read_text()], repeat=1, standalone=False)
+        assert [p.matches for p in by_path.patterns] == [p.matches for p in by_text.patterns]
+        assert all(p.standalone_ns == 0 for p in by_path.patterns)
+
+    def test_empty(self):
+        profile = profile_rules([], repeat=1)
+        assert profile.chars == 0 and profile.per_mb(1000) == 0.0
+        assert profile.to_dict()["ns_per_mb"] == 0
+
+
+class TestCliProfile:
+    def test_json(self, monkeypatch, capsys):
+        from decompose.cli import main
+
+        path = FIXTURES / "spec_structural.txt"
+        monkeypatch.setattr(sys, "argv", ["decompose", "profile", str(path), "--json", "--top", "3", "--repeat", "1"])
+        main()
+        report = json.loads(capsys.readouterr().out)
+        assert report["documents"] == 1 and len(report["patterns"]) == 3
+
+    def test_table(self, monkeypatch, capsys):
+        from decompose.cli import main
+
+        path = FIXTURES / "spec_structural.txt"
+        monkeypatch.setattr(sys, "argv", ["decompose", "profile", str(path), "--top", "4", "--by", "matches"])
+        main()
+        out = capsys.readouterr().out
+        assert re.search(r"^authority\s+\d+\s", out, re.MULTILINE)
+        assert "table/label" in out
@@ -0,0 +1,48 @@
+"""Tests for decompose.rules."""
+
+import re
+
+from decompose.classifier import AUTHORITY_PATTERNS, CONTENT_TYPE_PATTERNS, RISK_PATTERNS
+from decompose.rules import RuleSet
+
+
+def _all_patterns() -> list[str]:
+    pats: list[str] = []
+    for table in (AUTHORITY_PATTERNS, RISK_PATTERNS, CONTENT_TYPE_PATTERNS):
+        for value in table.values():
+            pats.extend(value["patterns"] if isinstance(value, dict) else value)
+    return pats
+
+
+class TestRuleSet:
+    def test_counts_match_findall(self):
+        text = (
+            "The contractor shall not proceed. If the owner approves, then work shall resume. "
+            "If a, if b then c. Payment of $ 1,000 and $25,000 in accordance with Section 3. "
+            "Inspections, inspection, in the event of an emergency. Options are optional."
+        ).lower()
+        rules = RuleSet((p, p) for p in _all_patterns())
+        expected = [len(re.findall(p, text, re.IGNORECASE)) for p in rules.patterns]
+        assert rules.counts(text) == expected
+
+    def test_counts_ignore_case_without_lowering(self):
+        text = "SHALL comply. Must. ſhall provide."
+        rules = RuleSet((p, p) for p in _all_patterns())
+        expected = [len(re.findall(p, text, re.IGNORECASE)) for p in rules.patterns]
+        assert rules.counts(text) == expected
+
+    def test_shared_pattern_credited_to_each_key(self):
+        rules = RuleSet([(r"\bshall\s+comply\b", "a"), (r"\bshall\s+comply\b", "b")])
+        assert rules.tally("you shall comply") == {"a": 1, "b": 1}
+
+    def test_rule_matches_do_not_overlap(self):
+        rules = RuleSet([(r"\bif\b[^.]*\bthen\b", "cond")])
+        assert rules.tally("if a if b then c") == {"cond": 1}
+
+    def test_unprefixed_pattern_falls_back(self):
+        rules = RuleSet([(r"(\d+)%", "pct"), (r"\bshall\b", "shall")])
+        assert rules.tally("10% and 20% shall") == {"pct": 2, "shall": 1}
+
+    def test_no_matches_is_empty(self):
+        rules = RuleSet([(r"\bshall\b", "shall")])
+        assert rules.tally("nothing here") == {}
@@ -0,0 +1,65 @@
+"""Tests for the synthetic corpus and scaling check (benchmarks/corpus.py, benchmarks/scaling.py)."""
+
+import re
+
+import pytest
+from corpus import KINDS, generate, vocabulary
+from scaling import check, faster, sizes, slope
+
+
+class TestCorpus:
+    @pytest.mark.parametrize("kind", KINDS)
+    def test_seeded_exact_and_prefix_stable(self, kind):
+        text = generate(kind, 20_000, seed=3)
+        assert len(text) == 20_000
+        assert generate(kind, 20_000, seed=3) == text
+        assert generate(kind, 5_000, seed=3) == text[:5_000]
+        assert generate(kind, 20_000, seed=4) != text
+
+    def test_shapes(self):
+        markdown = generate("markdown", 50_000)
+        assert re.search(r"^###### ", markdown, re.MULTILINE)
+        assert "| --- |" in generate("tables", 5_000)
+        assert re.search(r"\$[\d,]+\.\d\d", generate("tables", 5_000))
+        run_on = generate("run-on", 50_000)
+        assert not re.search(r"[.!?\n]", run_on)
+        assert "\n#" not in generate("plain", 50_000)
+
+    def test_vocabulary_from_fixtures(self):
+        vocab = vocabulary()
+        assert "shall" in vocab.words
+        assert any(s.startswith("ASTM") for s in vocab.standards)
+
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError, match="Unknown corpus kind"):
+            generate("poetry", 100)
+
+
+class TestScalingCheck:
+    def test_sizes(self):
+        assert sizes(1_000, 1_000_000) == [1_000, 10_000, 100_000, 1_000_000]
+        assert sizes(1_000, 5_000, per_decade=2) == [1_000, 3_162, 5_000]
+
+    def test_slope(self):
+        assert slope([(10, 5), (100, 50), (1000, 500)]) == pytest.approx(1.0)
+        assert slope([(10, 100), (100, 10_000)]) == pytest.approx(2.0)
+        assert slope([(10, 1)]) is None
+
+    def test_flags_superlinear_curves(self):
+        def point(size, ms, peak):
+            stages = ("chunk", "sections", "classify", "decompose")
+            return {"size": size, "time": {s: {"min_ms": ms} for s in stages}, "peak_bytes": peak}
+
+        points = [point(1_000, 1.0, 100), point(100_000, 10.0, 10_000), point(1_000_000, 1000.0, 100_000)]
+        slopes, failures = check(points, fit_from=100_000, max_slope=1.15)
+        assert slopes["decompose"] == 2.0 and slopes["peak_memory"] == 1.0
+        assert failures == ["chunk", "sections", "classify", "decompose"]
+
+    def test_remeasure_keeps_faster_timing(self):
+        def point(ms, peak):
+            stages = ("chunk", "sections", "classify", "decompose")
+            return {"size": 1_000, "time": {s: {"min_ms": ms, "n": ms} for s in stages}, "peak_bytes": peak}
+
+        merged = faster(point(5.0, 100), point(3.0, 120))
+        assert merged["time"]["decompose"] == {"min_ms": 3.0, "n": 3.0}
+        assert merged["peak_bytes"] == 100
@@ -0,0 +1,86 @@
+"""Tests for decompose.timing and the timings= / span_hook= options."""
+
+from pathlib import Path
+
+from decompose.analysis import ALL_STAGES
+from decompose.cache import MemoryCache
+from decompose.core import _analyze_chunks, decompose_file, decompose_text, iter_decompose
+from decompose.timing import TIMED_STAGES, Span, StageTimer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _without_timing(result: dict) -> dict:
+    result["meta"].pop("processing_ms", None)
+    result["meta"].pop("timings", None)
+    return result
+
+
+class TestStageTimer:
+    def test_totals_and_maxima(self):
+        timer = StageTimer()
+        t = timer.add("scan", 0, chunk=0)
+        timer.add("scan", t - 5, chunk=1)
+        meta = timer.meta()["stages"]["scan"]
+        assert meta["calls"] == 2
+        assert meta["max_chunk"] == 0 and meta["max_ns"] == t
+        assert meta["ns"] >= t + 5
+
+    def test_merge_shifts_chunks_and_replays_spans(self):
+        spans = []
+        parent, worker = StageTimer(spans.append), StageTimer(record=True)
+        worker.add("classify", 0, chunk=2)
+        parent.merge(worker, offset=10)
+        assert parent.meta()["stages"]["classify"]["max_chunk"] == 12
+        assert [(s.stage, s.chunk) for s in spans] == [("classify", 12)]
+
+    def test_span(self):
+        assert Span("chunk", 10, 25).duration_ns == 15
+
+
+class TestTimings:
+    TEXT = (FIXTURES / "spec_structural.txt").read_text()
+
+    def test_off_by_default(self):
+        assert "timings" not in decompose_text(self.TEXT)["meta"]
+
+    def test_meta(self):
+        result = decompose_text(self.TEXT, timings=True)
+        timings = result["meta"]["timings"]
+        stages = timings["stages"]
+        assert list(stages) == [s for s in TIMED_STAGES if s in stages]
+        assert {"chunk", "scan", "classify", "entities", "irreducibility", "units", "encode"} <= set(stages)
+        assert sum(s["ns"] for s in stages.values()) <= timings["total_ns"]
+        assert stages["units"]["calls"] == len(result["units"])
+        assert stages["chunk"]["max_chunk"] is None
+        assert _without_timing(result) == _without_timing(decompose_text(self.TEXT))
+
+    def test_only_run_stages_are_timed(self):
+        stages = decompose_text(self.TEXT, stages=["entities"], timings=True)["meta"]["timings"]["stages"]
+        assert "entities" in stages
+        assert not {"scan", "classify", "irreducibility"} & set(stages)
+
+    def test_span_hook(self):
+        spans = []
+        result = decompose_text(self.TEXT, span_hook=spans.append, cache=MemoryCache(), tokenizer=len)
+        assert "timings" in result["meta"]
+        assert {"cache", "tokens"} <= {s.stage for s in spans}
+        scans = [s.chunk for s in spans if s.stage == "scan"]
+        assert scans == list(range(len(result["units"])))
+        assert all(s.end_ns >= s.start_ns for s in spans)
+
+    def test_parallel_analysis_merged(self):
+        texts = [c * 40 for c in ("The contractor shall comply. ", "Pay $5,000 by 01/15/2026. ", "Do not enter. ")]
+        spans = []
+        timer = StageTimer(spans.append)
+        _analyze_chunks(texts, 2, True, None, ALL_STAGES, timer)
+        assert timer.meta()["stages"]["scan"]["calls"] == 3
+        assert sorted(s.chunk for s in spans if s.stage == "classify") == [0, 1, 2]
+
+    def test_streaming(self):
+        stream = iter_decompose(self.TEXT, timings=True)
+        units = list(stream)
+        stages = stream.meta["timings"]["stages"]
+        assert stages["chunk"]["calls"] == len(units)
+        path = FIXTURES / "model_card.txt"
+        assert "timings" in decompose_file(path, timings=True)["meta"]
@@ -0,0 +1,149 @@
+"""Tests for decompose.tokens and tokenizer-based budgets."""
+
+import base64
+import gc
+import weakref
+
+import pytest
+
+from decompose.batch import decompose_many
+from decompose.core import decompose_for_llm, decompose_text, filter_for_llm
+from decompose.tokens import BPETokenizer, TokenCounter, token_counter
+
+
+def _words(text: str) -> list[str]:
+    return text.split()
+
+
+@pytest.fixture
+def vocab(tmp_path):
+    ranks = {bytes([b]): b for b in range(256)}
+    for merged in (b"th", b"the", b" the", b"sh", b"sha", b"shal", b"shall"):
+        ranks[merged] = len(ranks)
+    path = tmp_path / "tiny.tiktoken"
+    path.write_bytes(b"".join(base64.b64encode(k) + b" %d\n" % v for k, v in ranks.items()))
+    return path
+
+
+class TestBPETokenizer:
+    def test_merges_by_rank(self, vocab):
+        bpe = BPETokenizer(vocab)
+        assert bpe("the") == 1
+        assert bpe(" the") == 1
+        assert bpe("shall") == 1
+        assert bpe("them") == 2  # "the" + "m"
+        assert bpe("The") == 3  # ranks are case-sensitive
+        assert bpe("the the shall") == 4  # "the", " the", and " shall" as " " + "shall"
+        assert bpe("") == 0
+
+    def test_pre_tokenizer(self, vocab):
+        bpe = BPETokenizer(vocab)
+        assert bpe("12345") == 5  # "123" and "45", one byte each
+        assert bpe("é") == 2  # bytes without a merge stay separate
+
+    def test_counter_from_path(self, vocab):
+        assert token_counter(str(vocab))("the shall") == 3
+
+
+class TestTokenCounter:
+    def test_counts_and_sequences(self):
+        assert TokenCounter(len)("abc") == 3
+        assert TokenCounter(_words)("a b c d") == 4
+
+    def test_cached_by_content(self):
+        calls = []
+        counter = TokenCounter(lambda t: calls.append(t) or len(t.split()))
+        assert counter("a b") == counter("a b") == 2
+        assert calls == ["a b"]
+        assert (counter.hits, counter.misses) == (1, 1)
+
+    def test_lru_bound(self):
+        counter = TokenCounter(len, max_entries=2)
+        for text in ("a", "bb", "ccc"):
+            counter(text)
+        assert len(counter) == 2
+
+    def test_fit(self):
+        counter = TokenCounter(_words)
+        assert counter.fit("one two three four", 2) == "one two "
+        assert counter.fit("one two", 5) == "one two"
+        assert counter.fit("one", 0) == ""
+
+    def test_shared_between_calls(self):
+        assert token_counter(_words) is token_counter(_words)
+        counter = TokenCounter(_words)
+        assert token_counter(counter) is counter
+
+    def test_bound_methods_shared(self, vocab):
+        bpe = BPETokenizer(vocab)
+        assert token_counter(bpe.__call__) is token_counter(bpe.__call__)
+
+    def test_released_with_tokenizer(self):
+        class Words:
+            def __call__(self, text):
+                return text.split()
+
+        words = Words()
+        ref = weakref.ref(words)
+        assert token_counter(words)("a b") == 2
+        del words
+        gc.collect()
+        assert ref() is None
+
+    def test_unhashable_tokenizer(self):
+        class Unhashable:
+            def __eq__(self, other):
+                return self is other
+
+            def __call__(self, text):
+                return len(text)
+
+        tokenizer = Unhashable()
+        assert token_counter(tokenizer)("abc") == 3
+        assert token_counter(tokenizer) is not token_counter(tokenizer)
+
+
+class TestTokenizerBudgets:
+    TEXT = (
+        "# Scope\nThe contractor shall comply with ASTM C150.\n"
+        "# Safety\nEmergency exits shall not be obstructed at any time.\n"
+        "# Payment\nThe owner shall pay $5,000 within 30 days.\n"
+    )
+
+    def test_decompose_meta(self):
+        counter = TokenCounter(_words)
+        meta = decompose_text(self.TEXT, tokenizer=counter)["meta"]
+        assert meta["token_estimate"]["input"] == len(self.TEXT.split())
+        assert meta["token_estimate"]["output"] > 0
+        assert decompose_text(self.TEXT, tokenizer=counter)["meta"]["token_estimate"] == meta["token_estimate"]
+        assert counter.hits > 0
+
+    def test_filter_truncates_to_token_budget(self):
+        result = decompose_text(self.TEXT)
+        r = filter_for_llm(result, max_tokens=12, tokenizer=_words)
+        assert len(r["text"].split()) == r["meta"]["token_estimate"] == 12
+        full = filter_for_llm(result, tokenizer=_words)
+        assert full["text"].startswith(r["text"])
+        assert full["meta"]["token_estimate"] == len(full["text"].split())
+
+    def test_filter_packs_by_tokens(self):
+        # Safety (11 words) outranks Scope (9) on risk; both together do not fit
+        r = filter_for_llm(
+            decompose_text(self.TEXT), max_tokens=11, pack=True, include_headings=False, tokenizer=_words,
+        )
+        assert [u["heading"] for u in r["units"]] == ["Safety"]
+        assert r["meta"]["token_estimate"] == 11
+
+    def test_fused_matches(self):
+        for kwargs in ({"max_tokens": 12}, {"max_tokens": 10, "pack": True}, {}):
+            expected = filter_for_llm(decompose_text(self.TEXT), tokenizer=_words, **kwargs)
+            fused = decompose_for_llm(self.TEXT, tokenizer=_words, **kwargs)
+            assert fused["text"] == expected["text"]
+            assert fused["meta"]["token_estimate"] == expected["meta"]["token_estimate"]
+
+    def test_batch_with_vocab_path(self, vocab, tmp_path):
+        path = tmp_path / "doc.md"
+        path.write_text(self.TEXT)
+        (result,) = decompose_many([path], workers=1, tokenizer=str(vocab))
+        expected = decompose_text(self.TEXT, tokenizer=str(vocab))["meta"]["token_estimate"]
+        assert result["meta"]["token_estimate"] == expected
@@ -0,0 +1,185 @@
+"""Tests for decompose.urlcache."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from decompose.fetch import AsyncFetcher, FetchError
+from decompose.urlcache import UrlCache, fetch_page
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        headers = self.headers
+        self.server.requests.append((self.path, headers.get("If-None-Match"), headers.get("If-Modified-Since")))
+        if self.path == "/gone":
+            status, body, headers = 410, b"", {}
+        elif self.path == "/plain":
+            status, body, headers = 200, b"no validators", {}
+        else:
+            etag = f'"{self.server.version}"'
+            if self.headers.get("If-None-Match") == etag:
+                status, body, headers = 304, b"", {"ETag": etag}
+            else:
+                body = b"The contractor shall comply, " + self.server.version.encode()
+                headers = {"ETag": etag, "Last-Modified": "Mon, 02 Feb 2026 10:00:00 GMT"}
+                status = 200
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    httpd.version = "v1"
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+
+
+async def _convert(response) -> str:
+    return (await response.read()).decode()
+
+
+def _fetch_all(server, cache: UrlCache, paths: list[str], between=None) -> list[tuple[str, str]]:
+    async def main():
+        out = []
+        async with AsyncFetcher(blocked_networks=()) as fetcher:
+            for path in paths:
+                url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+                page, how = await fetch_page(url, fetcher, cache, _convert)
+                out.append((page.text, how))
+                if between:
+                    between()
+        return out
+
+    return asyncio.run(main())
+
+
+class TestFetchPage:
+    def test_fresh_hit_skips_network(self, server):
+        cache = UrlCache(ttl=60, clock=_Clock())
+        results = _fetch_all(server, cache, ["/doc", "/doc"])
+        assert [how for _, how in results] == ["fetched", "fresh"]
+        assert len(server.requests) == 1
+
+    def test_stale_page_revalidated(self, server):
+        clock = _Clock()
+        cache = UrlCache(ttl=60, clock=clock)
+
+        def advance():
+            clock.now += 61
+
+        results = _fetch_all(server, cache, ["/doc", "/doc", "/doc"], between=advance)
+        assert [how for _, how in results] == ["fetched", "revalidated", "revalidated"]
+        assert server.requests[1] == ("/doc", '"v1"', "Mon, 02 Feb 2026 10:00:00 GMT")
+
+    def test_changed_page_refetched(self, server):
+        clock = _Clock()
+        cache = UrlCache(ttl=60, clock=clock)
+
+        def change():
+            clock.now += 61
+            server.version = "v2"
+
+        results = _fetch_all(server, cache, ["/doc", "/doc"], between=change)
+        assert results[1] == ("The contractor shall comply, v2", "fetched")
+
+    def test_results_survive_revalidation_but_not_changes(self, server):
+        clock = _Clock()
+        cache = UrlCache(ttl=60, clock=clock)
+        url = f"http://127.0.0.1:{server.server_address[1]}/doc"
+
+        async def main():
+            async with AsyncFetcher(blocked_networks=()) as fetcher:
+                page, _ = await fetch_page(url, fetcher, cache, _convert)
+                cache.add_result(page, "compact=False", {"units": [], "meta": {}})
+                clock.now += 61
+                page, _ = await fetch_page(url, fetcher, cache, _convert)
+                kept = dict(page.results)
+                clock.now += 61
+                server.version = "v2"
+                page, _ = await fetch_page(url, fetcher, cache, _convert)
+                return kept, page.results
+
+        kept, after_change = asyncio.run(main())
+        assert kept == {"compact=False": {"units": [], "meta": {}}}
+        assert after_change == {}
+
+    def test_no_validators_refetched_when_stale(self, server):
+        clock = _Clock()
+        cache = UrlCache(ttl=60, clock=clock)
+
+        def advance():
+            clock.now += 61
+
+        results = _fetch_all(server, cache, ["/plain", "/plain"], between=advance)
+        assert [how for _, how in results] == ["fetched", "fetched"]
+        assert server.requests[1] == ("/plain", None, None)
+
+    def test_error_status(self, server):
+        with pytest.raises(FetchError, match="410"):
+            _fetch_all(server, UrlCache(), ["/gone"])
+
+
+class TestUrlCache:
+    def test_size_bounded_lru(self):
+        cache = UrlCache(max_chars=25)
+        cache.put("a", "x" * 10, {})
+        cache.put("b", "y" * 10, {})
+        cache.get("a")
+        cache.put("c", "z" * 10, {})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+        assert cache.size == 20
+
+    def test_results_count_toward_size(self):
+        cache = UrlCache(max_chars=100)
+        page = cache.put("a", "x" * 10, {})
+        cache.add_result(page, "k", {"units": [{"text": "r" * 200}], "meta": {}})
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    def test_replace_updates_size(self):
+        cache = UrlCache()
+        cache.put("a", "x" * 10, {})
+        cache.put("a", "x" * 4, {})
+        assert cache.size == 4
+
+    def test_disabled(self):
+        cache = UrlCache(max_chars=0)
+        page = cache.put("a", "text", {"etag": '"1"'})
+        assert page.text == "text"
+        assert cache.get("a") is None
+
+    def test_no_store(self):
+        cache = UrlCache()
+        cache.put("a", "text", {"cache-control": "private, no-store"})
+        assert cache.get("a") is None
+
+    def test_validators(self):
+        page = UrlCache().put("a", "t", {"etag": '"e"', "last-modified": "Mon, 02 Feb 2026 10:00:00 GMT"})
+        assert page.validators() == {
+            "If-None-Match": '"e"', "If-Modified-Since": "Mon, 02 Feb 2026 10:00:00 GMT",
+        }